@@ -0,0 +1 @@
+"""Benchmarks of the pyromb build pipeline on synthetic catchments."""
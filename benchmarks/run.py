@@ -0,0 +1,220 @@
+"""Time the build pipeline on synthetic catchments and compare against a baseline.
+
+Write a baseline, then compare a later commit against it:
+
+    $ PYTHONPATH=src python -m benchmarks.run --output baseline.json
+    $ PYTHONPATH=src python -m benchmarks.run --compare baseline.json
+
+The stages timed are the Builder, Catchment.connect, a bare traversal and the RORB, WBNM
+and URBS emission. Sizes which would not fit the dense incidence matrices in memory only
+time the Builder, which does not need them, and record the later stages as skipped. Sizes
+projected to exceed the time budget are skipped.
+
+The default sizes stop at 3000 subareas. At 10000 the dense matrices need 4.4 GiB and at
+100000 they need 394 GiB, more than the default 2 GiB, and the Builder alone is projected
+past the default budget. Pass --sizes, --memory and --budget to time them anyway.
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import pyromb
+from pyromb.utils.synthetic import synthetic_catchment
+
+SIZES = (100, 300, 1000, 3000)
+MODELS = (pyromb.RORB, pyromb.WBNM, pyromb.URBS)
+
+
+def benchmark(subareas: int, branching: int = 2, depth: int | None = None, vertices: int = 2,
+              repeat: int = 1, connect: bool = True) -> dict:
+    """Time each stage of the build for one synthetic catchment.
+
+    Parameters
+    ----------
+    subareas : int
+        The number of subareas of the catchment.
+    branching : int
+        The number of tributaries joining at each confluence.
+    depth : int | None
+        The number of confluence levels, see synthetic_catchment.
+    vertices : int
+        The number of vertices of each reach.
+    repeat : int
+        The number of times to run each stage, the fastest is kept.
+    connect : bool
+        Time connecting, traversing and emitting the catchment, otherwise only the Builder.
+
+    Returns:
+    -------
+    dict
+        The size of the catchment and the seconds of each stage.
+    """
+    layers = synthetic_catchment(subareas, branching, depth, vertices)
+    stages = {}
+    for _ in range(repeat):
+        builder = pyromb.Builder()
+        times = {}
+        reaches = _timed(times, "builder.reach", builder.reach, layers.reaches)
+        confluences = _timed(times, "builder.confluence", builder.confluence, layers.confluences)
+        basins = _timed(times, "builder.basin", builder.basin, layers.centroids, layers.basins)
+        if connect:
+            catchment = pyromb.Catchment(confluences, basins, reaches)
+            _timed(times, "catchment.connect", catchment.connect)
+            _timed(times, "traverse", _traverse, catchment)
+            for Model in MODELS:
+                _timed(times, f"{Model.__name__.lower()}.getVector", pyromb.Traveller(catchment).getVector, Model())
+        stages = {k: min(v, stages.get(k, v)) for k, v in times.items()}
+
+    return {
+        "subareas": subareas,
+        "nodes": len(layers.centroids) + len(layers.confluences),
+        "reaches": len(layers.reaches),
+        "stages": stages,
+        "seconds": sum(stages.values()),
+    }
+
+
+def run(sizes=SIZES, branching: int = 2, depth: int | None = None, vertices: int = 2, repeat: int = 1,
+        budget: float = 600.0, memory: int = 2 ** 31) -> dict:
+    """Benchmark each size in turn.
+
+    Parameters
+    ----------
+    sizes : list[int]
+        The numbers of subareas to benchmark.
+    branching, depth, vertices, repeat
+        See benchmark.
+    budget : float
+        Skip a size if the stages to time are projected to take longer, in seconds. The
+        projection scales the previous size quadratically.
+    memory : int
+        Only time the Builder for a size if its dense incidence matrices would need more,
+        in bytes.
+
+    Returns:
+    -------
+    dict
+        The environment, configuration and result of each size.
+    """
+    results = []
+    previous = None
+    for n in sorted(sizes):
+        layers = synthetic_catchment(n, branching, depth, vertices)
+        nodes = len(layers.centroids) + len(layers.confluences)
+        required = 3 * nodes * len(layers.reaches) * 8
+        dense = required <= memory
+        stages = previous["stages"].items() if previous else ()
+        seconds = sum(v for k, v in stages if dense or k.startswith("builder."))
+        projected = seconds * (n / previous["subareas"]) ** 2 if previous else 0.0
+        if projected > budget:
+            results.append({"subareas": n, "skipped": f"projected {projected:.0f}s exceeds budget"})
+        elif not dense:
+            # The Builder stages do not need the matrices.
+            result = benchmark(n, branching, depth, vertices, repeat, connect=False)
+            result["skipped"] = f"connect and later stages, dense matrices need {required / 2 ** 30:.1f} GiB"
+            results.append(result)
+        else:
+            previous = benchmark(n, branching, depth, vertices, repeat)
+            results.append(previous)
+        print(json.dumps(results[-1]), file=sys.stderr)
+
+    return {
+        "commit": _commit(),
+        "python": platform.python_version(),
+        "created": datetime.now(timezone.utc).isoformat(),
+        "config": {"branching": branching, "depth": depth, "vertices": vertices, "repeat": repeat},
+        "results": results,
+    }
+
+
+def compare(baseline: dict, current: dict, tolerance: float = 0.2, floor: float = 0.005) -> list:
+    """The stages that are slower than the baseline.
+
+    Parameters
+    ----------
+    baseline : dict
+        The output of run for the earlier commit.
+    current : dict
+        The output of run for this commit.
+    tolerance : float
+        The fraction a stage may slow down by before it is a regression.
+    floor : float
+        Differences smaller than this many seconds are noise.
+
+    Returns:
+    -------
+    list[str]
+        A description of each regression.
+    """
+    before = {r["subareas"]: r["stages"] for r in baseline["results"] if "stages" in r}
+    regressions = []
+    for r in current["results"]:
+        if ("stages" not in r) or (r["subareas"] not in before):
+            continue
+        for stage, seconds in r["stages"].items():
+            old = before[r["subareas"]].get(stage)
+            if old is None:
+                continue
+            if (seconds > old * (1 + tolerance)) and (seconds - old > floor):
+                regressions.append(f"{stage} at {r['subareas']} subareas: {old:.4f}s -> {seconds:.4f}s")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--branching", type=int, default=2)
+    parser.add_argument("--depth", type=int, default=None)
+    parser.add_argument("--vertices", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--budget", type=float, default=600.0, help="seconds per size")
+    parser.add_argument("--memory", type=int, default=2 ** 31, help="bytes for the incidence matrices")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="a baseline JSON file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    current = run(args.sizes, args.branching, args.depth, args.vertices, args.repeat, args.budget, args.memory)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(current, f, indent=2)
+    else:
+        print(json.dumps(current, indent=2))
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), current, args.tolerance)
+        for r in regressions:
+            print(f"REGRESSION {r}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+def _timed(times: dict, stage: str, fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    times[stage] = time.perf_counter() - start
+    return result
+
+
+def _traverse(catchment) -> None:
+    """Walk the catchment without building a model."""
+    traveller = pyromb.Traveller(catchment)
+    traveller.next()
+    while traveller.position() != traveller._endSentinel:
+        traveller.nextAbsolute()
+
+
+def _commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,16 +4,30 @@ RORB, WBNM, and URBS control vector files through a consistent Python interface.
 
 from .core.catchment import Catchment
 from .core.gis.builder import Builder
+from .core.gis.flow_grid import FlowGrid
+from .core.gis.memory_layer import MemoryLayer
 from .core.gis.vector_layer import VectorLayer
+from .core.instrumentation import Instrumentation
+from .core.monitor import BuildCancelled, CancellationToken
 from .core.traveller import Traveller
+from .core.validation import ValidationError, validate
 from .models import RORB, URBS, WBNM
+from .pipeline import build_model
 
 __all__ = [
     "Catchment",
     "Builder",
+    "FlowGrid",
     "Traveller",
     "VectorLayer",
+    "MemoryLayer",
     "RORB",
     "WBNM",
     "URBS",
+    "build_model",
+    "CancellationToken",
+    "BuildCancelled",
+    "Instrumentation",
+    "validate",
+    "ValidationError",
 ]
@@ -0,0 +1,8 @@
+"""Vectorised analysis of connected catchments."""
+
+from .accumulation import Accumulation, accumulate
+from .distance import FlowDistance, flow_distance
+from .raingauge import GaugeWeights, idw_weights, thiessen_weights
+
+__all__ = ["Accumulation", "FlowDistance", "GaugeWeights", "accumulate", "flow_distance", "idw_weights",
+           "thiessen_weights"]
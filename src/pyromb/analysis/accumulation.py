@@ -0,0 +1,101 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from ..core.attributes.basin import Basin
+from ..core.catchment import Catchment
+from .tree import levels
+
+
+@dataclass
+class Accumulation:
+    """Upstream totals and stream order of every node of a catchment.
+
+    Each column is aligned with the nodes of the catchment, the nodes upstream of a node
+    include the node itself.
+
+    Attributes:
+    ----------
+    names : list[str]
+        The name of each node.
+    area : np.ndarray
+        The total area of the basins upstream of each node in km2.
+    fi : np.ndarray
+        The area weighted fraction impervious upstream of each node, 0 where there is no
+        upstream area.
+    basins : np.ndarray
+        The number of basins upstream of each node.
+    strahler : np.ndarray
+        The Strahler order of each node, 1 at the headwaters and increasing by one where
+        two streams of the same order meet.
+    shreve : np.ndarray
+        The Shreve magnitude of each node, the number of headwaters upstream of it.
+    """
+    names: list
+    area: np.ndarray
+    fi: np.ndarray
+    basins: np.ndarray
+    strahler: np.ndarray
+    shreve: np.ndarray
+
+    def frame(self):
+        """The columns as a pandas DataFrame indexed by node name.
+
+        Returns:
+        -------
+        pandas.DataFrame
+            A row per node.
+        """
+        import pandas as pd
+        return pd.DataFrame({
+            "area": self.area,
+            "fi": self.fi,
+            "basins": self.basins,
+            "strahler": self.strahler,
+            "shreve": self.shreve,
+        }, index=pd.Index(self.names, name="name"))
+
+
+def accumulate(catchment: Catchment) -> Accumulation:
+    """Accumulate the basin attributes and stream order of a connected catchment.
+
+    The nodes are grouped by their distance from the outlet and each group is added into
+    the next one down with vectorised scatter operations, so the pass takes time linear
+    in the number of nodes.
+
+    Parameters
+    ----------
+    catchment : Catchment
+        A connected catchment.
+
+    Returns:
+    -------
+    Accumulation
+        The columns of every node.
+    """
+    nodes = catchment._vertices
+    _, down = catchment._links()
+    isBasin = np.array([isinstance(v, Basin) for v in nodes], dtype=bool)
+    area = np.array([v.area if b else 0.0 for v, b in zip(nodes, isBasin)], dtype=float)
+    impervious = area * np.array([v.fi if b else 0.0 for v, b in zip(nodes, isBasin)], dtype=float)
+    basins = isBasin.astype(np.int64)
+    upstream = np.bincount(down[down >= 0], minlength=len(nodes))
+    shreve = (upstream == 0).astype(np.int64)
+    strahler = shreve.copy()
+    highest = np.zeros(len(nodes), dtype=np.int64)
+    highestCount = np.zeros(len(nodes), dtype=np.int64)
+
+    for level in reversed(levels(down)[1:]):
+        # The upstream nodes of the level are complete, find the order of the level.
+        d = down[level]
+        np.add.at(area, d, area[level])
+        np.add.at(impervious, d, impervious[level])
+        np.add.at(basins, d, basins[level])
+        np.add.at(shreve, d, shreve[level])
+        np.maximum.at(highest, d, strahler[level])
+        np.add.at(highestCount, d, strahler[level] == highest[d])
+        parents = np.unique(d)
+        strahler[parents] = highest[parents] + (highestCount[parents] > 1)
+
+    fi = np.divide(impervious, area, out=np.zeros_like(area), where=area > 0)
+    return Accumulation([v.name for v in nodes], area, fi, basins, strahler, shreve)
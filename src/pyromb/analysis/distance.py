@@ -0,0 +1,147 @@
+import math
+from dataclasses import dataclass
+
+import numpy as np
+
+from ..core.attributes.basin import Basin
+from ..core.attributes.reach import Reach, ReachType
+from ..core.catchment import Catchment
+from .tree import levels
+
+# The regional kc/dav ratio of Pearse et al. (2002) for Victorian catchments.
+KC_RATIO = 1.25
+
+
+def _excavated(reach: Reach, divisor: float) -> float:
+    if reach.slope <= 0:
+        return math.nan
+    # The RORB manual takes the slope of excavated channels in percent.
+    return 1.0 / (divisor * math.sqrt(100 * reach.slope))
+
+
+# The factor F of each reach type in the relative delay F * L / dav, following the
+# RORB manual. Excavated channels are faster than natural ones and drowned reaches
+# have no delay.
+DELAY_FACTORS = {
+    ReachType.NATURAL: 1.0,
+    ReachType.UNLINED: lambda r: _excavated(r, 3.0),
+    ReachType.LINED: lambda r: _excavated(r, 9.0),
+    ReachType.DROWNED: 0.0,
+}
+
+
+@dataclass
+class FlowDistance:
+    """Flow distances and relative delays of every node and reach of a catchment.
+
+    The node columns are aligned with the nodes of the catchment and the reach columns
+    with its reaches. Distances are in km along the reaches.
+
+    Attributes:
+    ----------
+    names : list[str]
+        The name of each node.
+    distance : np.ndarray
+        The flow distance from each node to the outlet.
+    dav : np.ndarray
+        The area weighted mean flow distance from the basins upstream of each node to
+        that node, NaN where there is no upstream area or the node does not drain to the
+        outlet.
+    reaches : list[str]
+        The name of each reach.
+    length : np.ndarray
+        The length of each reach.
+    delay : np.ndarray
+        The relative delay F * L / dav of each reach for the catchment outlet, where F
+        depends on the reach type (see DELAY_FACTORS). NaN for excavated reaches without
+        a slope.
+    outlet : str
+        The name of the catchment outlet.
+    """
+    names: list
+    distance: np.ndarray
+    dav: np.ndarray
+    reaches: list
+    length: np.ndarray
+    delay: np.ndarray
+    outlet: str
+
+    def kc(self, node: str | None = None, ratio: float = KC_RATIO) -> float:
+        """Estimate the RORB kc parameter from the average flow distance.
+
+        Parameters
+        ----------
+        node : str | None
+            The name of the node to estimate kc for, defaults to the outlet.
+        ratio : float
+            The kc/dav ratio of the region.
+
+        Returns:
+        -------
+        float
+            The kc estimate.
+        """
+        return ratio * float(self.dav[self.names.index(self.outlet if node is None else node)])
+
+    def frame(self):
+        """The node columns as a pandas DataFrame indexed by node name.
+
+        Returns:
+        -------
+        pandas.DataFrame
+            A row per node.
+        """
+        import pandas as pd
+        return pd.DataFrame({
+            "distance": self.distance,
+            "dav": self.dav,
+        }, index=pd.Index(self.names, name="name"))
+
+
+def flow_distance(catchment: Catchment, factors: dict | None = None) -> FlowDistance:
+    """Find the flow distances, average flow distances and relative delays of a catchment.
+
+    The distances are carried down the tree from the outlet one level at a time. The
+    upstream sums of area and area times distance are then range sums over the cached
+    traversal intervals (see Catchment._tour), so dav is found for every node at once and
+    the whole computation is linear in the size of the catchment.
+
+    Parameters
+    ----------
+    catchment : Catchment
+        A connected catchment.
+    factors : dict | None
+        The delay factor of each reach type, a number or a function of the reach.
+        Defaults to DELAY_FACTORS.
+
+    Returns:
+    -------
+    FlowDistance
+        The columns of every node and reach.
+    """
+    nodes = catchment._vertices
+    edges = catchment._edges
+    factors = DELAY_FACTORS | (factors or {})
+    length = np.array([r.length() / 1000 for r in edges], dtype=float)
+    reach, down = catchment._links()
+
+    distance = np.zeros(len(nodes), dtype=float)
+    for level in levels(down)[1:]:
+        distance[level] = distance[down[level]] + length[reach[level]]
+
+    _, entry, exit, order, _, _ = catchment._tour()
+    area = np.array([v.area if isinstance(v, Basin) else 0.0 for v in nodes], dtype=float)
+    order = np.asarray(order, dtype=np.int64)
+    upstreamArea = np.concatenate(([0.0], np.cumsum(area[order])))
+    upstreamMoment = np.concatenate(([0.0], np.cumsum((area * distance)[order])))
+    drains = entry >= 0
+    total = np.where(drains, upstreamArea[exit * drains] - upstreamArea[entry * drains], 0.0)
+    moment = np.where(drains, upstreamMoment[exit * drains] - upstreamMoment[entry * drains], 0.0)
+    dav = np.full(len(nodes), np.nan)
+    np.divide(moment - distance * total, total, out=dav, where=total > 0)
+
+    f = [factors[r.type](r) if callable(factors[r.type]) else factors[r.type] for r in edges]
+    delay = np.array(f, dtype=float) * length / dav[catchment._out]
+
+    return FlowDistance([v.name for v in nodes], distance, dav, [r.name for r in edges], length, delay,
+                        nodes[catchment._out].name)
@@ -0,0 +1,268 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from ..core.attributes.basin import Basin
+from ..core.catchment import Catchment
+
+# The number of array elements of a block of polygons clipped at once.
+_BLOCK = 1 << 22
+# The vertices a clipped ring is expected to gain, for sizing the blocks.
+_GROWTH = 16
+
+
+@dataclass
+class GaugeWeights:
+    """The raingauge weights of every subarea of a catchment.
+
+    Attributes:
+    ----------
+    subareas : list[str]
+        The name of each subarea.
+    gauges : list[str]
+        The name of each gauge.
+    points : np.ndarray
+        The (gauges, 2) x,y co-ordinates of the gauges.
+    weights : np.ndarray
+        The (subareas, gauges) weight of each gauge for each subarea, each row sums to 1.
+    """
+    subareas: list
+    gauges: list
+    points: np.ndarray
+    weights: np.ndarray
+
+    def __post_init__(self) -> None:
+        self._rows = {name: k for k, name in enumerate(self.subareas)}
+
+    def row(self, subarea: str) -> np.ndarray:
+        """The gauge weights of a subarea.
+
+        Parameters
+        ----------
+        subarea : str
+            The name of the subarea.
+
+        Returns:
+        -------
+        np.ndarray
+            The weight of each gauge.
+
+        Raises:
+        ------
+        KeyError
+            If the subarea has no weights.
+        """
+        return self.weights[self._rows[subarea]]
+
+    def frame(self):
+        """The weights as a pandas DataFrame indexed by subarea with a column per gauge.
+
+        Returns:
+        -------
+        pandas.DataFrame
+            A row per subarea.
+        """
+        import pandas as pd
+        return pd.DataFrame(self.weights, index=pd.Index(self.subareas, name="name"), columns=self.gauges)
+
+
+def thiessen_weights(gauges: dict, polygons: dict) -> GaugeWeights:
+    """Find the Thiessen weights of subarea polygons.
+
+    The weight of a gauge is the fraction of each subarea nearest to it.
+
+    The Thiessen polygon of a gauge is the intersection of the half-planes nearer to it
+    than to each other gauge, so each subarea polygon is clipped by those half-planes
+    (Sutherland-Hodgman) and the weights are the exact areas of the pieces. Every point
+    of a subarea is nearer its nearest gauge than the gauge nearest its middle is to the
+    middle plus the subarea's spread, so only the gauges within twice that of the middle
+    can share it. Each (subarea, gauge) piece is clipped by the other gauges nearest
+    that gauge first, until the next is too far away to cut it. The pieces are clipped
+    together as padded arrays in blocks, there are no loops over subareas or vertices,
+    and the nearest-first order of the gauges takes a (gauges, gauges) index array.
+
+    Parameters
+    ----------
+    gauges : dict
+        The x,y co-ordinates of each gauge by name.
+    polygons : dict
+        The (n, 2) x,y vertices of each subarea polygon by name, in the co-ordinates of
+        the gauges.
+
+    Returns:
+    -------
+    GaugeWeights
+        The weights of the subareas in the order of the polygons.
+
+    Raises:
+    ------
+    ValueError
+        If there are no gauges.
+    """
+    names, points = _gauges(gauges)
+    weights = np.zeros((len(polygons), len(names)))
+    if not len(polygons):
+        return GaugeWeights([], names, points, weights)
+    vertices = [np.asarray(v, dtype=float).reshape(-1, 2) for v in polygons.values()]
+    counts = np.array([len(v) for v in vertices])
+    # Pad each ring with its first vertex, the ring length is kept in counts.
+    ring = np.empty((len(vertices), counts.max(), 2))
+    for k, v in enumerate(vertices):
+        ring[k, :len(v)] = v
+        ring[k, len(v):] = v[0]
+    valid = np.arange(ring.shape[1]) < counts[:, None]
+    middle = ring.sum(axis=1, where=valid[:, :, None]) / counts[:, None]
+    spread = np.where(valid, np.hypot(*(ring - middle[:, None, :]).transpose(2, 0, 1)), 0.0).max(axis=1)
+
+    # The other gauges of each gauge, nearest first.
+    neighbours = np.empty((len(names), len(names) - 1), dtype=np.int32)
+    step = max(1, _BLOCK // len(names))
+    for g in range(0, len(names), step):
+        d = np.hypot(points[g:g + step, 0, None] - points[:, 0], points[g:g + step, 1, None] - points[:, 1])
+        d[np.arange(len(d)), np.arange(g, g + len(d))] = np.inf
+        neighbours[g:g + step] = np.argsort(d, axis=1, kind='stable')[:, :-1]
+
+    block = max(1, _BLOCK // len(names))
+    for b in range(0, len(ring), block):
+        # The candidate gauges of the block, nearest first and padded with -1.
+        d = np.hypot(middle[b:b + block, 0, None] - points[:, 0], middle[b:b + block, 1, None] - points[:, 1])
+        d[d > (2 * spread[b:b + block] + d.min(axis=1))[:, None]] = np.inf
+        width = int((d < np.inf).sum(axis=1).max())
+        candidates = np.argsort(d, axis=1, kind='stable')[:, :width]
+        candidates[np.take_along_axis(d, candidates, axis=1) == np.inf] = -1
+
+        # Clip the pieces of each polygon in sub-blocks bounded by the size of their
+        # rings, which a convex clip grows by at most one vertex.
+        step = max(1, _BLOCK // (8 * width * (ring.shape[1] + _GROWTH)))
+        for c in range(0, len(candidates), step):
+            k = np.arange(b + c, b + min(c + step, len(candidates)))
+            cand = candidates[c:c + step]
+            area = _clippedAreas(ring[k], counts[k], points, neighbours, cand)
+            rows = np.broadcast_to(k[:, None], cand.shape)
+            used = cand >= 0
+            np.add.at(weights, (rows[used], cand[used]), area[used])
+    total = weights.sum(axis=1, keepdims=True)
+    # A polygon without area is given to the gauge nearest its middle.
+    empty = total[:, 0] <= 0
+    if empty.any():
+        distance = np.hypot(middle[empty, 0, None] - points[:, 0], middle[empty, 1, None] - points[:, 1])
+        nearest = np.argmin(distance, axis=1)
+        weights[empty] = 0.0
+        weights[np.flatnonzero(empty), nearest] = 1.0
+        total[empty] = 1.0
+    weights /= total
+    return GaugeWeights(list(polygons), names, points, weights)
+
+
+def idw_weights(gauges: dict, catchment: Catchment, power: float = 2.0) -> GaugeWeights:
+    """Find the inverse distance weights of the gauges at the centroid of each basin.
+
+    The weights of every basin and gauge are found in one array operation. A gauge at a
+    centroid takes all of its weight.
+
+    Parameters
+    ----------
+    gauges : dict
+        The x,y co-ordinates of each gauge by name.
+    catchment : Catchment
+        The catchment whose basins are weighted.
+    power : float
+        The power of the distance.
+
+    Returns:
+    -------
+    GaugeWeights
+        The weights of the basins in the order of the catchment.
+
+    Raises:
+    ------
+    ValueError
+        If there are no gauges.
+    """
+    names, points = _gauges(gauges)
+    basins = [v for v in catchment._vertices if isinstance(v, Basin)]
+    centroids = np.array([v.coordinates() for v in basins], dtype=float).reshape(-1, 2)
+    distance = np.hypot(centroids[:, 0, None] - points[:, 0], centroids[:, 1, None] - points[:, 1])
+    with np.errstate(divide='ignore'):
+        weights = distance ** -power
+    exact = distance == 0
+    hit = exact.any(axis=1)
+    weights[hit] = exact[hit]
+    weights /= weights.sum(axis=1, keepdims=True)
+    return GaugeWeights([v.name for v in basins], names, points, weights)
+
+
+def _gauges(gauges: dict) -> tuple:
+    if not gauges:
+        raise ValueError("At least one gauge is required")
+    return list(gauges), np.array([tuple(p) for p in gauges.values()], dtype=float).reshape(-1, 2)
+
+
+def _clippedAreas(ring: np.ndarray, counts: np.ndarray, points: np.ndarray, neighbours: np.ndarray,
+                  candidates: np.ndarray) -> np.ndarray:
+    """The (polygons, candidates) areas of each polygon nearer each candidate gauge.
+
+    The area of a candidate is the part of the polygon nearer to it than any other gauge,
+    -1 candidates are padding.
+
+    Each (polygon, gauge) piece is clipped by the other gauges nearest the gauge first. A
+    gauge further from the gauge than twice the furthest vertex of the piece cannot cut
+    it, so the piece is done at the first such gauge.
+    """
+    polygons, width = candidates.shape
+    own = candidates.ravel()
+    area = np.zeros(len(own))
+    active = np.flatnonzero(own >= 0)
+    v, n = np.repeat(ring, width, axis=0)[active], np.repeat(counts, width)[active]
+    for j in range(neighbours.shape[1] + 1):
+        g = points[own[active]]
+        reach = np.hypot(*(v - g[:, None, :]).transpose(2, 0, 1))
+        reach = np.where(np.arange(v.shape[1]) < n[:, None], reach, 0.0).max(axis=1)
+        if j < neighbours.shape[1]:
+            other = points[neighbours[own[active], j]]
+            done = (n == 0) | (np.hypot(*(other - g).T) > 2 * reach)
+        else:
+            done = np.ones(len(active), dtype=bool)
+        if done.any():
+            area[active[done]] = _area(v[done], n[done])
+            active, v, n = active[~done], v[~done], n[~done]
+            if not len(active):
+                break
+            g, other = g[~done], other[~done]
+        # The half-plane nearer g than other, x . (other - g) <= (|other|^2 - |g|^2) / 2.
+        offset = ((other ** 2).sum(axis=1) - (g ** 2).sum(axis=1)) / 2
+        v, n = _clip(v, n, other - g, offset)
+    return area.reshape(polygons, width)
+
+
+def _clip(v: np.ndarray, n: np.ndarray, normal: np.ndarray, offset: np.ndarray) -> tuple:
+    """Sutherland-Hodgman clip of padded rings by one half-plane each.
+
+    The rings v have n vertices, the half-planes are x . normal <= offset.
+    """
+    m = v.shape[1]
+    i = np.arange(m)
+    live = i < n[:, None]
+    previous = np.where(i == 0, n[:, None] - 1, i - 1).clip(0)
+    s = np.take_along_axis(v, previous[:, :, None], axis=1)
+    fe = (v * normal[:, None, :]).sum(axis=2) - offset[:, None]
+    fs = np.take_along_axis(fe, previous, axis=1)
+    ein, sin = fe <= 0, fs <= 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = np.where(ein != sin, fs / (fs - fe), 0.0)
+    cross = s + (v - s) * t[:, :, None]
+    out = np.stack((cross, v), axis=2).reshape(len(v), 2 * m, 2)
+    keep = np.stack((live & (ein != sin), live & ein), axis=2).reshape(len(v), 2 * m)
+    order = np.argsort(~keep, axis=1, kind='stable')
+    n = keep.sum(axis=1)
+    width = max(int(n.max()), 1)
+    return np.take_along_axis(out, order[:, :width, None], axis=1), n
+
+
+def _area(v: np.ndarray, n: np.ndarray) -> np.ndarray:
+    """The shoelace areas of the padded rings v with n vertices."""
+    i = np.arange(v.shape[1])
+    following = np.where(i + 1 < n[:, None], i + 1, 0)
+    w = np.take_along_axis(v, following[:, :, None], axis=1)
+    cross = v[:, :, 0] * w[:, :, 1] - w[:, :, 0] * v[:, :, 1]
+    return np.abs(np.where(i < n[:, None], cross, 0.0).sum(axis=1)) / 2
@@ -0,0 +1,145 @@
+import numpy as np
+
+
+def levels(down: np.ndarray) -> list:
+    """Group the nodes of a forest by their number of reaches to the root.
+
+    Each level is found from the one before through a compressed list of upstream nodes,
+    so grouping takes time linear in the number of nodes. Passes over the levels in order
+    move down the tree from the roots, in reverse they accumulate up from the headwaters.
+
+    Parameters
+    ----------
+    down : np.ndarray
+        The index of the downstream node of each node, -1 for the roots.
+
+    Returns:
+    -------
+    list[np.ndarray]
+        The node indexes of each level, the roots first.
+    """
+    down = np.asarray(down, dtype=np.int64)
+    parent = np.where(down >= 0, down, len(down))
+    upstream = np.argsort(parent, kind='stable')
+    counts = np.bincount(parent, minlength=len(down) + 1)
+    offsets = np.concatenate(([0], np.cumsum(counts)))
+
+    result = []
+    frontier = np.flatnonzero(down < 0)
+    while len(frontier):
+        result.append(frontier)
+        lengths = counts[frontier]
+        total = int(lengths.sum())
+        if total == 0:
+            break
+        starts = np.repeat(offsets[frontier] - (np.cumsum(lengths) - lengths), lengths)
+        frontier = upstream[starts + np.arange(total)]
+    return result
+
+
+def first_below(down: np.ndarray, stop: np.ndarray) -> np.ndarray:
+    """Find the first stop at or below each node of a forest by pointer jumping.
+
+    Each pass replaces every pointer with the pointer it points to, so the search takes
+    a number of passes logarithmic in the depth of the forest rather than one per level.
+
+    Parameters
+    ----------
+    down : np.ndarray
+        The index of the downstream node of each node, -1 for the roots.
+    stop : np.ndarray
+        True for the nodes to stop at.
+
+    Returns:
+    -------
+    np.ndarray
+        The index of the first stop at or below each node, -1 if there is none.
+
+    Raises:
+    ------
+    ValueError
+        If the downstream nodes form a loop.
+    """
+    down = np.asarray(down, dtype=np.int64)
+    n = len(down)
+    # A stop n below the roots, so each pass only checks where the pointers point.
+    stop = np.append(np.asarray(stop, dtype=bool), True)
+    pointer = np.append(np.where(stop[:n], np.arange(n), np.where(down >= 0, down, n)), n)
+    active = np.flatnonzero(~stop[pointer[:n]])
+    for _ in range(n.bit_length() + 1):
+        if not len(active):
+            pointer = pointer[:n]
+            pointer[pointer == n] = -1
+            return pointer
+        target = pointer[pointer[active]]
+        pointer[active] = target
+        active = active[~stop[target]]
+    raise ValueError(f"{len(active)} nodes drain to loops")
+
+
+def subtree_sums(down: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """Sum the weights of each node and every node upstream of it.
+
+    The sums are differences of a running total along an Euler tour of the forest, the
+    tour is put in order by list ranking with pointer jumping. It takes a number of
+    passes logarithmic in the number of nodes whatever the shape of the forest, where an
+    accumulation a level at a time takes one pass per level.
+
+    Parameters
+    ----------
+    down : np.ndarray
+        The index of the downstream node of each node, -1 for the roots.
+    weights : np.ndarray
+        The weight of each node.
+
+    Returns:
+    -------
+    np.ndarray
+        The sum of the weights upstream of each node, including its own.
+
+    Raises:
+    ------
+    ValueError
+        If the downstream nodes form a loop.
+    """
+    down = np.asarray(down, dtype=np.int64)
+    weights = np.asarray(weights)
+    n = len(down)
+    if not n:
+        return np.zeros(0, dtype=weights.dtype)
+    # The roots are the children of a virtual node n.
+    parent = np.where(down >= 0, down, n)
+    children = np.argsort(parent, kind='stable')
+    offsets = np.concatenate(([0], np.cumsum(np.bincount(parent, minlength=n + 1))))
+    rank = np.empty(n, dtype=np.int64)
+    rank[children] = np.arange(n)
+
+    # The tour enters node v at v and leaves it at n + v. After entering a node the tour
+    # enters its first child or leaves it, after leaving it enters the next sibling or
+    # leaves the parent.
+    successor = np.empty(2 * n, dtype=np.int64)
+    first = offsets[:n]
+    successor[:n] = np.where(offsets[1:n + 1] > first, children[np.minimum(first, n - 1)], n + np.arange(n))
+    following = rank + 1
+    sibling = following < offsets[parent + 1]
+    successor[n:] = np.where(sibling, children[np.minimum(following, n - 1)], np.where(parent < n, n + parent, -1))
+
+    # The number of steps from each element to the end of the tour.
+    remaining = (successor >= 0).astype(np.int64)
+    pointer = successor.copy()
+    active = np.flatnonzero(pointer >= 0)
+    for _ in range((2 * n).bit_length() + 1):
+        if not len(active):
+            break
+        step = pointer[active]
+        remaining[active] += remaining[step]
+        pointer[active] = pointer[step]
+        active = active[pointer[active] >= 0]
+    if len(active):
+        raise ValueError(f"{int((active < n).sum())} nodes drain to loops")
+
+    position = remaining.max() - remaining
+    total = np.zeros(2 * n, dtype=weights.dtype)
+    total[position[:n]] = weights
+    total = np.cumsum(total)
+    return total[position[n:]] - total[position[:n]] + weights
@@ -0,0 +1,11 @@
+"""Readers and design storms for the Australian Rainfall and Runoff design rainfall data."""
+
+from .arf import arf, catchment_arf
+from .catchment_data import CatchmentData
+from .ensemble import Storm, design_storms
+from .ifd import IFD
+from .pack import DataPack
+from .patterns import TemporalPatterns, aep_bin
+
+__all__ = ["CatchmentData", "DataPack", "IFD", "Storm", "TemporalPatterns", "aep_bin", "arf", "catchment_arf",
+           "design_storms"]
@@ -0,0 +1,97 @@
+import numpy as np
+
+from ..analysis.accumulation import accumulate
+from ..core.catchment import Catchment
+
+# The short duration ARF coefficients of ARR Book 2 Chapter 4, for durations up to
+# 12 hours. The long duration coefficients are regional, see CatchmentData.longarf.
+SHORT_ARF = {"a": 0.287, "b": 0.265, "c": 0.439, "d": 0.36, "e": 2.26e-3, "f": 0.226, "g": 0.125,
+             "h": 0.0141, "i": 0.213}
+SHORT_DURATION = 720.0
+LONG_DURATION = 1440.0
+MAX_AREA = 30000.0
+
+
+def arf(area, durations, aeps, longarf: dict) -> np.ndarray:
+    """Evaluate the ARR areal reduction factors of an area.
+
+    The short duration equation applies up to 12 hours and the regional long duration
+    equation from 24 hours, with a linear blend in duration between them. Below 10 km2
+    the factor at 10 km2 is scaled down towards 1 at 1 km2. The arguments broadcast
+    against each other, so a whole AEP by duration grid is found in one call.
+
+    Parameters
+    ----------
+    area : array_like
+        The catchment area in km2.
+    durations : array_like
+        The durations in minutes.
+    aeps : array_like
+        The AEPs in percent.
+    longarf : dict
+        The long duration coefficients a to i of the region.
+
+    Returns:
+    -------
+    np.ndarray
+        The areal reduction factors, at most 1.
+
+    Raises:
+    ------
+    ValueError
+        If an area is larger than the 30000 km2 the equations were fitted to.
+    """
+    area = np.asarray(area, dtype=float)
+    durations = np.asarray(durations, dtype=float)
+    aeps = np.asarray(aeps, dtype=float)
+    if np.any(area > MAX_AREA):
+        raise ValueError(f"The ARF equations only apply to areas up to {MAX_AREA:g} km2")
+    fitted = np.maximum(area, 10.0)
+    p = 0.3 + np.log10(aeps / 100)
+
+    short = _short(fitted, np.minimum(durations, SHORT_DURATION), p)
+    long = _long(fitted, np.maximum(durations, LONG_DURATION), p, longarf)
+    blend = np.clip((durations - SHORT_DURATION) / (LONG_DURATION - SHORT_DURATION), 0.0, 1.0)
+    factor = np.minimum(short + (long - short) * blend, 1.0)
+
+    small = 1 - 0.6614 * (1 - factor) * (np.maximum(area, 1.0) ** 0.4 - 1)
+    return np.minimum(np.where(area < 10.0, small, factor), 1.0)
+
+
+def catchment_arf(catchment: Catchment, durations, aeps, longarf: dict, node: str | None = None) -> np.ndarray:
+    """Evaluate the ARR areal reduction factors of the area upstream of a node.
+
+    Parameters
+    ----------
+    catchment : Catchment
+        A connected catchment, with basin areas in km2.
+    durations : array_like
+        The durations in minutes.
+    aeps : array_like
+        The AEPs in percent.
+    longarf : dict
+        The long duration coefficients a to i of the region.
+    node : str | None
+        The name of the node, defaults to the outlet.
+
+    Returns:
+    -------
+    np.ndarray
+        The areal reduction factors of the broadcast durations and AEPs.
+    """
+    upstream = accumulate(catchment)
+    k = catchment._out if node is None else upstream.names.index(node)
+    return arf(upstream.area[k], durations, aeps, longarf)
+
+
+def _short(area: np.ndarray, duration: np.ndarray, p: np.ndarray) -> np.ndarray:
+    c = SHORT_ARF
+    return 1 - c["a"] * (area ** c["b"] - c["c"] * np.log10(duration)) * duration ** -c["d"] \
+        + c["e"] * area ** c["f"] * duration ** c["g"] * p \
+        + c["h"] * area ** c["i"] * 10 ** (-0.021 * (duration - 180) ** 2 / 1440) * p
+
+
+def _long(area: np.ndarray, duration: np.ndarray, p: np.ndarray, c: dict) -> np.ndarray:
+    return 1 - c["a"] * (area ** c["b"] - c["c"] * np.log10(duration)) * duration ** -c["d"] \
+        + c["e"] * area ** c["f"] * duration ** c["g"] * p \
+        + c["h"] * 10 ** (c["i"] * area * duration / 1440) * p
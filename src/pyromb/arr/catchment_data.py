@@ -0,0 +1,97 @@
+import csv
+import re
+
+_SECTION = re.compile(r"^\[([A-Z0-9_]+)\]$")
+
+
+class CatchmentData:
+    """The sections of an ARR data hub catchment data file.
+
+    The file holds sections such as [LOSSES], [TP] and [LONGARF] each ending at
+    [END_<NAME>]. The metadata sub-sections, [<NAME>_META], are skipped.
+
+    Parameters
+    ----------
+    sections : dict[str, list[list[str]]]
+        The CSV rows of each section by name.
+    """
+
+    def __init__(self, sections: dict) -> None:
+        self.sections = sections
+
+    @classmethod
+    def read(cls, path: str) -> 'CatchmentData':
+        """Read an ARR data hub catchment data file, e.g. 'sorell_catchment_data.txt'.
+
+        Parameters
+        ----------
+        path : str
+            The path of the text file.
+
+        Returns:
+        -------
+        CatchmentData
+            The sections of the file.
+        """
+        sections = {}
+        name = None
+        with open(path, 'r', newline='') as f:
+            for row in csv.reader(f):
+                row = [c.strip() for c in row]
+                line = row[0] if len(row) == 1 else ""
+                match = _SECTION.match(line)
+                if match is not None:
+                    tag = match.group(1)
+                    if tag.startswith("END_") or tag.endswith("_META"):
+                        name = None
+                    else:
+                        name = tag
+                        sections[name] = []
+                elif (name is not None) and any(row):
+                    sections[name].append(row)
+        return cls(sections)
+
+    def values(self, section: str) -> dict:
+        """The rows of a section as a map of the first cell to the second.
+
+        Parameters
+        ----------
+        section : str
+            The section name, e.g. 'LONGARF'.
+
+        Returns:
+        -------
+        dict
+            The values of the section, as floats where they are numbers.
+
+        Raises:
+        ------
+        KeyError
+            If the file has no such section.
+        """
+        return {row[0]: _number(row[1]) for row in self.sections[section] if len(row) > 1}
+
+    @property
+    def losses(self) -> tuple:
+        """(initial loss in mm, continuing loss in mm/h) of the storm losses."""
+        values = self.values("LOSSES")
+        il = next(v for k, v in values.items() if k.lower().startswith("storm initial loss"))
+        cl = next(v for k, v in values.items() if k.lower().startswith("storm continuing loss"))
+        return (il, cl)
+
+    @property
+    def region(self) -> str:
+        """The label of the temporal pattern region."""
+        return self.values("TP")["Label"]
+
+    @property
+    def longarf(self) -> dict:
+        """The zone and coefficients of the long duration areal reduction factor."""
+        return self.values("LONGARF")
+
+
+def _number(value: str) -> float | str:
+    try:
+        return float(value)
+    except ValueError:
+        return value
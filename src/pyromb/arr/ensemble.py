@@ -0,0 +1,81 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from .arf import arf
+from .pack import DataPack
+
+
+@dataclass
+class Storm:
+    """A design storm of an ensemble.
+
+    Attributes:
+    ----------
+    name : str
+        A unique name of the storm, e.g. '1%_60min_tp1'.
+    aep : float
+        The AEP in percent.
+    duration : float
+        The duration in minutes.
+    pattern : int
+        The number of the temporal pattern within its AEP bin, from 1.
+    timestep : float
+        The time step of the rainfall in minutes.
+    rainfall : np.ndarray
+        The rainfall of each time step in mm.
+    arf : float
+        The areal reduction factor applied to the rainfall.
+    """
+    name: str
+    aep: float
+    duration: float
+    pattern: int
+    timestep: float
+    rainfall: np.ndarray
+    arf: float = 1.0
+
+
+def design_storms(pack: DataPack, aeps, durations, region: str | None = None, area: float | None = None):
+    """Generate the design storms of every AEP, duration and temporal pattern.
+
+    The storms are yielded one AEP and duration at a time so an ensemble of thousands of
+    storms is never held in memory. The depths and areal reduction factors of every AEP
+    and duration are each found in one call.
+
+    Parameters
+    ----------
+    pack : DataPack
+        A data pack with an IFD table and temporal patterns.
+    aeps : array_like
+        The AEPs in percent.
+    durations : array_like
+        The durations in minutes.
+    region : str | None
+        The temporal pattern region, defaults to the region of the catchment data or
+        the only region of the patterns.
+    area : float | None
+        The catchment area in km2, if given the depths are reduced by the ARR areal
+        reduction factors (see arr.arf) with the LONGARF coefficients of the catchment
+        data. The upstream area of a node is found by analysis.accumulate.
+
+    Yields:
+    ------
+    Storm
+        The storms ordered by AEP, duration and pattern.
+    """
+    aeps = np.asarray(aeps, dtype=float)
+    durations = np.asarray(durations, dtype=float)
+    if (region is None) and (pack.catchment is not None) and ("TP" in pack.catchment.sections):
+        region = pack.catchment.region
+    depths = pack.ifd.depth(aeps[:, None], durations[None, :])
+    factors = np.ones_like(depths) if area is None else arf(area, durations[None, :], aeps[:, None],
+                                                             pack.catchment.longarf)
+    depths = depths * factors
+    for a, aep in enumerate(aeps):
+        for d, duration in enumerate(durations):
+            timestep, fractions = pack.patterns.lookup(duration, aep, region)
+            rainfall = depths[a, d] * fractions
+            for k in range(len(rainfall)):
+                yield Storm(f"{aep:g}%_{duration:g}min_tp{k + 1}", float(aep), float(duration), k + 1,
+                            timestep, rainfall[k], float(factors[a, d]))
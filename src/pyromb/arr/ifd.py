@@ -0,0 +1,123 @@
+import csv
+import re
+
+import numpy as np
+import numpy.typing as npt
+
+_UNITS = {"min": 1, "mins": 1, "minute": 1, "minutes": 1, "hour": 60, "hours": 60, "hr": 60, "hrs": 60,
+          "h": 60, "day": 1440, "days": 1440}
+
+
+class IFD:
+    """An intensity frequency duration table of design rainfall depths.
+
+    Depths are interpolated bilinearly in log depth against log duration and log AEP,
+    which follows the near power law shape of the curves.
+
+    Parameters
+    ----------
+    durations : array_like
+        The durations of the table in minutes.
+    aeps : array_like
+        The annual exceedance probabilities of the table in percent, e.g. 1 for 1% AEP.
+    depths : array_like
+        The (durations, aeps) rainfall depths in mm.
+    """
+
+    def __init__(self, durations: npt.ArrayLike, aeps: npt.ArrayLike, depths: npt.ArrayLike) -> None:
+        durations = np.asarray(durations, dtype=float)
+        aeps = np.asarray(aeps, dtype=float)
+        depths = np.asarray(depths, dtype=float).reshape(len(durations), len(aeps))
+        if (len(durations) < 2) or (len(aeps) < 2):
+            raise ValueError("The table needs at least two durations and two AEPs")
+        d = np.argsort(durations)
+        a = np.argsort(aeps)
+        self.durations = durations[d]
+        self.aeps = aeps[a]
+        self.depths = depths[np.ix_(d, a)]
+        self._log = np.log(self.depths)
+
+    @classmethod
+    def read(cls, path: str) -> 'IFD':
+        """Read a design rainfall depth table in the Bureau of Meteorology CSV layout.
+
+        The table starts at the row whose first cell is 'Duration', the other cells of
+        that row are AEP labels such as '63.2%', '50%#' or '1%'. Each duration is read
+        from a 'Duration in min' column if there is one, otherwise from its label, e.g.
+        '10 min', '2 hour' or '1 day'.
+
+        Parameters
+        ----------
+        path : str
+            The path of the CSV file.
+
+        Returns:
+        -------
+        IFD
+            The table.
+
+        Raises:
+        ------
+        ValueError
+            If the file has no table.
+        """
+        with open(path, 'r', newline='') as f:
+            rows = [[c.strip() for c in row] for row in csv.reader(f)]
+        start = next((k for k, row in enumerate(rows) if row and row[0].lower().startswith("duration")), None)
+        if start is None:
+            raise ValueError(f"{path} has no rainfall depth table")
+        header = rows[start]
+        minutes = next((k for k, c in enumerate(header) if "min" in c.lower()), None)
+        columns = [k for k, c in enumerate(header) if (k != 0) and (k != minutes) and c]
+
+        durations, depths = [], []
+        for row in rows[start + 1:]:
+            if (len(row) <= max(columns)) or not row[0]:
+                break
+            durations.append(float(row[minutes]) if minutes is not None else _minutes(row[0]))
+            depths.append([float(row[k]) for k in columns])
+        aeps = [float(re.sub(r"[^0-9.]", "", header[k])) for k in columns]
+        return cls(durations, aeps, depths)
+
+    def depth(self, aep: npt.ArrayLike, duration: npt.ArrayLike) -> np.ndarray:
+        """Interpolate the rainfall depth for AEPs and durations.
+
+        Parameters
+        ----------
+        aep : array_like
+            The AEPs in percent.
+        duration : array_like
+            The durations in minutes, broadcast against the AEPs.
+
+        Returns:
+        -------
+        np.ndarray
+            The depths in mm, the broadcast shape of aep and duration.
+
+        Raises:
+        ------
+        ValueError
+            If an AEP or duration is outside the table.
+        """
+        aep, duration = np.broadcast_arrays(np.asarray(aep, dtype=float), np.asarray(duration, dtype=float))
+        for name, values, table in (("AEP", aep, self.aeps), ("duration", duration, self.durations)):
+            if np.any((values < table[0]) | (values > table[-1])):
+                raise ValueError(f"The {name}s must be within {table[0]:g} and {table[-1]:g}")
+        i, tx = _bracket(np.log(self.durations), np.log(duration))
+        j, ty = _bracket(np.log(self.aeps), np.log(aep))
+        L = self._log
+        return np.exp((1 - tx) * (1 - ty) * L[i, j] + tx * (1 - ty) * L[i + 1, j]
+                      + (1 - tx) * ty * L[i, j + 1] + tx * ty * L[i + 1, j + 1])
+
+
+def _minutes(label: str) -> float:
+    match = re.match(r"^\s*([0-9.]+)\s*([a-zA-Z]+)", label)
+    if (match is None) or (match.group(2).lower() not in _UNITS):
+        raise ValueError(f"Cannot read the duration {label}")
+    return float(match.group(1)) * _UNITS[match.group(2).lower()]
+
+
+def _bracket(grid: np.ndarray, x: np.ndarray) -> tuple:
+    """The index of the grid interval holding each value and the fraction along it."""
+    i = np.clip(np.searchsorted(grid, x, side='right') - 1, 0, len(grid) - 2)
+    return i, (x - grid[i]) / (grid[i + 1] - grid[i])
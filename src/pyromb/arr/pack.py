@@ -0,0 +1,100 @@
+import json
+import os
+
+import numpy as np
+
+from .catchment_data import CatchmentData
+from .ifd import IFD
+from .patterns import TemporalPatterns
+
+
+class DataPack:
+    """The ARR design rainfall inputs of a catchment.
+
+    Parameters
+    ----------
+    ifd : IFD | None
+        The design rainfall depths.
+    patterns : TemporalPatterns | None
+        The temporal patterns.
+    catchment : CatchmentData | None
+        The data hub catchment data.
+    """
+
+    def __init__(self, ifd: IFD | None = None,
+                 patterns: TemporalPatterns | None = None,
+                 catchment: CatchmentData | None = None) -> None:
+        self.ifd = ifd
+        self.patterns = patterns
+        self.catchment = catchment
+
+    @classmethod
+    def load(cls, ifd: str | None = None,
+             patterns: str | None = None,
+             catchment: str | None = None,
+             cache: str | None = None) -> 'DataPack':
+        """Read the files of a data pack, through an on disk cache if given.
+
+        The cache is a .npz file of the parsed arrays. It is used while the size and
+        modification time of every source file match those it was written from, and
+        written again otherwise.
+
+        Parameters
+        ----------
+        ifd : str | None
+            The path of the IFD depth table CSV.
+        patterns : str | None
+            The path of the temporal pattern increments CSV.
+        catchment : str | None
+            The path of the data hub catchment data file.
+        cache : str | None
+            The path of the .npz cache, written as given whatever its extension.
+
+        Returns:
+        -------
+        DataPack
+            The parsed data pack.
+        """
+        sources = json.dumps([_stamp(p) for p in (ifd, patterns, catchment)])
+        if (cache is not None) and os.path.exists(cache):
+            with np.load(cache) as data:
+                if str(data['sources']) == sources:
+                    return cls._fromArrays(data)
+
+        pack = cls(IFD.read(ifd) if ifd else None,
+                   TemporalPatterns.read(patterns) if patterns else None,
+                   CatchmentData.read(catchment) if catchment else None)
+        if cache is not None:
+            # Through a file, np.savez would append .npz to the path and never find it again.
+            with open(cache, 'wb') as f:
+                np.savez(f, sources=np.array(sources), **pack._arrays())
+        return pack
+
+    def _arrays(self) -> dict:
+        arrays = {}
+        if self.ifd is not None:
+            arrays |= {'ifd_durations': self.ifd.durations, 'ifd_aeps': self.ifd.aeps, 'ifd_depths': self.ifd.depths}
+        if self.patterns is not None:
+            p = self.patterns
+            arrays |= {'tp_events': p.events, 'tp_durations': p.durations, 'tp_timesteps': p.timesteps,
+                       'tp_regions': p.regions, 'tp_bins': p.bins, 'tp_increments': p.increments}
+        if self.catchment is not None:
+            arrays['catchment'] = np.array(json.dumps(self.catchment.sections))
+        return arrays
+
+    @classmethod
+    def _fromArrays(cls, data: np.lib.npyio.NpzFile) -> 'DataPack':
+        ifd = IFD(data['ifd_durations'], data['ifd_aeps'], data['ifd_depths']) if 'ifd_depths' in data else None
+        patterns = None
+        if 'tp_events' in data:
+            patterns = TemporalPatterns(*(data[f'tp_{k}'] for k in
+                                          ('events', 'durations', 'timesteps', 'regions', 'bins', 'increments')))
+        catchment = CatchmentData(json.loads(str(data['catchment']))) if 'catchment' in data else None
+        return cls(ifd, patterns, catchment)
+
+
+def _stamp(path: str | None) -> list | None:
+    if path is None:
+        return None
+    stat = os.stat(path)
+    return [os.path.abspath(path), stat.st_size, stat.st_mtime_ns]
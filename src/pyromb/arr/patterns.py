@@ -0,0 +1,132 @@
+import csv
+
+import numpy as np
+import numpy.typing as npt
+
+# The AEP bins of the ARR temporal patterns, frequent patterns are for AEPs of 14.4% and
+# more and rare patterns for AEPs under 3.2%.
+FREQUENT = 14.4
+RARE = 3.2
+
+
+def aep_bin(aep: float) -> str:
+    """The ARR temporal pattern bin of an AEP in percent.
+
+    Parameters
+    ----------
+    aep : float
+        The AEP in percent.
+
+    Returns:
+    -------
+    str
+        'frequent', 'intermediate' or 'rare'.
+    """
+    if aep >= FREQUENT:
+        return "frequent"
+    if aep >= RARE:
+        return "intermediate"
+    return "rare"
+
+
+class TemporalPatterns:
+    """The ARR temporal pattern increments of a region.
+
+    Parameters
+    ----------
+    events : array_like
+        The event id of each pattern.
+    durations : array_like
+        The duration of each pattern in minutes.
+    timesteps : array_like
+        The time step of each pattern in minutes.
+    regions : array_like
+        The region of each pattern.
+    bins : array_like
+        The AEP bin of each pattern, 'frequent', 'intermediate' or 'rare'.
+    increments : array_like
+        The (patterns, steps) rainfall of each time step in percent of the depth, padded
+        with zeros.
+    """
+
+    def __init__(self, events: npt.ArrayLike, durations: npt.ArrayLike, timesteps: npt.ArrayLike,
+                 regions: npt.ArrayLike, bins: npt.ArrayLike, increments: npt.ArrayLike) -> None:
+        self.events = np.asarray(events, dtype=np.int64)
+        self.durations = np.asarray(durations, dtype=float)
+        self.timesteps = np.asarray(timesteps, dtype=float)
+        self.regions = np.asarray(regions, dtype=str)
+        self.bins = np.asarray(bins, dtype=str)
+        self.increments = np.asarray(increments, dtype=float).reshape(len(self.events), -1)
+        self._lookups: dict = {}
+
+    @classmethod
+    def read(cls, path: str) -> 'TemporalPatterns':
+        """Read an ARR data hub increments file, e.g. 'sorell_increments.csv'.
+
+        Each row holds EventID, Duration, TimeStep, Region and AEP followed by the
+        increments of the pattern.
+
+        Parameters
+        ----------
+        path : str
+            The path of the CSV file.
+
+        Returns:
+        -------
+        TemporalPatterns
+            The patterns.
+        """
+        with open(path, 'r', newline='') as f:
+            rows = [[c.strip() for c in row] for row in csv.reader(f) if row]
+        header = [c.lower() for c in rows[0]]
+        columns = [header.index(c) for c in ("eventid", "duration", "timestep", "region", "aep")]
+        first = max(columns) + 1
+        body = rows[1:]
+        steps = max((sum(1 for c in row[first:] if c) for row in body), default=0)
+        increments = np.zeros((len(body), steps))
+        for k, row in enumerate(body):
+            values = [float(c) for c in row[first:] if c]
+            increments[k, :len(values)] = values
+        e, d, t, r, a = ([row[c] for row in body] for c in columns)
+        return cls([int(float(x)) for x in e], [float(x) for x in d], [float(x) for x in t],
+                   r, [x.lower() for x in a], increments)
+
+    def lookup(self, duration: float, aep: float, region: str | None = None) -> tuple:
+        """The patterns of a duration and AEP.
+
+        Lookups are memoised by region, duration and AEP bin.
+
+        Parameters
+        ----------
+        duration : float
+            The storm duration in minutes.
+        aep : float
+            The AEP in percent.
+        region : str | None
+            The region of the patterns, defaults to the only region in the file.
+
+        Returns:
+        -------
+        tuple
+            (timestep, fractions) where fractions is the (patterns, steps) rainfall of
+            each time step as a fraction of the storm depth.
+
+        Raises:
+        ------
+        KeyError
+            If there are no patterns for the duration and AEP.
+        """
+        if region is None:
+            regions = np.unique(self.regions)
+            if len(regions) != 1:
+                raise ValueError(f"The patterns cover {len(regions)} regions, choose one")
+            region = str(regions[0])
+        key = (region.lower(), float(duration), aep_bin(aep))
+        if key not in self._lookups:
+            rows = np.flatnonzero((np.char.lower(self.regions) == key[0]) & (self.durations == key[1])
+                                  & (self.bins == key[2]))
+            if not len(rows):
+                raise KeyError(f"No {key[2]} patterns of {duration:g} min in region {region}")
+            steps = int(round(duration / self.timesteps[rows[0]]))
+            self._lookups[key] = (float(self.timesteps[rows[0]]), self.increments[rows, :steps] / 100)
+        return self._lookups[key]
@@ -0,0 +1,6 @@
+from .export import export
+from .region import export_region
+from .storms import write_storms
+from .sweep import SweepReport, sweep
+
+__all__ = ["export", "export_region", "sweep", "SweepReport", "write_storms"]
@@ -0,0 +1,127 @@
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+
+import numpy as np
+
+from ..core.catchment import Catchment
+from ..core.model import Model
+from ..core.traveller import Traveller
+
+
+def export(catchment: Catchment,
+           models: list,
+           directory: str,
+           name: str = "catchment",
+           processes: bool = False) -> dict:
+    """Write the control files of several hydrology models from one connected catchment.
+
+    Every model is given its own Traveller over the same catchment and the writers run
+    concurrently. The topology is read only while the writers run. A thread pool suits
+    the QGIS plugin, a process pool lets the writers run in parallel so the export takes
+    about as long as the slowest model.
+
+    Parameters
+    ----------
+    catchment : Catchment
+        A connected catchment.
+    models : list[Model]
+        The hydrology models to write, e.g. [RORB(), WBNM(), URBS()].
+    directory : str
+        The directory to write the files to.
+    name : str
+        The file name to use, without extension. URBS files are named after the model name,
+        as the .vec file refers to the .cat file by it.
+    processes : bool
+        Use a process pool rather than a thread pool.
+
+    Returns:
+    -------
+    dict
+        The paths written, keyed by model class name.
+
+    Raises:
+    ------
+    ValueError
+        If the catchment is not connected or has nodes that do not drain to its outlet,
+        a model is given twice, two models would write the same file or a file name is
+        not a plain name, see check_name.
+    """
+    check_name(name, "Catchment")
+    for m in models:
+        check_name(getattr(m, 'model_name', name), "Model")
+    if not isinstance(catchment._incidenceMatrixDS, np.ndarray):
+        raise ValueError("The catchment must be connected before it is exported, call connect() first")
+    stranded = catchment._stranded()
+    if stranded:
+        raise ValueError(f"Nodes {', '.join(v.name for v in stranded)} do not drain to the outlet")
+    if len({id(m) for m in models}) != len(models):
+        raise ValueError("Each model can only be exported once")
+    names = [f"{type(m).__name__}:{getattr(m, 'model_name', name)}" for m in models]
+    if len(set(names)) != len(names):
+        raise ValueError("Two models would write the same files")
+
+    os.makedirs(directory, exist_ok=True)
+    with _readOnly(catchment):
+        if processes:
+            state = pickle.dumps(catchment)
+            with ProcessPoolExecutor(max_workers=len(models)) as executor:
+                results = list(executor.map(_writePickled, [state] * len(models), models,
+                                            [directory] * len(models), [name] * len(models)))
+        else:
+            with ThreadPoolExecutor(max_workers=len(models)) as executor:
+                results = list(executor.map(_write, [catchment] * len(models), models,
+                                            [directory] * len(models), [name] * len(models)))
+
+    return {type(m).__name__: paths for m, paths in zip(models, results)}
+
+
+def check_name(name: str, kind: str) -> None:
+    """Check a name used as a file or directory name stays in the directory it is written to.
+
+    Parameters
+    ----------
+    name : str
+        The name, e.g. of a catchment, outlet or scenario.
+    kind : str
+        What is named, for the error message.
+
+    Raises:
+    ------
+    ValueError
+        If the name is empty or holds a path separator or '..'.
+    """
+    # Both separators are rejected on every platform so a manifest builds the same everywhere.
+    if (not name) or (".." in name) or ("/" in name) or ("\\" in name):
+        raise ValueError(f"{kind} name {name!r} must not be empty or hold a path separator or '..'")
+
+
+def _write(catchment: Catchment, model: Model, directory: str, name: str) -> list:
+    """Traverse the catchment for one model and write its files."""
+    vector = Traveller(catchment).getVector(model)
+    paths = []
+    for fileName, content in model.getFiles(vector, getattr(model, 'model_name', name)).items():
+        path = os.path.join(directory, fileName)
+        with open(path, 'w') as f:
+            f.write(content)
+        paths.append(path)
+    return paths
+
+
+def _writePickled(state: bytes, model: Model, directory: str, name: str) -> list:
+    return _write(pickle.loads(state), model, directory, name)
+
+
+@contextmanager
+def _readOnly(catchment: Catchment):
+    """Make the topology arrays of the catchment read only for the duration of the context."""
+    arrays = [catchment._incidenceMatrixDS, catchment._incidenceMatrixUS, catchment._connectionMatrix]
+    flags = [a.flags.writeable for a in arrays]
+    for a in arrays:
+        a.setflags(write=False)
+    try:
+        yield
+    finally:
+        for a, flag in zip(arrays, flags):
+            a.setflags(write=flag)
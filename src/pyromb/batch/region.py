@@ -0,0 +1,72 @@
+import copy
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from ..core.catchment import Catchment
+from .export import check_name, export
+
+
+def export_region(catchment: Catchment,
+                  models: list,
+                  directory: str,
+                  workers: int | None = None,
+                  processes: bool = True) -> dict:
+    """Write the control files of every outlet in a layer set holding many catchments.
+
+    The catchment is split into one catchment per outlet with Catchment.components. Each
+    component is connected and its models are written to a directory named after its
+    outlet confluence. The components are processed in parallel, the largest first.
+
+    Parameters
+    ----------
+    catchment : Catchment
+        The unconnected catchment built from the whole layer set.
+    models : list[Model]
+        The hydrology models to write for every component, e.g. [RORB(), WBNM()]. Each
+        component is given its own copy, URBS models are named after the outlet.
+    directory : str
+        The directory to write each component's directory to.
+    workers : int | None
+        The number of workers, defaults to the number of CPUs.
+    processes : bool
+        Use a process pool rather than a thread pool. Connecting a component is CPU bound
+        so only a process pool connects components in parallel.
+
+    Returns:
+    -------
+    dict
+        The paths written keyed by outlet name then model class name.
+
+    Raises:
+    ------
+    ValueError
+        If a group of connected nodes does not have exactly one outlet, or an outlet name
+        is not a plain name, see check_name.
+    """
+    components = catchment.components()
+    names = [c._vertices[_outlet(c)].name for c in components]
+    for name in names:
+        check_name(name, "Outlet")
+    if len(set(names)) != len(names):
+        raise ValueError("Outlet names must be unique")
+
+    os.makedirs(directory, exist_ok=True)
+    order = sorted(range(len(components)), key=lambda i: -len(components[i]._vertices))
+    workers = max(1, min(workers or os.cpu_count() or 1, len(components) or 1))
+    Executor = ProcessPoolExecutor if processes else ThreadPoolExecutor
+    with Executor(max_workers=workers) as executor:
+        futures = {i: executor.submit(_exportComponent, components[i], models, directory, names[i]) for i in order}
+        return {names[i]: futures[i].result() for i in range(len(components))}
+
+
+def _exportComponent(component: Catchment, models: list, directory: str, name: str) -> dict:
+    component.connect()
+    models = copy.deepcopy(models)
+    for m in models:
+        if hasattr(m, "model_name"):
+            m.model_name = name
+    return export(component, models, os.path.join(directory, name), name)
+
+
+def _outlet(component: Catchment) -> int:
+    return next(i for i, v in enumerate(component._vertices) if getattr(v, "isOut", False))
@@ -0,0 +1,78 @@
+import itertools
+import os
+from collections.abc import Callable, Iterable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from functools import partial
+
+from ..arr.ensemble import Storm
+from ..models.rorb import RORB
+from ..models.wbnm import RunfileWriter
+
+
+def write_storms(storms: Iterable[Storm], directory: str, losses: tuple[float, float] = (0.0, 0.0),
+                 workers: int | None = None) -> dict[str, list[str]]:
+    """Write the WBNM storm blocks and RORB storm files of a design storm ensemble.
+
+    The storms are consumed as they are generated and written by a thread pool, one file
+    per task. At most twice as many files as workers are waiting to be written at a time,
+    so an ensemble of thousands of storms is never held in memory. WBNM gets a
+    STORM_BLOCK per AEP and duration holding all of its temporal patterns, to paste into
+    a runfile or pass to WBNM(storms=...). RORB gets a storm file per storm.
+
+    Parameters
+    ----------
+    storms : Iterable[arr.ensemble.Storm]
+        The storms, ordered by AEP and duration as yielded by arr.ensemble.design_storms.
+    directory : str
+        The directory to write the files to.
+    losses : tuple
+        The (initial loss in mm, continuing loss in mm/h) of the storms.
+    workers : int | None
+        The number of threads, defaults to the ThreadPoolExecutor default.
+
+    Returns:
+    -------
+    dict
+        The paths written, keyed by 'WBNM' and 'RORB', in the order of the storms.
+    """
+    os.makedirs(directory, exist_ok=True)
+    rorb = RORB()
+    paths: dict[str, list[str]] = {"WBNM": [], "RORB": []}
+    workers = workers or min(32, (os.cpu_count() or 1) + 4)
+    limit = 2 * workers
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending: set[Future[None]] = set()
+
+        def submit(path: str, render: Callable[[], str]) -> None:
+            nonlocal pending
+            if len(pending) >= limit:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    future.result()
+            pending.add(executor.submit(_write, path, render))
+
+        for (aep, duration), group in itertools.groupby(storms, key=lambda s: (s.aep, s.duration)):
+            storms_ = list(group)
+            path = os.path.join(directory, _fileName(f"{aep:g}%_{duration:g}min") + ".storm.wbn")
+            paths["WBNM"].append(path)
+            submit(path, partial(_stormBlock, storms_, losses))
+            for storm in storms_:
+                path = os.path.join(directory, _fileName(storm.name) + ".stm")
+                paths["RORB"].append(path)
+                submit(path, partial(rorb.getStormFile, storm, losses))
+        for future in pending:
+            future.result()
+    return paths
+
+
+def _write(path: str, render: Callable[[], str]) -> None:
+    with open(path, 'w') as f:
+        f.write(render())
+
+
+def _stormBlock(storms: list[Storm], losses: tuple[float, float]) -> str:
+    return RunfileWriter({}, storms, losses).stormBlock() + "\n"
+
+
+def _fileName(name: str) -> str:
+    return name.replace("%", "pct")
@@ -0,0 +1,194 @@
+import json
+import math
+import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+
+from ..core.attributes.basin import Basin
+from ..core.catchment import Catchment
+from ..core.model import Model
+from ..core.traveller import Traveller
+from .export import check_name
+
+
+@dataclass
+class SweepReport:
+    """Summary of a scenario sweep.
+
+    Attributes:
+    ----------
+    directory : str
+        The directory the scenario files were written to.
+    manifest : str
+        The path of the manifest listing every scenario and its files.
+    scenarios : list
+        The manifest entries, in the order the scenarios were given.
+    seconds : float
+        The wall time of the sweep.
+    """
+    directory: str
+    manifest: str
+    scenarios: list
+    seconds: float
+
+    @property
+    def count(self) -> int:
+        return len(self.scenarios)
+
+    @property
+    def throughput(self) -> float:
+        """Scenarios written per second."""
+        return self.count / self.seconds if self.seconds > 0 else math.inf
+
+
+def sweep(catchment: Catchment,
+          model: Model,
+          scenarios,
+          directory: str,
+          workers: int | None = None,
+          processes: bool = False) -> SweepReport:
+    """Write a control file for every scenario in a table of parameter overrides.
+
+    The catchment is traversed once. Each worker receives a copy of the catchment and
+    the model with that traversal already done, so every scenario only patches the rows
+    its overrides change.
+
+    Each scenario is a mapping of column to value. The columns are:
+
+    - 'name': The file name of the scenario, defaults to scenario_<n>.
+    - 'fi': The fraction impervious of every basin.
+    - 'fi:<basin>': The fraction impervious of the named basin.
+    - Any key of the model's values (WBNM) or parameters (URBS), e.g. 'LAG_PARAM' or 'alpha'.
+
+    Parameters
+    ----------
+    catchment : Catchment
+        A connected catchment.
+    model : Model
+        The hydrology model to write, its current settings are the base of every scenario.
+    scenarios : list[dict] | pandas.DataFrame
+        The table of overrides, one row per scenario. Missing (NaN) values are not applied.
+    directory : str
+        The directory to write the files and manifest.json to.
+    workers : int | None
+        The number of workers, defaults to the number of CPUs.
+    processes : bool
+        Use a process pool rather than a thread pool.
+
+    Returns:
+    -------
+    SweepReport
+        The manifest entries and throughput of the sweep.
+
+    Raises:
+    ------
+    KeyError
+        If a column is not a known override.
+    ValueError
+        If scenario names are not unique or not plain names, see check_name.
+    """
+    start = time.perf_counter()
+    rows = _records(scenarios)
+    _validate(catchment, model, rows)
+
+    # One traversal, every scenario afterwards is patched.
+    model.getVector(Traveller(catchment))
+    state = pickle.dumps((catchment, model))
+
+    os.makedirs(directory, exist_ok=True)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(rows)))
+    indexed = list(enumerate(rows))
+    chunks = [indexed[i::workers] for i in range(workers)]
+    Executor = ProcessPoolExecutor if processes else ThreadPoolExecutor
+    with Executor(max_workers=workers) as executor:
+        results = executor.map(_runChunk, [state] * workers, chunks, [directory] * workers)
+        entries = [entry for _, entry in sorted((e for chunk in results for e in chunk), key=lambda e: e[0])]
+
+    seconds = time.perf_counter() - start
+    manifest = os.path.join(directory, "manifest.json")
+    with open(manifest, 'w') as f:
+        json.dump({
+            "model": type(model).__name__,
+            "count": len(entries),
+            "seconds": seconds,
+            "throughput": len(entries) / seconds if seconds > 0 else None,
+            "scenarios": entries,
+        }, f, indent=2)
+
+    return SweepReport(directory, manifest, entries, seconds)
+
+
+def _runChunk(state: bytes, chunk: list, directory: str) -> list:
+    """Write the scenarios of one worker from its own copy of the primed catchment and model."""
+    catchment, model = pickle.loads(state)
+    traveller = Traveller(catchment)
+    base = _baseline(catchment, model)
+    entries = []
+    for i, row in chunk:
+        start = time.perf_counter()
+        name = _name(i, row)
+        overrides = _overrides(row)
+        _apply(catchment, model, base, name, overrides)
+        files = model.getFiles(model.getVector(traveller), name)
+        for fileName, content in files.items():
+            with open(os.path.join(directory, fileName), 'w') as f:
+                f.write(content)
+        entries.append((i, {
+            "name": name,
+            "overrides": overrides,
+            "files": list(files),
+            "seconds": time.perf_counter() - start,
+        }))
+    return entries
+
+
+def _records(scenarios) -> list:
+    if hasattr(scenarios, "to_dict"):
+        scenarios = scenarios.to_dict("records")
+    return [dict(row) for row in scenarios]
+
+
+def _name(i: int, row: dict) -> str:
+    return str(row.get("name", f"scenario_{i + 1}"))
+
+
+def _overrides(row: dict) -> dict:
+    return {k: v for k, v in row.items() if k != "name" and not (isinstance(v, float) and math.isnan(v))}
+
+
+def _validate(catchment: Catchment, model: Model, rows: list) -> None:
+    names = [_name(i, row) for i, row in enumerate(rows)]
+    if len(set(names)) != len(names):
+        raise ValueError("Scenario names must be unique")
+    for name in names:
+        check_name(name, "Scenario")
+    basins = {v.name for v in catchment._vertices if isinstance(v, Basin)}
+    settings = set(getattr(model, "values", {})) | set(getattr(model, "parameters", {}))
+    for row in rows:
+        for k in _overrides(row):
+            if k == "fi" or k in settings:
+                continue
+            if k.startswith("fi:") and k[3:] in basins:
+                continue
+            raise KeyError(f"Unknown scenario column {k}")
+
+
+def _baseline(catchment: Catchment, model: Model) -> tuple:
+    basins = {v.name: v for v in catchment._vertices if isinstance(v, Basin)}
+    fi = {name: b.fi for name, b in basins.items()}
+    return (basins, fi, dict(getattr(model, "values", {})), dict(getattr(model, "parameters", {})))
+
+
+def _apply(catchment: Catchment, model: Model, base: tuple, name: str, overrides: dict) -> None:
+    """Reset the catchment and model to the base settings then apply the overrides of a scenario."""
+    basins, fi, values, parameters = base
+    for k, b in basins.items():
+        b.fi = overrides.get(f"fi:{k}", overrides.get("fi", fi[k]))
+    if hasattr(model, "values"):
+        model.values = values | {k: v for k, v in overrides.items() if k in values}
+    if hasattr(model, "parameters"):
+        model.parameters = parameters | {k: v for k, v in overrides.items() if k in parameters}
+    if hasattr(model, "model_name"):
+        model.model_name = name
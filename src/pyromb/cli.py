@@ -0,0 +1,217 @@
+"""Build the control files of many catchments listed in a manifest.
+
+The manifest is a JSON file:
+
+    {
+        "models": ["RORB", {"model": "WBNM", "values": {"LAG_PARAM": 1.6}}],
+        "output": "build",
+        "catchments": [
+            {"name": "creek", "directory": "gis/creek"},
+            {"name": "river", "reaches": "gis/river/r.shp", "basins": "gis/river/b.shp",
+             "centroids": "gis/river/c.shp", "confluences": "gis/river/j.shp", "models": ["URBS"]}
+        ]
+    }
+
+A catchment is either a directory holding reaches.shp, basins.shp, centroids.shp and
+confluences.shp, or the path of each layer. Relative paths are from the manifest. Each
+catchment's files are written to <output>/<name> and a summary of the run to
+<output>/summary.json. The entities of each catchment are validated before they are
+connected, any problems are listed in the summary. A catchment with "outlets": true is a layer set holding many
+catchments, the files of each outlet are written to <output>/<name>/<outlet>. The
+command exits with 1 if any catchment failed.
+"""
+import argparse
+import contextlib
+import json
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .batch.export import export
+from .batch.region import export_region
+from .core.catchment import Catchment
+from .core.gis.builder import Builder
+from .core.gis.shapefile_layer import ShapefileLayer
+from .core.validation import ValidationError, check
+from .models import RORB, URBS, WBNM
+
+MODELS = {"RORB": RORB, "WBNM": WBNM, "URBS": URBS}
+LAYERS = ("reaches", "basins", "centroids", "confluences")
+
+
+def main(argv=None) -> int:
+    """Build the catchments of a manifest from the command line.
+
+    Parameters
+    ----------
+    argv : list[str] | None
+        The command line arguments, defaults to sys.argv.
+
+    Returns:
+    -------
+    int
+        The exit status, 1 if any catchment failed and 2 if the manifest is invalid.
+    """
+    parser = argparse.ArgumentParser(prog="pyromb", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("manifest", help="the JSON manifest of catchments")
+    parser.add_argument("-o", "--output", help="the output directory, overrides the manifest")
+    parser.add_argument("-m", "--models", nargs="+", choices=sorted(MODELS),
+                        help="the models to build, overrides the manifest")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="the number of worker processes, defaults to the number of CPUs")
+    args = parser.parse_args(argv)
+
+    try:
+        jobs, output = _jobs(args.manifest, args.output, args.models)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"pyromb: invalid manifest: {e}", file=sys.stderr)
+        return 2
+
+    summary = build(jobs, output, args.workers)
+    for r in summary["catchments"]:
+        if r["status"] != "ok":
+            print(f"FAILED {r['name']}: {r['error']}", file=sys.stderr)
+    print(f"{summary['succeeded']} built, {summary['failed']} failed in {summary['seconds']:.1f}s, "
+          f"summary written to {os.path.join(output, 'summary.json')}")
+    return 1 if summary["failed"] else 0
+
+
+def build(jobs: list, output: str, workers: int | None = None) -> dict:
+    """Build each catchment in a process pool and write the summary report.
+
+    Parameters
+    ----------
+    jobs : list[dict]
+        The catchments to build, each with a name, the path of each layer and its models.
+    output : str
+        The directory to write the files and summary.json to.
+    workers : int | None
+        The number of worker processes, defaults to the number of CPUs.
+
+    Returns:
+    -------
+    dict
+        The summary report.
+    """
+    start = time.perf_counter()
+    os.makedirs(output, exist_ok=True)
+    results = {}
+    workers = max(1, min(workers or os.cpu_count() or 1, len(jobs) or 1))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(_build, job, output): job["name"] for job in jobs}
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                # The worker died rather than reporting the failure itself.
+                results[name] = {"name": name, "status": "failed", "seconds": None, "files": [],
+                                 "error": f"{type(e).__name__}: {e}", "diagnostics": []}
+
+    catchments = [results[job["name"]] for job in jobs]
+    failed = sum(r["status"] != "ok" for r in catchments)
+    summary = {
+        "workers": workers,
+        "seconds": time.perf_counter() - start,
+        "succeeded": len(catchments) - failed,
+        "failed": failed,
+        "catchments": catchments,
+    }
+    with open(os.path.join(output, "summary.json"), 'w') as f:
+        json.dump(summary, f, indent=2)
+    return summary
+
+
+def _build(job: dict, output: str) -> dict:
+    """Build one catchment and write its files, reporting rather than raising failures."""
+    start = time.perf_counter()
+    result = {"name": job["name"], "status": "ok", "seconds": None, "files": [], "error": None, "diagnostics": []}
+    try:
+        # The layers are closed once built, or as soon as any fails to open or build.
+        with contextlib.ExitStack() as stack:
+            layers = {}
+            for k in LAYERS:
+                layers[k] = ShapefileLayer(job[k])
+                stack.callback(layers[k].close)
+            builder = Builder()
+            catchment = Catchment(builder.confluence(layers["confluences"]),
+                                  builder.basin(layers["centroids"], layers["basins"]),
+                                  builder.reach(layers["reaches"]))
+            warnings = check(catchment, layers["centroids"], layers["basins"], components=job["outlets"])
+            result["diagnostics"] = [d.asdict() for d in warnings]
+        models = [_model(spec, job["name"]) for spec in job["models"]]
+        directory = os.path.join(output, job["name"])
+        if job["outlets"]:
+            # Already in a worker process, the outlets share its threads.
+            paths = export_region(catchment, models, directory, processes=False)
+            result["files"] = sorted(p for outlet in paths.values() for files in outlet.values() for p in files)
+        else:
+            catchment.connect()
+            paths = export(catchment, models, directory, job["name"])
+            result["files"] = sorted(p for files in paths.values() for p in files)
+    except ValidationError as e:
+        result["status"] = "failed"
+        result["error"] = str(e)
+        result["diagnostics"] = [d.asdict() for d in e.diagnostics]
+    except Exception as e:
+        result["status"] = "failed"
+        result["error"] = f"{type(e).__name__}: {e}"
+        result["traceback"] = traceback.format_exc()
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def _model(spec, name: str):
+    """Create a model from its manifest entry, either a name or a dict with its settings.
+
+    Raises a KeyError for a setting the model does not have, which fails the catchment.
+    """
+    if isinstance(spec, str):
+        spec = {"model": spec}
+    model = MODELS[spec["model"]]()
+    for key in spec.keys() - {"model"}:
+        settings = getattr(model, key, None) if key in ("parameters", "values") else None
+        if not isinstance(settings, dict):
+            raise KeyError(f"Unknown setting {key} for {spec['model']}")
+        unknown = sorted(spec[key].keys() - settings.keys())
+        if unknown:
+            raise KeyError(f"Unknown {key} {', '.join(unknown)} for {spec['model']}")
+    if isinstance(model, URBS):
+        model.model_name = name
+        model.parameters |= spec.get("parameters", {})
+    elif isinstance(model, WBNM):
+        model.values |= {"CATCHMENT_NAME": name} | spec.get("values", {})
+    return model
+
+
+def _jobs(manifest: str, output: str | None, models: list | None) -> tuple:
+    """Read the manifest into the catchments to build and the output directory."""
+    with open(manifest) as f:
+        content = json.load(f)
+    root = os.path.dirname(os.path.abspath(manifest))
+    output = output or os.path.join(root, content.get("output", "build"))
+    jobs = []
+    for i, entry in enumerate(content["catchments"]):
+        default = os.path.basename(os.path.normpath(entry.get("directory", f"catchment_{i + 1}")))
+        name = str(entry.get("name") or default)
+        directory = os.path.join(root, entry.get("directory", ""))
+        job = {"name": name, "models": models or entry.get("models") or content.get("models") or ["RORB"],
+               "outlets": bool(entry.get("outlets", False))}
+        for k in LAYERS:
+            job[k] = os.path.join(root, entry[k]) if k in entry else os.path.join(directory, f"{k}.shp")
+        for spec in job["models"]:
+            kind = spec if isinstance(spec, str) else spec["model"]
+            if kind not in MODELS:
+                raise ValueError(f"Unknown model {kind} for {name}")
+        jobs.append(job)
+    names = [job["name"] for job in jobs]
+    if len(set(names)) != len(names):
+        raise ValueError("Catchment names must be unique")
+    return jobs, output
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,17 @@
 import numpy as np
 
-from ..math import geometry
+from ..math.spatial import GridIndex
+from .attributes.basin import Basin
 from .attributes.confluence import Confluence
 from .attributes.node import Node
 from .attributes.reach import Reach
+from .geometry.point import Point
+from .instrumentation import instrumented
+from .monitor import Monitor
+
+# Reach ends and centroids further than this from every node or basin are not snapped
+# by Catchment.connect, Catchment.addReach and Builder.basin.
+SNAPPING_DISTANCE = 999
 
 
 class Catchment:
@@ -21,38 +29,46 @@ class Catchment:
     """
 
     def __init__(self, confluences: list = [], basins: list = [],  reaches: list = []) -> None:
-        self._edges: list[Reach] = reaches
+        self._edges: list[Reach] = list(reaches)
         self._vertices: list[Node] = confluences + basins
         self._incidenceMatrixDS: list = []
         self._incidenceMatrixUS: list = []
+        self._connectionMatrix = np.zeros((len(self._vertices), len(self._edges)), dtype=int)
         self._out = 0
         self._endSentinel = -1
+        self._topologyVersion = 0
+        self._intervals = None
+        # The (start, end) nodes of each reach when already snapped, e.g. by components.
+        self._ends = None
+        # The arrays the topology arrays are views of, with room to grow, see _resize.
+        self._buffers = None
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state['_buffers'] = None
+        return state
 
-    def connect(self) -> tuple:
+    @instrumented("catchment.connect", lambda args, result: len(args[0]._edges))
+    def connect(self, monitor: Monitor | None = None) -> tuple:
         """Connect the individual attributes to create the catchment.
 
+        Parameters
+        ----------
+        monitor : Monitor | None
+            Reports progress and checks for cancellation once per reach snapped.
+
         Returns:
         -------
         tuple
             (downstream, upstream) incidence matricies of the catchment tree.
         """
         connectionMatrix = np.zeros((len(self._vertices), len(self._edges)), dtype=int)
-        for i, edge in enumerate(self._edges):
-            s = edge.getStart()
-            e = edge.getEnd()
-            minStart = 999
-            minEnd = 999
-            closestStart = 0
-            closestEnd = 0
-            for j, vert in enumerate(self._vertices):
-                tempStart = geometry.length([vert, s])
-                tempEnd = geometry.length([vert, e])
-                if tempStart < minStart:
-                    closestStart = j
-                    minStart = tempStart
-                if tempEnd < minEnd:
-                    closestEnd = j
-                    minEnd = tempEnd
+        ends, self._ends = self._ends, None
+        if ends is None:
+            ends = self._snap(monitor)
+        elif monitor is not None:
+            monitor.update(len(self._edges), len(self._edges))
+        for i, (closestStart, closestEnd) in enumerate(ends):
             connectionMatrix[closestStart][i] = 1
             connectionMatrix[closestEnd][i] = 2
 
@@ -110,5 +126,835 @@ class Catchment:
                 i += 1
         self._incidenceMatrixDS = newIncidenceDS.copy()
         self._incidenceMatrixUS = newIncidenceUS.copy()
+        self._connectionMatrix = connectionMatrix
+        self._topologyVersion += 1
 
         return (self._incidenceMatrixDS, self._incidenceMatrixUS)
+
+    def components(self) -> list['Catchment']:
+        """Split the catchment into one catchment per outlet.
+
+        A single set of layers can hold many independent catchments, each draining to its 
+        own outlet confluence. The reaches are snapped to the nodes as in connect and the 
+        nodes joined by reaches are grouped with a union find, linear in the number of nodes 
+        and reaches once snapped. Each component keeps the order of its confluences, basins 
+        and reaches and must be connected before it is traversed, which reuses the snapped
+        ends unless the component is changed first.
+
+        Returns:
+        -------
+        list[Catchment]
+            A catchment for each outlet, in the order of the outlets.
+
+        Raises:
+        ------
+        ValueError
+            If a group of connected nodes has no outlet or more than one.
+        """
+        parent = list(range(len(self._vertices)))
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        ends = self._snap()
+        for start, end in ends:
+            a, b = find(start), find(end)
+            if a != b:
+                parent[max(a, b)] = min(a, b)
+
+        nodes = {}
+        for i in range(len(self._vertices)):
+            nodes.setdefault(find(i), []).append(i)
+        reaches = {}
+        for j, (start, _) in enumerate(ends):
+            reaches.setdefault(find(start), []).append(j)
+
+        errors = []
+        components = []
+        for root, members in nodes.items():
+            outlets = [i for i in members if isinstance(self._vertices[i], Confluence) and self._vertices[i].isOut]
+            names = ", ".join(self._vertices[i].name for i in members)
+            if len(outlets) != 1:
+                errors.append(f"Nodes {names} have {len(outlets)} outlets")
+                continue
+            confluences = [i for i in members if isinstance(self._vertices[i], Confluence)]
+            basins = [i for i in members if isinstance(self._vertices[i], Basin)]
+            local = {i: k for k, i in enumerate(confluences + basins)}
+            edges = reaches.get(root, [])
+            component = Catchment([self._vertices[i] for i in confluences], [self._vertices[i] for i in basins],
+                                  [self._edges[j] for j in edges])
+            component._ends = [(local[ends[j][0]], local[ends[j][1]]) for j in edges]
+            components.append((outlets[0], component))
+        if errors:
+            raise ValueError("Each group of connected nodes must have one outlet: " + "; ".join(errors))
+        return [c for _, c in sorted(components, key=lambda c: c[0])]
+
+    def addReach(self, reach: Reach) -> int:
+        """Add a reach to the connected catchment.
+
+        The ends of the reach are snapped to the nearest nodes within the SNAPPING_DISTANCE,
+        as in connect. One end must drain to the outlet, the other becomes its upstream
+        node. If the upstream node heads a subtree that was not yet connected, only that
+        subtree is oriented.
+
+        Parameters
+        ----------
+        reach : Reach
+            The reach to add.
+
+        Returns:
+        -------
+        int
+            The index of the new reach.
+
+        Raises:
+        ------
+        ValueError
+            If an end of the reach is not near any node, the reach would create a cycle,
+            does not join the catchment or the upstream node already has a downstream
+            reach.
+        """
+        start = self._closestVertex(reach.getStart())
+        end = self._closestVertex(reach.getEnd())
+        if (start == -1) or (end == -1):
+            raise ValueError(f"Reach {reach.name} has an end further than {SNAPPING_DISTANCE} from every node")
+        if start == end:
+            raise ValueError(f"Reach {reach.name} starts and ends at the same node")
+        startOut = self._drainsToOutlet(start)
+        endOut = self._drainsToOutlet(end)
+        if startOut and endOut:
+            raise ValueError(f"Reach {reach.name} would create a cycle in the catchment")
+        if not (startOut or endOut):
+            raise ValueError(f"Reach {reach.name} is not connected to the catchment")
+        ds, us = (start, end) if startOut else (end, start)
+        if self._downstreamReach(us) != self._endSentinel:
+            raise ValueError(f"Node {self._vertices[us].name} already has a downstream reach")
+
+        tour = self._cachedTour()
+        j = self._appendReach(reach, start, end)
+        self._incidenceMatrixDS[us][j] = ds
+        self._incidenceMatrixUS[ds][j] = us
+        oriented = self._orient(us)
+        if tour is not None:
+            tour = _attach(self._relink(tour, [us] + oriented), us)
+        self._patched(tour)
+        return j
+
+    def removeReach(self, reach: Reach) -> None:
+        """Remove a reach from the connected catchment.
+
+        The subtree upstream of the reach keeps its orientation but no longer drains to 
+        the outlet, it can be joined again with addReach(). Until then the catchment
+        cannot be traversed, see _stranded.
+
+        Parameters
+        ----------
+        reach : Reach
+            The reach to remove.
+        """
+        tour = self._cachedTour()
+        j = self._edges.index(reach)
+        self._deleteReach(j)
+        if (tour is not None) and (j in tour[4]):
+            us = tour[4].index(j)
+            index, entry, exit, order, reaches, down = _detach(tour, us)
+            tour = (index, entry, exit, order, [r - 1 if r > j else r for r in reaches], down)
+            tour = self._relink(tour, [us])
+        elif tour is not None:
+            tour = tour[:4] + ([r - 1 if r > j else r for r in tour[4]], tour[5])
+        self._patched(tour)
+
+    def splitReach(self, reach: Reach, confluence: Confluence, name: str = "") -> tuple:
+        """Split a reach in two at a new confluence.
+
+        The confluence is inserted at the reach segment closest to it. The upstream part 
+        keeps the name of the reach, the downstream part is given the new name.
+
+        Parameters
+        ----------
+        reach : Reach
+            The reach to split.
+        confluence : Confluence
+            The new confluence to insert. 
+        name : str
+            The name of the downstream reach, defaults to '<reach name>_ds'.
+
+        Returns:
+        -------
+        tuple
+            (upstream, downstream) reaches replacing the split reach.
+        """
+        tour = self._cachedTour()
+        j = self._edges.index(reach)
+        us = self._upstreamNode(j)
+        ds = self._incidenceMatrixDS[us][j]
+
+        # Split the geometry at the segment closest to the confluence.
+        points = np.array([p.coordinates() for p in reach.toVector()], dtype=float)
+        k = _closestSegment(points, np.array(confluence.coordinates(), dtype=float))
+        c = [confluence.coordinates()]
+        head = [tuple(p) for p in points[:k + 1]] + c
+        tail = c + [tuple(p) for p in points[k + 1:]]
+        startAtUs = self._connectionMatrix[us][j] == 1
+        if not startAtUs:
+            head, tail = tail, head
+        name = name if name else f"{reach.name}_ds"
+        upper = Reach(reach.name, head, reach.type, reach.slope)
+        lower = Reach(name, tail, reach.type, reach.slope)
+
+        ci = self._appendVertex(confluence)
+        self._edges[j] = upper
+        self._connectionMatrix[:, j] = 0
+        self._connectionMatrix[us][j] = 1 if startAtUs else 2
+        self._connectionMatrix[ci][j] = 2 if startAtUs else 1
+        jn = self._appendReach(lower, ci if startAtUs else ds, ds if startAtUs else ci)
+        self._incidenceMatrixDS[us][j] = ci
+        self._incidenceMatrixUS[ds][j] = self._endSentinel
+        self._incidenceMatrixUS[ci][j] = us
+        self._incidenceMatrixDS[ci][jn] = ds
+        self._incidenceMatrixUS[ds][jn] = ci
+        if tour is not None:
+            index, entry, exit, order, reaches, down = tour
+            index = dict(index)
+            index[confluence] = ci
+            tour = (index, np.append(entry, -1), np.append(exit, 0), order, reaches + [-1], down + [-1])
+            tour = _attach(self._relink(_detach(tour, us), [us, ci]), ci)
+        self._patched(tour)
+        return (upper, lower)
+
+    def mergeBasins(self, basin: Basin, into: Basin) -> Basin:
+        """Merge a basin into a neighbouring basin.
+
+        The basin must either drain directly into the other basin or share its downstream 
+        node. The areas are summed and the fraction impervious is area weighted. Reaches 
+        upstream of the merged basin are redirected into the remaining basin and the 
+        downstream reach of the merged basin is removed.
+
+        Parameters
+        ----------
+        basin : Basin
+            The basin to remove.
+        into : Basin
+            The basin that absorbs the removed basin.
+
+        Returns:
+        -------
+        Basin
+            The remaining basin.
+
+        Raises:
+        ------
+        ValueError
+            If the basins are not neighbours.
+        """
+        b = self._vertices.index(basin)
+        t = self._vertices.index(into)
+        if not (isinstance(basin, Basin) and isinstance(into, Basin)):
+            raise ValueError("Only basins can be merged")
+        bj = self._downstreamReach(b)
+        if bj == self._endSentinel:
+            raise ValueError(f"Basin {basin.name} does not drain to the catchment")
+        bds = self._incidenceMatrixDS[b][bj]
+        tj = self._downstreamReach(t)
+        tds = self._incidenceMatrixDS[t][tj] if tj != self._endSentinel else self._endSentinel
+        if bds != t and bds != tds:
+            raise ValueError(f"Basin {basin.name} is not a neighbour of {into.name}")
+
+        area = into.area + basin.area
+        if area > 0:
+            into.fi = (into.fi * into.area + basin.fi * basin.area) / area
+        into.area = area
+
+        # Redirect the upstream reaches of the merged basin.
+        for j in np.flatnonzero(self._incidenceMatrixUS[b] != self._endSentinel):
+            u = self._incidenceMatrixUS[b][j]
+            self._incidenceMatrixDS[u][j] = t
+            self._incidenceMatrixUS[t][j] = u
+            self._incidenceMatrixUS[b][j] = self._endSentinel
+            self._connectionMatrix[t][j] = self._connectionMatrix[b][j]
+            self._connectionMatrix[b][j] = 0
+
+        self._deleteReach(bj)
+        self._deleteVertex(b)
+        self._topologyVersion += 1
+        return into
+
+    def coarsen(self, threshold: float) -> dict:
+        """Merge small basins and collapse series reaches to shrink the catchment.
+
+        Walking up from the headwaters, a basin smaller than the threshold is merged into
+        the basin it drains into. Basins draining to a confluence are instead merged into
+        the largest basin sharing that confluence, and basins with no neighbouring basin
+        are kept. Merged areas count towards the threshold further down, the areas are
+        summed and the fraction impervious is area weighted as in mergeBasins. Confluences
+        other than the outlet with a single upstream reach are then removed and the reaches
+        either side of them joined into one, with a length weighted slope, if they are
+        of the same type.
+
+        The merges are planned over the traversal intervals and the topology arrays are
+        rebuilt once, so coarsening takes time near linear in the size of the catchment.
+
+        Parameters
+        ----------
+        threshold : float
+            Basins with a smaller area are merged, in the units of Basin.area.
+
+        Returns:
+        -------
+        dict[str, str]
+            The name of every node and reach before coarsening mapped to the name of the
+            node or reach holding it after. Merged basins and their downstream reaches map
+            to the basin they were merged into, collapsed confluences and joined reaches
+            map to the joined reach.
+        """
+        n = len(self._vertices)
+        _, entry, _, order, reach, down = self._tour()
+        up = [[] for _ in range(n)]
+        for k, d in enumerate(down):
+            if d >= 0:
+                up[d].append(k)
+
+        parent = list(range(n))
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        isBasin = [isinstance(v, Basin) for v in self._vertices]
+        area = [v.area if b else 0.0 for v, b in zip(self._vertices, isBasin)]
+        impervious = [v.area * v.fi if b else 0.0 for v, b in zip(self._vertices, isBasin)]
+        merged = set()
+
+        def merge(b: int, t: int) -> None:
+            parent[b] = t
+            area[t] += area[b]
+            impervious[t] += impervious[b]
+            merged.add(t)
+
+        # Upstream nodes come before their downstream node in the reversed walk.
+        for k in reversed(order):
+            if not isBasin[k]:
+                siblings = [s for s in up[k] if isBasin[s] and (parent[s] == s)]
+                if len(siblings) > 1:
+                    t = max(siblings, key=lambda s: area[s])
+                    for s in siblings:
+                        if (s != t) and (area[s] < threshold):
+                            merge(s, t)
+            elif (k != self._out) and (area[k] < threshold) and (down[k] >= 0) and isBasin[down[k]]:
+                merge(k, down[k])
+
+        mapping = {}
+        kept = [k for k in range(n) if parent[k] == k]
+        for k in range(n):
+            mapping[self._vertices[k].name] = self._vertices[find(k)].name
+            if (parent[k] != k) and (reach[k] >= 0):
+                mapping[self._edges[reach[k]].name] = self._vertices[find(k)].name
+        for t in merged:
+            if find(t) == t:
+                basin = self._vertices[t]
+                basin.fi = impervious[t] / area[t] if area[t] > 0 else basin.fi
+                basin.area = area[t]
+
+        # Confluences with one upstream reach of the same type as their downstream reach.
+        downstream = {k: find(down[k]) if down[k] >= 0 else -1 for k in kept}
+        upstream = {}
+        for k in kept:
+            if downstream[k] >= 0:
+                upstream.setdefault(downstream[k], []).append(k)
+        collapsible = {c for c in kept
+                       if (not isBasin[c]) and (c != self._out) and (downstream[c] >= 0)
+                       and (len(upstream.get(c, [])) == 1) and (entry[c] >= 0)
+                       and (self._edges[reach[upstream[c][0]]].type == self._edges[reach[c]].type)}
+
+        nodes = [k for k in kept if k not in collapsible]
+        links = []
+        for k in nodes:
+            if downstream[k] < 0:
+                continue
+            chain = [(k, reach[k])]
+            d = downstream[k]
+            while d in collapsible:
+                chain.append((d, reach[d]))
+                d = downstream[d]
+            links.append((k, d) + self._join(chain))
+            for c, j in chain:
+                mapping[self._edges[j].name] = links[-1][2].name
+                if c != k:
+                    mapping[self._vertices[c].name] = links[-1][2].name
+
+        rows = {k: m for m, k in enumerate(nodes)}
+        ds = np.full((len(nodes), len(links)), self._endSentinel, dtype=int)
+        us = ds.copy()
+        connection = np.zeros_like(ds)
+        for j, (k, d, _, startAtUs) in enumerate(links):
+            ds[rows[k]][j] = rows[d]
+            us[rows[d]][j] = rows[k]
+            connection[rows[k]][j] = 1 if startAtUs else 2
+            connection[rows[d]][j] = 2 if startAtUs else 1
+
+        self._vertices = [self._vertices[k] for k in nodes]
+        self._edges = [r for _, _, r, _ in links]
+        self._incidenceMatrixDS = ds
+        self._incidenceMatrixUS = us
+        self._connectionMatrix = connection
+        self._out = rows[self._out]
+        self._topologyVersion += 1
+        return mapping
+
+    def updateNode(self, node: Node, **attributes) -> None:
+        """Change the attributes of a node.
+
+        Attribute changes do not alter the topology so nothing is reconnected.
+
+        Parameters
+        ----------
+        node : Node
+            The node to update.
+        **attributes
+            The attribute values to set, e.g. area=1.2, fi=0.3
+
+        Raises:
+        ------
+        AttributeError
+            If an attribute cannot be set on the node.
+        ValueError
+            If the outlet is changed, this requires the catchment to be connected again.
+        """
+        if node not in self._vertices:
+            raise ValueError(f"Node {node.name} is not in the catchment")
+        if 'isOut' in attributes:
+            raise ValueError("Changing the outlet requires the catchment to be connected again")
+        for k in attributes:
+            prop = getattr(type(node), k, None)
+            if not (isinstance(prop, property) and prop.fset is not None):
+                raise AttributeError(f"{type(node).__name__} has no settable attribute {k}")
+        for k, v in attributes.items():
+            setattr(node, k, v)
+
+    def upstream(self, node: Node) -> list:
+        """The nodes upstream of a node, including the node.
+
+        Takes time linear in the number of nodes returned once the traversal intervals 
+        have been computed, see _tour.
+
+        Parameters
+        ----------
+        node : Node
+            The node to query.
+
+        Returns:
+        -------
+        list[Node]
+            The node followed by every node that drains to it, in depth first order.
+        """
+        index, entry, exit, order, _, _ = self._tour()
+        i = index[node]
+        if entry[i] < 0:
+            return [node]
+        return [self._vertices[k] for k in order[entry[i]:exit[i]]]
+
+    def isUpstream(self, node: Node, of: Node) -> bool:
+        """True if a node drains to another node, or is that node.
+
+        Parameters
+        ----------
+        node : Node
+            The possibly upstream node.
+        of : Node
+            The possibly downstream node.
+
+        Returns:
+        -------
+        bool
+            If node is in the sub-catchment above of.
+        """
+        index, entry, exit, _, _, _ = self._tour()
+        i, k = index[node], index[of]
+        if node is of:
+            return True
+        return (entry[k] >= 0) and (entry[k] <= entry[i] < exit[k])
+
+    def extract(self, node: Confluence) -> 'Catchment':
+        """The sub-catchment above a confluence as its own connected Catchment.
+
+        The sub-catchment shares the node and reach objects of this catchment, the 
+        confluence becomes its outlet. It can be traversed and written by any model like 
+        a catchment built from layers. Takes time linear in the size of the sub-catchment 
+        once the traversal intervals have been computed.
+
+        Parameters
+        ----------
+        node : Confluence
+            The confluence at the outlet of the sub-catchment, e.g. a gauge.
+
+        Returns:
+        -------
+        Catchment
+            The connected sub-catchment.
+
+        Raises:
+        ------
+        ValueError
+            If the node is not a confluence that drains to the outlet.
+        """
+        if not isinstance(node, Confluence):
+            raise ValueError(f"Sub-catchments must end at a confluence, {node.name} is not one")
+        index, entry, exit, order, reach, down = self._tour()
+        i = index[node]
+        if entry[i] < 0:
+            raise ValueError(f"Node {node.name} does not drain to the outlet")
+
+        members = sorted(order[entry[i]:exit[i]], key=lambda k: (not isinstance(self._vertices[k], Confluence), k))
+        reaches = sorted(reach[k] for k in members if k != i)
+        rows = {k: n for n, k in enumerate(members)}
+        columns = {j: n for n, j in enumerate(reaches)}
+
+        sub = Catchment([self._vertices[k] for k in members], [], [self._edges[j] for j in reaches])
+        ds = np.full((len(members), len(reaches)), self._endSentinel, dtype=int)
+        us = ds.copy()
+        for k in members:
+            if k != i:
+                ds[rows[k]][columns[reach[k]]] = rows[down[k]]
+                us[rows[down[k]]][columns[reach[k]]] = rows[k]
+        sub._incidenceMatrixDS = ds
+        sub._incidenceMatrixUS = us
+        sub._connectionMatrix = np.asarray(self._connectionMatrix)[np.ix_(members, reaches)].copy()
+        sub._out = rows[i]
+        sub._topologyVersion = 1
+        return sub
+
+    def _tour(self) -> tuple:
+        """The Euler tour intervals of the catchment tree.
+
+        A depth first walk from the outlet numbers each node as it is entered. The nodes 
+        upstream of node i are then those entered from entry[i] up to exit[i]. The 
+        intervals are cached, addReach, removeReach and splitReach patch them for the
+        subtree they change while other changes to the topology walk the tree again.
+
+        Returns:
+        -------
+        tuple
+            (index, entry, exit, order, reach, down) where index maps each node to its 
+            index, order lists the node indexes in the order they are entered, and reach 
+            and down are the indexes of each node's downstream reach and node, or -1. 
+            Nodes that do not drain to the outlet have an entry of -1.
+        """
+        cached = self._cachedTour()
+        if cached is not None:
+            return cached
+
+        n = len(self._vertices)
+        reach, down = self._links()
+        down = down.tolist()
+
+        up = [[] for _ in range(n)]
+        for k, d in enumerate(down):
+            if d >= 0:
+                up[d].append(k)
+        entry = np.full(n, -1, dtype=int)
+        order = []
+        stack = [self._out] if n else []
+        while stack:
+            k = stack.pop()
+            entry[k] = len(order)
+            order.append(k)
+            stack.extend(reversed(up[k]))
+        size = np.ones(n, dtype=int)
+        for k in reversed(order):
+            if down[k] >= 0:
+                size[down[k]] += size[k]
+        exit = entry + size
+
+        tour = ({v: k for k, v in enumerate(self._vertices)}, entry, exit, order, reach.tolist(), down)
+        self._intervals = (self._topologyVersion, tour)
+        return tour
+
+    def _cachedTour(self) -> tuple | None:
+        """The cached Euler tour if it is up to date, None otherwise."""
+        cached = getattr(self, '_intervals', None)
+        return cached[1] if (cached is not None) and (cached[0] == self._topologyVersion) else None
+
+    def _patched(self, tour: tuple | None) -> None:
+        """Mark a change to the topology, caching the tour patched to match it if any."""
+        self._topologyVersion += 1
+        if tour is not None:
+            self._intervals = (self._topologyVersion, tour)
+
+    def _relink(self, tour: tuple, nodes: list) -> tuple:
+        """The tour with the downstream reach and node of some nodes read again."""
+        index, entry, exit, order, reach, down = tour
+        reach, down = list(reach), list(down)
+        for k in nodes:
+            j = self._downstreamReach(k)
+            reach[k] = int(j) if j != self._endSentinel else -1
+            down[k] = int(self._incidenceMatrixDS[k][j]) if j != self._endSentinel else -1
+        return (index, entry, exit, order, reach, down)
+
+    def _stranded(self) -> list:
+        """The nodes that do not drain to the outlet."""
+        _, entry, _, _, _, _ = self._tour()
+        return [self._vertices[k] for k in np.flatnonzero(entry < 0)]
+
+    def _links(self) -> tuple:
+        """The downstream reach and node of every node as arrays, -1 where there is none."""
+        n = len(self._vertices)
+        matrix = np.asarray(self._incidenceMatrixDS, dtype=int)
+        if matrix.size == 0:
+            matrix = np.full((n, 1), self._endSentinel, dtype=int)
+        connected = matrix != self._endSentinel
+        reach = np.where(connected.any(axis=1), connected.argmax(axis=1), -1)
+        down = np.where(reach >= 0, matrix[np.arange(n), np.maximum(reach, 0)], -1)
+        return (reach, down)
+
+    def _join(self, chain: list) -> tuple:
+        """Join a chain of (upstream node, reach) pairs into one reach.
+
+        Returns (reach, startAtUs), a single reach is returned as it is.
+        """
+        k, j = chain[0]
+        if len(chain) == 1:
+            return (self._edges[j], self._connectionMatrix[k][j] == 1)
+        points = []
+        for c, j in chain:
+            vector = [p.coordinates() for p in self._edges[j].toVector()]
+            if self._connectionMatrix[c][j] != 1:
+                vector.reverse()
+            points.extend(vector[1:] if points else vector)
+        lengths = [self._edges[j].length() for _, j in chain]
+        first = self._edges[chain[0][1]]
+        slope = sum(self._edges[j].slope * l for (_, j), l in zip(chain, lengths)) / sum(lengths) \
+            if sum(lengths) > 0 else first.slope
+        return (Reach(first.name, points, first.type, slope), True)
+
+    def _closestVertex(self, point: Point) -> int:
+        """The index of the node closest to a point, -1 if none is within the snapping
+        distance of connect."""
+        return _nearest(GridIndex([v.coordinates() for v in self._vertices]), point)
+
+    def _snap(self, monitor: Monitor | None = None) -> list:
+        """The (start, end) indexes of the nodes closest to the ends of each reach.
+
+        The nodes are found through a GridIndex, an end with no node nearer than the
+        SNAPPING_DISTANCE is snapped to the first node.
+        """
+        index = GridIndex([v.coordinates() for v in self._vertices])
+        ends = []
+        for i, edge in enumerate(self._edges):
+            ends.append(tuple(max(_nearest(index, p), 0) for p in (edge.getStart(), edge.getEnd())))
+            if monitor is not None:
+                monitor.update(i + 1, len(self._edges))
+        return ends
+
+    def _downstreamReach(self, i: int) -> int:
+        """The index of the reach downstream of the ith node or the end sentinel if none."""
+        j = np.flatnonzero(self._incidenceMatrixDS[i] != self._endSentinel)
+        return int(j[0]) if len(j) else self._endSentinel
+
+    def _upstreamNode(self, j: int) -> int:
+        """The index of the node upstream of the jth reach."""
+        i = np.flatnonzero(self._incidenceMatrixDS[:, j] != self._endSentinel)
+        if not len(i):
+            raise ValueError(f"Reach {self._edges[j].name} is not connected")
+        return int(i[0])
+
+    def _drainsToOutlet(self, i: int) -> bool:
+        """True if the ith node drains to the outlet of the catchment."""
+        seen = set()
+        while i != self._out:
+            j = self._downstreamReach(i)
+            if (j == self._endSentinel) or (i in seen):
+                return False
+            seen.add(i)
+            i = self._incidenceMatrixDS[i][j]
+        return True
+
+    def _orient(self, root: int) -> list:
+        """Orient the reaches upstream of a node that are not yet connected.
+
+        Only the subtree above the node is searched. Returns the nodes at the upstream end
+        of the reaches oriented.
+        """
+        oriented = []
+        stack = [root]
+        while stack:
+            i = stack.pop()
+            for j in np.flatnonzero(self._connectionMatrix[i]):
+                if (self._incidenceMatrixDS[:, j] != self._endSentinel).any():
+                    continue
+                ends = np.flatnonzero(self._connectionMatrix[:, j])
+                for k in ends[ends != i]:
+                    self._incidenceMatrixDS[k][j] = i
+                    self._incidenceMatrixUS[i][j] = k
+                    stack.append(int(k))
+                    oriented.append(int(k))
+        return oriented
+
+    def _resize(self, rows: int, columns: int) -> None:
+        """Make the topology arrays rows by columns views of their buffers.
+
+        A buffer too short in either dimension is replaced by one with a quarter more room
+        in it than needed, so adding nodes and reaches one at a time takes amortised time
+        linear in a row or column. Arrays set directly, e.g. by connect, are taken as the
+        buffers.
+        """
+        arrays = (self._incidenceMatrixDS, self._incidenceMatrixUS, self._connectionMatrix)
+        buffers = getattr(self, '_buffers', None)
+        if (buffers is None) or any(a.base is not b for a, b in zip(arrays, buffers)):
+            buffers = arrays
+        height, width = buffers[0].shape
+        if (rows > height) or (columns > width):
+            height = height if rows <= height else rows + rows // 4 + 4
+            width = width if columns <= width else columns + columns // 4 + 4
+            grown = []
+            for a, fill in zip(arrays, (self._endSentinel, self._endSentinel, 0)):
+                b = np.full((height, width), fill, dtype=int)
+                b[:a.shape[0], :a.shape[1]] = a
+                grown.append(b)
+            buffers = tuple(grown)
+        self._buffers = buffers
+        self._incidenceMatrixDS, self._incidenceMatrixUS, self._connectionMatrix = \
+            (b[:rows, :columns] for b in buffers)
+
+    def _appendReach(self, reach: Reach, start: int, end: int) -> int:
+        """Add a column for a reach to the topology arrays, returning its index."""
+        self._ends = None
+        j = len(self._edges)
+        self._resize(len(self._vertices), j + 1)
+        self._incidenceMatrixDS[:, j] = self._endSentinel
+        self._incidenceMatrixUS[:, j] = self._endSentinel
+        self._connectionMatrix[:, j] = 0
+        self._edges.append(reach)
+        self._connectionMatrix[start][j] = 1
+        self._connectionMatrix[end][j] = 2
+        return j
+
+    def _appendVertex(self, node: Node) -> int:
+        """Add a row for a node to the topology arrays, returning its index."""
+        self._ends = None
+        i = len(self._vertices)
+        self._resize(i + 1, len(self._edges))
+        self._incidenceMatrixDS[i] = self._endSentinel
+        self._incidenceMatrixUS[i] = self._endSentinel
+        self._connectionMatrix[i] = 0
+        self._vertices.append(node)
+        return i
+
+    def _deleteReach(self, j: int) -> None:
+        """Remove the jth reach column from the topology arrays.
+
+        The later columns move down one in place and the last is cleared.
+        """
+        self._ends = None
+        for a, fill in ((self._incidenceMatrixDS, self._endSentinel), (self._incidenceMatrixUS, self._endSentinel),
+                        (self._connectionMatrix, 0)):
+            a[:, j:-1] = a[:, j + 1:]
+            a[:, -1] = fill
+        self._resize(len(self._vertices), len(self._edges) - 1)
+        del self._edges[j]
+
+    def _deleteVertex(self, i: int) -> None:
+        """Remove the ith node row from the topology arrays and renumber the nodes after it.
+
+        The later rows move down one in place and the last is cleared.
+        """
+        self._ends = None
+        for a, fill in ((self._incidenceMatrixDS, self._endSentinel), (self._incidenceMatrixUS, self._endSentinel),
+                        (self._connectionMatrix, 0)):
+            a[i:-1] = a[i + 1:]
+            a[-1] = fill
+        self._resize(len(self._vertices) - 1, len(self._edges))
+        self._incidenceMatrixDS[self._incidenceMatrixDS > i] -= 1
+        self._incidenceMatrixUS[self._incidenceMatrixUS > i] -= 1
+        if self._out > i:
+            self._out -= 1
+        del self._vertices[i]
+
+
+def _nearest(index: GridIndex, point: Point) -> int:
+    """The index of the point of the index nearest a point, -1 if none is nearer than the
+    SNAPPING_DISTANCE."""
+    if not len(index):
+        return -1
+    j, d = index.nearest(point.coordinates(), SNAPPING_DISTANCE)
+    return j if d < SNAPPING_DISTANCE else -1
+
+
+def _detach(tour: tuple, k: int) -> tuple:
+    """The Euler tour with the subtree above node k cut out of the walk.
+
+    The nodes walked after the subtree move back by its size and its ancestors shrink by
+    it, the subtree is left with an entry of -1 as it no longer drains to the outlet.
+    """
+    index, entry, exit, order, reach, down = tour
+    if entry[k] < 0:
+        return tour
+    start, end = int(entry[k]), int(exit[k])
+    block = np.array(order[start:end], dtype=int)
+    n = end - start
+    entry, exit = entry.copy(), exit.copy()
+    walked = entry >= 0
+    exit[walked & (entry < start) & (exit >= end)] -= n
+    after = walked & (entry >= end)
+    entry[after] -= n
+    exit[after] -= n
+    entry[block] = -1
+    exit[block] = 0
+    return (index, entry, exit, order[:start] + order[end:], reach, down)
+
+
+def _attach(tour: tuple, k: int) -> tuple:
+    """The Euler tour with the subtree above node k walked, if k drains to a node on the walk.
+
+    Only the subtree is walked, children in index order as in Catchment._tour, and it is
+    entered after the nodes draining to the same node with a lower index.
+    """
+    index, entry, exit, order, reach, down = tour
+    d = down[k]
+    if (d < 0) or (entry[d] < 0):
+        return tour
+    downs = np.asarray(down, dtype=int)
+    children = np.argsort(downs, kind='stable')
+    sortedDown = downs[children]
+
+    def up(i: int) -> list:
+        lo, hi = np.searchsorted(sortedDown, (i, i + 1))
+        return children[lo:hi].tolist()
+
+    block = []
+    stack = [k]
+    while stack:
+        i = stack.pop()
+        block.append(i)
+        stack.extend(reversed(up(i)))
+    position = {i: p for p, i in enumerate(block)}
+    size = np.ones(len(block), dtype=int)
+    for p in range(len(block) - 1, 0, -1):
+        size[position[down[block[p]]]] += size[p]
+
+    later = [s for s in up(d) if s > k]
+    at = int(entry[later[0]]) if later else int(exit[d])
+    n = len(block)
+    entry, exit = entry.copy(), exit.copy()
+    walked = entry >= 0
+    exit[walked & (entry <= entry[d]) & (exit > entry[d])] += n
+    after = walked & (entry >= at)
+    entry[after] += n
+    exit[after] += n
+    rows = np.array(block, dtype=int)
+    entry[rows] = at + np.arange(n)
+    exit[rows] = entry[rows] + size
+    return (index, entry, exit, order[:at] + block + order[at:], reach, down)
+
+
+def _closestSegment(points: np.ndarray, p: np.ndarray) -> int:
+    """The index of the first point of the line segment closest to p."""
+    a = points[:-1]
+    ab = points[1:] - a
+    lengthSq = np.maximum((ab ** 2).sum(axis=1), np.finfo(float).tiny)
+    t = np.clip(((p - a) * ab).sum(axis=1) / lengthSq, 0, 1)
+    return int(np.argmin(np.hypot(*(a + ab * t[:, None] - p).T)))
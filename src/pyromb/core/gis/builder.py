@@ -5,6 +5,8 @@ from ..attributes.reach import Reach, ReachType
 from ..geometry.line import pointVector
 from ..geometry.point import Point
 from ..gis.vector_layer import VectorLayer
+from ..instrumentation import instrumented
+from ..monitor import Monitor
 
 
 class Builder:
@@ -17,13 +19,16 @@ class Builder:
     The objects returned from the Builder are to be passed to the Catcment. 
     """
 
-    def reach(self, reach: VectorLayer) -> list:
+    @instrumented("builder.reach")
+    def reach(self, reach: VectorLayer, monitor: Monitor | None = None) -> list:
         """Build the reach objects.
 
         Parameters
         ----------
         reach : VectorLayer
             The vector layer which the reaches are in.
+        monitor : Monitor | None
+            Reports progress and checks for cancellation once per reach.
 
         Returns:
         -------
@@ -35,9 +40,12 @@ class Builder:
             s = reach.geometry(i)
             r = reach.record(i)
             reaches.append(Reach(r['id'], s, ReachType(r['t']), r['s']))
+            if monitor is not None:
+                monitor.update(i + 1, len(reach))
         return reaches
 
-    def basin(self, centroid: VectorLayer, basin: VectorLayer) -> list:
+    @instrumented("builder.basin")
+    def basin(self, centroid: VectorLayer, basin: VectorLayer, monitor: Monitor | None = None) -> list:
         """Build the basin objects.
 
         Parameters
@@ -46,6 +54,8 @@ class Builder:
             The vector layer which the centroids are in.
         basin : VectorLayer
             The vector layer which the basins are in.
+        monitor : Monitor | None
+            Reports progress and checks for cancellation once per centroid matched.
 
         Returns:
         -------
@@ -70,15 +80,20 @@ class Builder:
             a = geometry.polygon_area(pointVector(basin.geometry(min)))
             fi = r['fi']
             basins.append(Basin(r['id'], p[0], p[1], (a / 1E6), fi))
+            if monitor is not None:
+                monitor.update(i + 1, len(centroid))
         return basins
 
-    def confluence(self, confluence: VectorLayer) -> list:
+    @instrumented("builder.confluence")
+    def confluence(self, confluence: VectorLayer, monitor: Monitor | None = None) -> list:
         """Build the confluence objects
 
         Parameters
         ----------
         confluence : VectorLayer
             The vector layer the confluences are on. 
+        monitor : Monitor | None
+            Reports progress and checks for cancellation once per confluence.
 
         Returns:
         -------
@@ -91,4 +106,6 @@ class Builder:
             p = s[0]
             r = confluence.record(i)
             confluences.append(Confluence(r['id'], p[0], p[1],  bool(r['out'])))
+            if monitor is not None:
+                monitor.update(i + 1, len(confluence))
         return confluences
@@ -0,0 +1,368 @@
+import math
+
+import numpy as np
+
+from ...analysis import tree
+from ..attributes.basin import Basin
+from ..attributes.confluence import Confluence
+from ..attributes.reach import Reach, ReachType
+from ..instrumentation import instrumented
+
+# The ESRI D8 codes and the (row, column) step of each, east first and clockwise.
+D8_CODES = (1, 2, 4, 8, 16, 32, 64, 128)
+D8_STEPS = ((0, 1), (1, 1), (1, 0), (1, -1), (0, -1), (-1, -1), (-1, 0), (-1, 1))
+
+# The number of rows decoded or derived from the raster at a time.
+_ROWS = 1024
+# The accumulation sweep stops at the first frontier of fewer cells than this.
+_FRONTIER = 256
+
+
+class FlowGrid:
+    """A D8 flow direction grid to build catchment objects from.
+
+    Each cell drains to one of its eight neighbours, coded as in ESRI ArcGIS: 1 east,
+    2 south east, 4 south and so on clockwise to 128 north east. Any other code is a
+    sink or no data. The grid may be a numpy.memmap, it is read a block of rows at a
+    time and every later step works on flat arrays of cell indexes, so there are no
+    loops over cells.
+
+    Flow is accumulated with a topological sweep, each pass takes the frontier of cells
+    whose upstream cells are all done. The frontiers are kept, so later passes move down
+    (or up) the grid a frontier at a time. A pass costs tens of microseconds of numpy
+    calls however small its frontier, so the sweep stops at the first frontier of fewer
+    than 256 cells, keeping the overhead under a fraction of a microsecond per cell. The
+    cells left, e.g. the tail of the main stream or the whole of a grid draining along
+    one serpentine path, are summed over an Euler tour and their links found by pointer
+    jumping, in log2(cells) passes. The build is linear in the number of cells while
+    the frontiers are wide and O(cells log cells) at worst.
+
+    Parameters
+    ----------
+    directions : array_like
+        The (rows, columns) D8 flow direction codes.
+    cellsize : float
+        The width of a cell in metres.
+    origin : tuple
+        The x,y co-ordinates of the top left corner of the grid.
+    elevation : array_like | None
+        The (rows, columns) ground levels in metres, used for the reach slopes.
+    """
+
+    def __init__(self, directions, cellsize: float = 1.0, origin: tuple = (0.0, 0.0), elevation=None) -> None:
+        self.directions = directions
+        self.shape = tuple(np.shape(directions))
+        self.cellsize = float(cellsize)
+        self.origin = (float(origin[0]), float(origin[1]))
+        self.elevation = elevation
+        self._down = None
+        self._sweep = None
+
+    @classmethod
+    def fromDEM(cls, dem, cellsize: float = 1.0, origin: tuple = (0.0, 0.0)) -> 'FlowGrid':
+        """Derive the flow directions of a digital elevation model.
+
+        Each cell drains to the neighbour of steepest descent, cells without a lower
+        neighbour are sinks. Depressions are not filled, the DEM should be
+        hydrologically conditioned. No data cells are NaN.
+
+        Parameters
+        ----------
+        dem : array_like
+            The (rows, columns) ground levels in metres.
+        cellsize : float
+            The width of a cell in metres.
+        origin : tuple
+            The x,y co-ordinates of the top left corner of the grid.
+
+        Returns:
+        -------
+        FlowGrid
+            The flow directions, with the DEM as the elevation.
+        """
+        rows, columns = np.shape(dem)
+        directions = np.zeros((rows, columns), dtype=np.uint8)
+        for top in range(0, rows, _ROWS):
+            bottom = min(top + _ROWS, rows)
+            # The block with a row of padding above and below.
+            above, below = max(top - 1, 0), min(bottom + 1, rows)
+            z = np.full((bottom - top + 2, columns + 2), np.nan)
+            z[1 + above - top:1 + below - top, 1:-1] = dem[above:below]
+            centre = z[1:-1, 1:-1]
+            steepest = np.zeros(centre.shape)
+            for code, (dr, dc) in zip(D8_CODES, D8_STEPS):
+                neighbour = z[1 + dr:z.shape[0] - 1 + dr, 1 + dc:z.shape[1] - 1 + dc]
+                with np.errstate(invalid='ignore'):
+                    drop = (centre - neighbour) / math.hypot(dr, dc)
+                    lower = drop > steepest
+                steepest[lower] = drop[lower]
+                directions[top:bottom][lower] = code
+        return cls(directions, cellsize, origin, dem)
+
+    @classmethod
+    def fromRaw(cls, path: str, shape: tuple, dtype='uint8', dem: bool = False,
+                cellsize: float = 1.0, origin: tuple = (0.0, 0.0)) -> 'FlowGrid':
+        """Memory map a headerless raw raster, e.g. a .bil or .flt band.
+
+        Parameters
+        ----------
+        path : str
+            The path of the raster.
+        shape : tuple
+            The (rows, columns) of the raster.
+        dtype : numpy dtype
+            The cell type, including its byte order, e.g. '<f4'.
+        dem : bool
+            The raster holds ground levels rather than D8 codes.
+        cellsize : float
+            The width of a cell in metres.
+        origin : tuple
+            The x,y co-ordinates of the top left corner of the grid.
+
+        Returns:
+        -------
+        FlowGrid
+            The flow directions.
+        """
+        raster = np.memmap(path, dtype=dtype, mode='r', shape=tuple(shape))
+        if dem:
+            return cls.fromDEM(raster, cellsize, origin)
+        return cls(raster, cellsize, origin)
+
+    def down(self) -> np.ndarray:
+        """The flat index of the cell each cell drains to, -1 for sinks and cells that
+        drain off the grid.
+
+        Returns:
+        -------
+        np.ndarray
+            The downstream cell of each cell in row major order.
+        """
+        if self._down is None:
+            rows, columns = self.shape
+            index = np.int32 if rows * columns < 2 ** 31 else np.int64
+            table = np.zeros((256, 2), dtype=np.int64)
+            valid = np.zeros(256, dtype=bool)
+            for code, step in zip(D8_CODES, D8_STEPS):
+                table[code], valid[code] = step, True
+            down = np.empty(rows * columns, dtype=index)
+            c = np.arange(columns)
+            for top in range(0, rows, _ROWS):
+                bottom = min(top + _ROWS, rows)
+                block = np.asarray(self.directions[top:bottom]).astype(np.int64)
+                known = (block >= 0) & (block < 256)
+                code = np.where(known, block, 0)
+                r2 = np.arange(top, bottom)[:, None] + table[code, 0]
+                c2 = c + table[code, 1]
+                inside = known & valid[code] & (r2 >= 0) & (r2 < rows) & (c2 >= 0) & (c2 < columns)
+                down[top * columns:bottom * columns] = np.where(inside, r2 * columns + c2, -1).ravel()
+            self._down = down
+        return self._down
+
+    def accumulation(self) -> np.ndarray:
+        """The number of cells draining through each cell, including itself.
+
+        Returns:
+        -------
+        np.ndarray
+            The (rows, columns) flow accumulation.
+
+        Raises:
+        ------
+        ValueError
+            If the flow directions contain a loop.
+        """
+        return self._sweepCells()[0].reshape(self.shape)
+
+    @instrumented("flowgrid.build", lambda args, result: len(result[1]))
+    def build(self, threshold: int, outlet: tuple | None = None) -> tuple:
+        """Build the confluences, basins and reaches of the stream network at a threshold.
+
+        Cells draining at least threshold cells are streams. A stream link runs from a
+        headwater or a junction of streams down to the next junction or the outlet, and
+        each link is a basin of the cells that drain to it first. The basin node is half
+        way along its link, a reach joins it to the confluence at the junction below and
+        the confluence at the junction above, if any. The outlet confluence is on the
+        downstream edge of the outlet cell. Nodes and reaches are named c1.., b1.. and
+        r1.., c1 is the outlet.
+
+        Parameters
+        ----------
+        threshold : int
+            The number of cells draining through a cell for it to be a stream.
+        outlet : tuple | None
+            The (row, column) of the outlet cell, defaults to the cell with the largest
+            flow accumulation. Only the cells draining to it are built.
+
+        Returns:
+        -------
+        tuple
+            (confluences, basins, reaches) to pass to the Catchment.
+
+        Raises:
+        ------
+        ValueError
+            If the outlet is not a stream cell or the flow directions contain a loop.
+        """
+        columns = self.shape[1]
+        acc, order, offsets = self._sweepCells()
+        down = self.down()
+        out = int(np.argmax(acc)) if outlet is None else int(outlet[0]) * columns + int(outlet[1])
+        if acc[out] < threshold:
+            raise ValueError(f"The outlet drains {acc[out]} cells, fewer than the threshold of {threshold}")
+        levels = [order[offsets[k]:offsets[k + 1]] for k in range(len(offsets) - 1)]
+        tail = order[offsets[-1]:]
+
+        # Streams are closed downstream, the cell below a stream drains more than it does.
+        stream = acc >= threshold
+        below = np.where(stream & (down >= 0), down, -1)
+        below[out] = -1
+        upstream = np.bincount(below[below >= 0], minlength=len(down))
+        starts = np.flatnonzero(stream & (upstream != 1))
+        link = np.full(len(down), -1, dtype=down.dtype)
+        link[starts] = np.arange(len(starts))
+        for level in levels:
+            s = level[stream[level]]
+            s = s[below[s] >= 0]
+            d = below[s]
+            carry = link[d] < 0
+            link[d[carry]] = link[s[carry]]
+        # Any other stream cell of the tail has one stream cell above it, and takes the
+        # link of the first start up the stream.
+        cells = np.flatnonzero(stream)
+        s = cells[below[cells] >= 0]
+        s = s[upstream[below[s]] == 1]
+        up = np.full(len(down), -1, dtype=np.int64)
+        up[below[s]] = s
+        link[cells] = link[tree.first_below(up, link >= 0)[cells]]
+        # Along a link the accumulation grows downstream.
+        cells = cells[np.argsort(acc[cells], kind='stable')]
+
+        # The link below each link, and the links that drain to the outlet.
+        ends = cells[(below[cells] < 0) | (upstream[np.maximum(below[cells], 0)] != 1)]
+        downLink = np.full(len(starts), -1, dtype=np.int64)
+        downLink[link[ends]] = np.where(below[ends] >= 0, link[np.maximum(below[ends], 0)], -1)
+        keep = tree.first_below(downLink, np.arange(len(starts)) == link[out]) == link[out]
+
+        # Each cell belongs to the link of the first stream cell at or below it, the cells
+        # below a cell of the tail are in the tail.
+        label = link.copy()
+        if len(tail):
+            first = tree.first_below(_within(down, tail), link[tail] >= 0)
+            label[tail] = np.where(first >= 0, link[tail][np.maximum(first, 0)], -1)
+        for level in reversed(levels):
+            free = level[(label[level] < 0) & (down[level] >= 0)]
+            label[free] = label[down[free]]
+        counts = np.bincount(label[label >= 0], minlength=len(starts))
+
+        return self._objects(cells, link, starts, upstream[starts] > 1, downLink, keep, counts, out)
+
+    def _sweepCells(self) -> tuple:
+        """(accumulation, order, offsets) of the topological sweep, the cells of each
+        frontier are order[offsets[k]:offsets[k + 1]], headwaters first, and the cells
+        of the tail, which drain to each other, are order[offsets[-1]:]."""
+        if self._sweep is None:
+            down = self.down()
+            n = len(down)
+            drains = down[down >= 0]
+            pending = np.bincount(drains, minlength=n).astype(np.int32)
+            acc = np.ones(n, dtype=down.dtype)
+            order = np.empty(n, dtype=down.dtype)
+            offsets = [0]
+            frontier = np.flatnonzero(pending == 0).astype(down.dtype)
+            while len(frontier) >= _FRONTIER:
+                order[offsets[-1]:offsets[-1] + len(frontier)] = frontier
+                offsets.append(offsets[-1] + len(frontier))
+                d = down[frontier]
+                flowing = d >= 0
+                d, source = d[flowing], frontier[flowing]
+                if 8 * len(d) > n:
+                    # The first frontiers hold most of the cells, count them in one pass.
+                    acc += np.bincount(d, weights=acc[source], minlength=n).astype(acc.dtype)
+                    pending -= np.bincount(d, minlength=n).astype(np.int32)
+                else:
+                    np.add.at(acc, d, acc[source])
+                    np.add.at(pending, d, np.int32(-1))
+                # Cells drained by several frontier cells appear more than once. Mark each
+                # with the position of one of its appearances, keep only that one.
+                d = d[pending[d] == 0]
+                position = np.arange(1, len(d) + 1, dtype=np.int32)
+                pending[d] = -position
+                frontier = d[pending[d] == -position]
+            if offsets[-1] < n:
+                swept = np.zeros(n, dtype=bool)
+                swept[order[:offsets[-1]]] = True
+                tail = np.flatnonzero(~swept).astype(down.dtype)
+                order[offsets[-1]:] = tail
+                try:
+                    acc[tail] = tree.subtree_sums(_within(down, tail), acc[tail])
+                except ValueError as e:
+                    raise ValueError(f"The flow directions contain loops, {e}") from None
+            self._sweep = (acc, order, np.array(offsets, dtype=np.int64))
+        return self._sweep
+
+    def _xy(self, cells: np.ndarray) -> np.ndarray:
+        """The x,y co-ordinates of the centres of cells."""
+        r, c = np.divmod(np.asarray(cells, dtype=np.int64), self.shape[1])
+        return np.column_stack((self.origin[0] + (c + 0.5) * self.cellsize,
+                                self.origin[1] - (r + 0.5) * self.cellsize))
+
+    def _objects(self, cells, link, starts, junctions, downLink, keep, counts, out) -> tuple:
+        """The catchment objects of the kept links."""
+        columns = self.shape[1]
+        cells = cells[keep[link[cells]]]
+        cells = cells[np.argsort(link[cells], kind='stable')]
+        bounds = np.flatnonzero(np.diff(link[cells])) + 1
+        paths = np.split(self._xy(cells), bounds) if len(cells) else []
+        kept = np.flatnonzero(keep)
+
+        code = int(np.asarray(self.directions[out // columns, out % columns]))
+        step = dict(zip(D8_CODES, D8_STEPS)).get(code, (1, 0))
+        outPoint = self._xy([out])[0] + 0.5 * self.cellsize * np.array([step[1], -step[0]])
+        # The end of each link is the start of the link below, or the outlet.
+        ends = np.where(downLink[kept] >= 0, starts[np.maximum(downLink[kept], 0)], out)
+        endPoints = np.where((downLink[kept] >= 0)[:, None], self._xy(ends), outPoint)
+        if self.elevation is None:
+            drops = np.zeros(len(kept))
+        else:
+            z = np.asarray(self.elevation).reshape(-1)
+            drops = np.maximum(np.asarray(z[starts[kept]], dtype=float) - np.asarray(z[ends], dtype=float), 0.0)
+
+        confluences = [Confluence("c1", float(outPoint[0]), float(outPoint[1]), True)]
+        basins, reaches = [], []
+        for k, path, end, drop in zip(kept, paths, endPoints, drops):
+            line = np.vstack((path, end))
+            upper, lower, middle, length = _halve(line)
+            slope = float(drop / length) if length > 0 else 0.0
+            basins.append(Basin(f"b{len(basins) + 1}", float(middle[0]), float(middle[1]),
+                                counts[k] * self.cellsize ** 2 / 1E6, 0.0))
+            if junctions[k]:
+                confluences.append(Confluence(f"c{len(confluences) + 1}", float(line[0, 0]), float(line[0, 1])))
+                reaches.append(Reach(f"r{len(reaches) + 1}", upper.tolist(), ReachType.NATURAL, slope))
+            reaches.append(Reach(f"r{len(reaches) + 1}", lower.tolist(), ReachType.NATURAL, slope))
+        return confluences, basins, reaches
+
+
+def _within(down: np.ndarray, cells: np.ndarray) -> np.ndarray:
+    """The downstream cells of cells that only drain to each other, as positions in cells."""
+    index = np.full(len(down), -1, dtype=np.int64)
+    index[cells] = np.arange(len(cells))
+    d = down[cells]
+    return np.where(d >= 0, index[np.maximum(d, 0)], -1)
+
+
+def _halve(line: np.ndarray) -> tuple:
+    """Split a polyline at half its length.
+
+    Returns:
+    -------
+    tuple
+        (upper, lower, middle, length) the vertices of each half, the point between them
+        and the length of the line.
+    """
+    run = np.concatenate(([0.0], np.cumsum(np.hypot(*np.diff(line, axis=0).T))))
+    half = run[-1] / 2
+    k = min(int(np.searchsorted(run, half, side='right')), len(line) - 1)
+    t = (half - run[k - 1]) / (run[k] - run[k - 1]) if run[k] > run[k - 1] else 0.0
+    middle = line[k - 1] + t * (line[k] - line[k - 1])
+    return np.vstack((line[:k], middle)), np.vstack((middle, line[k:])), middle, float(run[-1])
@@ -0,0 +1,31 @@
+from .vector_layer import VectorLayer
+
+
+class MemoryLayer(VectorLayer):
+    """A vector layer held in memory.
+
+    Used where the geometry does not come from a shapefile, e.g. synthetic or
+    generated catchments.
+
+    Parameters
+    ----------
+    geometries : list[list[tuple]]
+        The geometry of each vector as a list of (x,y) tuples.
+    records : list[dict]
+        The attributes of each vector.
+    """
+
+    def __init__(self, geometries: list, records: list) -> None:
+        if len(geometries) != len(records):
+            raise ValueError("Each geometry must have a record")
+        self._geometries = geometries
+        self._records = records
+
+    def geometry(self, i: int) -> list:
+        return self._geometries[i]
+
+    def record(self, i: int) -> dict:
+        return self._records[i]
+
+    def __len__(self) -> int:
+        return len(self._geometries)
@@ -0,0 +1,38 @@
+from .vector_layer import VectorLayer
+
+
+class ShapefileLayer(VectorLayer):
+    """A vector layer read from an ESRI shapefile with pyshp.
+
+    pyshp is an optional dependency, it is only needed to read shapefiles outside of a
+    GIS package, e.g. by the pyromb command.
+
+    Parameters
+    ----------
+    path : str
+        The path of the .shp file.
+
+    Raises:
+    ------
+    ImportError
+        If pyshp is not installed.
+    """
+
+    def __init__(self, path: str) -> None:
+        try:
+            import shapefile
+        except ImportError as e:
+            raise ImportError("Reading shapefiles requires pyshp, install it with pip install pyshp") from e
+        self._reader = shapefile.Reader(path)
+
+    def geometry(self, i: int) -> list:
+        return self._reader.shape(i).points
+
+    def record(self, i: int) -> dict:
+        return self._reader.record(i)
+
+    def __len__(self) -> int:
+        return len(self._reader)
+
+    def close(self) -> None:
+        self._reader.close()
@@ -0,0 +1,206 @@
+import contextvars
+import functools
+import json
+import threading
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+
+_active: contextvars.ContextVar[tuple] = contextvars.ContextVar('pyromb_instrumentation', default=())
+_lock = threading.Lock()
+# The [memory at start, peak] of every traced stage running on any thread, by id.
+_open: dict = {}
+# The number of active contexts tracing memory and whether they started tracemalloc.
+_tracers = 0
+_started = False
+
+
+@dataclass
+class StageRecord:
+    """The measurements of one instrumented stage accumulated over a build.
+
+    Attributes:
+    ----------
+    calls : int
+        The number of times the stage ran.
+    seconds : float
+        The total wall time of the stage.
+    peak : int
+        The largest traced memory allocated by a single call, in bytes, above the memory
+        in use when the call started. 0 if memory was not traced.
+    entities : int
+        The total number of entities the stage handled, e.g. reaches built or nodes visited.
+    """
+    calls: int = 0
+    seconds: float = 0.0
+    peak: int = 0
+    entities: int = 0
+
+
+class Instrumentation:
+    """Record the time, memory and entity counts of the build stages run within the context.
+
+    Instrumentation is opt in, the stages cost a single check when no context is active.
+    The stages are the Builder, Catchment.connect, the traversal and the model writers.
+    The active contexts are bound with contextvars, so concurrent builds on other threads
+    or tasks only record their own stages, and threads only record stages for a context
+    copied into them (build_model copies it into its executor). Memory is traced for the
+    whole process with tracemalloc, which runs while any context tracing memory is active.
+
+    >>> with Instrumentation() as probe:
+    ...     vector = Traveller(catchment).getVector(RORB())
+    >>> probe.json("build.json")
+
+    Parameters
+    ----------
+    memory : bool
+        Trace memory with tracemalloc. Tracing slows the build down.
+    """
+
+    def __init__(self, memory: bool = True) -> None:
+        self.memory = memory
+        self.stages: dict[str, StageRecord] = {}
+        self.seconds = 0.0
+        self._lock = threading.Lock()
+        self._start = 0.0
+        self._token = None
+
+    def __enter__(self) -> 'Instrumentation':
+        global _tracers, _started
+        if self.memory:
+            with _lock:
+                if not _tracers:
+                    _started = not tracemalloc.is_tracing()
+                    if _started:
+                        tracemalloc.start()
+                _tracers += 1
+        self._token = _active.set(_active.get() + (self,))
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        global _tracers, _started
+        self.seconds = time.perf_counter() - self._start
+        _active.reset(self._token)
+        self._token = None
+        if self.memory:
+            with _lock:
+                _tracers -= 1
+                if not _tracers and _started:
+                    tracemalloc.stop()
+                    _started = False
+
+    def record(self, stage: str, seconds: float, peak: int, entities: int) -> None:
+        """Add a call of a stage to the record.
+
+        Parameters
+        ----------
+        stage : str
+            The name of the stage.
+        seconds : float
+            The wall time of the call.
+        peak : int
+            The peak memory of the call in bytes.
+        entities : int
+            The number of entities handled by the call.
+        """
+        with self._lock:
+            r = self.stages.setdefault(stage, StageRecord())
+            r.calls += 1
+            r.seconds += seconds
+            r.peak = max(r.peak, peak)
+            r.entities += entities
+
+    def report(self) -> dict:
+        """The measurements of the build.
+
+        Returns:
+        -------
+        dict
+            The total wall time and the record of every stage keyed by stage name.
+        """
+        with self._lock:
+            return {
+                "seconds": self.seconds,
+                "memory": self.memory,
+                "stages": {k: asdict(v) for k, v in self.stages.items()},
+            }
+
+    def json(self, path: str | None = None) -> str:
+        """The report as JSON.
+
+        Parameters
+        ----------
+        path : str | None
+            A file to also write the JSON to.
+
+        Returns:
+        -------
+        str
+            The JSON report.
+        """
+        s = json.dumps(self.report(), indent=2)
+        if path is not None:
+            with open(path, 'w') as f:
+                f.write(s)
+        return s
+
+
+def instrumented(stage: str, entities=None):
+    """Decorate a function as a build stage recorded by every active Instrumentation.
+
+    Parameters
+    ----------
+    stage : str
+        The name of the stage.
+    entities : Callable[[tuple, object], int] | None
+        Counts the entities handled from the call's arguments and result. Defaults to the
+        number of lines of a string result or the length of any other result.
+    """
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            active = _active.get()
+            if not active:
+                return fn(*args, **kwargs)
+            traced = tracemalloc.is_tracing()
+            if traced:
+                with _lock:
+                    _fold()
+                    tracemalloc.reset_peak()
+                    frame = [tracemalloc.get_traced_memory()[0], 0]
+                    _open[id(frame)] = frame
+            start = time.perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+            finally:
+                seconds = time.perf_counter() - start
+                peak = 0
+                if traced:
+                    with _lock:
+                        _fold()
+                        del _open[id(frame)]
+                    peak = max(0, frame[1] - frame[0])
+            count = entities(args, result) if entities is not None else _count(result)
+            for probe in active:
+                probe.record(stage, seconds, peak, count)
+            return result
+        return wrapper
+    return decorate
+
+
+def _count(result) -> int:
+    if isinstance(result, str):
+        return result.count("\n")
+    return len(result)
+
+
+def _fold() -> None:
+    """Fold the traced peak into every running stage, before it is reset or a stage ends.
+
+    The peak of tracemalloc is process wide, so a reset by any stage would lose the peak
+    of the others. Called with the lock held.
+    """
+    peak = tracemalloc.get_traced_memory()[1]
+    for frame in _open.values():
+        frame[1] = max(frame[1], peak)
@@ -20,3 +20,20 @@ class Model(abc.ABC):
             The content of the hydrology control file. 
         """
         pass
+
+    def getFiles(self, vector: str, name: str) -> dict:
+        """Split the control text into the files the hydrology model reads.
+
+        Parameters
+        ----------
+        vector : str
+            The control text returned by getVector.
+        name : str
+            The file name to use, without extension.
+
+        Returns:
+        -------
+        dict
+            The file names and their content.
+        """
+        return {f"{name}.txt": vector}
@@ -0,0 +1,86 @@
+import threading
+
+
+class BuildCancelled(Exception):
+    """Raised inside a build when its CancellationToken has been cancelled."""
+
+
+class CancellationToken:
+    """Signals a running build to stop.
+
+    The token is shared between the caller and the build. Long running loops check the
+    token through a Monitor and raise BuildCancelled once it has been cancelled. The token
+    can be cancelled from any thread.
+    """
+
+    def __init__(self) -> None:
+        self._event = threading.Event()
+
+    def cancel(self) -> None:
+        """Request the build to stop."""
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+
+class Monitor:
+    """Reports the progress of a build stage and checks for cancellation.
+
+    Parameters
+    ----------
+    stage : str
+        The name of the stage, passed to the progress callback.
+    progress : Callable[[str, int, int], None] | None
+        Called with (stage, done, total) as the stage proceeds.
+    token : CancellationToken | None
+        The token checked at every update.
+    """
+
+    def __init__(self, stage: str = "", progress=None, token: CancellationToken | None = None) -> None:
+        self._stage = stage
+        self._progress = progress
+        self._token = token
+        self._reported = -1
+
+    def stage(self, stage: str) -> 'Monitor':
+        """A monitor for another stage sharing the callback and token.
+
+        Parameters
+        ----------
+        stage : str
+            The name of the stage.
+
+        Returns:
+        -------
+        Monitor
+            The monitor of the stage.
+        """
+        return Monitor(stage, self._progress, self._token)
+
+    def update(self, done: int, total: int) -> None:
+        """Record the progress of the stage.
+
+        The progress callback is called at most once per percent of the stage.
+
+        Parameters
+        ----------
+        done : int
+            The number of items processed.
+        total : int
+            The number of items in the stage.
+
+        Raises:
+        ------
+        BuildCancelled
+            If the token has been cancelled.
+        """
+        if (self._token is not None) and self._token.cancelled:
+            raise BuildCancelled(f"Build cancelled during {self._stage}")
+        if self._progress is None:
+            return
+        percent = 100 * done // total if total > 0 else 100
+        if (percent != self._reported) or (done == total):
+            self._reported = percent
+            self._progress(self._stage, done, total)
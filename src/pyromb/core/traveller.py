@@ -4,6 +4,8 @@ from .model import Model
 from .attributes.node import Node
 from .attributes.reach import Reach
 from .catchment import Catchment
+from .instrumentation import instrumented
+from .monitor import Monitor
 
 
 class Traveller:
@@ -19,12 +21,28 @@ class Traveller:
     Parameters
     ----------
     catchment : Catchment
-        A connected catchment to traverse.
+        A connected catchment to traverse, every node must drain to the outlet.
+    monitor : Monitor | None
+        Reports progress and checks for cancellation each time a node is visited.
+
+    Raises:
+    ------
+    ValueError
+        If the catchment is not connected or some nodes do not drain to the outlet, e.g.
+        after Catchment.removeReach, as the walk would leave them out.
     """
 
-    def __init__(self, catchment: Catchment):
+    def __init__(self, catchment: Catchment, monitor: Monitor | None = None):
+        if not isinstance(catchment._incidenceMatrixDS, np.ndarray):
+            raise ValueError("The catchment must be connected before it is traversed, call connect() first")
+        stranded = catchment._stranded()
+        if stranded:
+            raise ValueError(f"Nodes {', '.join(v.name for v in stranded)} do not drain to the outlet, "
+                             "join them with addReach() or connect the catchment again")
         self._catchment: Catchment = catchment
+        self._monitor = monitor
         self._colour = np.zeros(len(catchment._incidenceMatrixDS), dtype=int)
+        self._visited = 0
         self._us = catchment._incidenceMatrixUS
         self._ds = catchment._incidenceMatrixDS
         self._endSentinel = catchment._endSentinel
@@ -43,17 +61,15 @@ class Traveller:
     def getStart(self) -> int:
         """Gets the position of the outlet node of the basin.
         
-        That is the most downstream node. Assumes that there is only one 
-        outlet in a basin. i.e. only one node with no reaches downstream of it.
+        That is the most downstream node, the outlet the catchment was connected from. 
+        A layer set with many outlets is split with Catchment.components first.
 
         Returns:
         -------
         int
             The index of the outlet node. 
         """
-        for i, val in enumerate(self._ds):
-            if sum(val) == (-len(val)):
-                return i
+        return self._catchment._out
 
     def getReach(self, i: int) -> Reach:
         """The downstream reach connected to ith node.
@@ -169,7 +185,7 @@ class Traveller:
         """
         top = self.top(self._pos)
         if top == self._pos:
-            self._colour[self._pos] = 1
+            self._visit(self._pos)
             self._pos = self.down(self._pos)
             return self._pos
         else:
@@ -194,7 +210,7 @@ class Traveller:
         --------
         next : next upstream node
         """
-        self._colour[self._pos] = 1
+        self._visit(self._pos)
         self._pos = self.down(self._pos)
         top = self.top(self._pos)
         if top == self._pos:
@@ -203,6 +219,16 @@ class Traveller:
             self._pos = top
             return self._pos
 
+    def _visit(self, i: int) -> None:
+        """Colour the ith node as visited and report the progress of the walk."""
+        if self._colour[i] == 0:
+            self._colour[i] = 1
+            self._visited += 1
+        if self._monitor is not None:
+            self._monitor.update(self._visited, len(self._colour))
+
+    # A model may patch its previous output without walking, the count is of the nodes either way.
+    @instrumented("traverse", lambda args, result: len(args[0]._catchment._vertices))
     def getVector(self, model: Model) -> str:
         """Produce the vector for the desired hydrology model.
         
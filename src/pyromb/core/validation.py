@@ -0,0 +1,224 @@
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from enum import Enum
+
+from ..math import geometry
+from ..math.spatial import GridIndex
+from .attributes.confluence import Confluence
+from .catchment import SNAPPING_DISTANCE, Catchment
+from .geometry.line import pointVector
+from .gis.vector_layer import VectorLayer
+
+
+class Severity(Enum):
+    ERROR = "error"
+    WARNING = "warning"
+
+
+@dataclass(frozen=True)
+class Diagnostic:
+    """A problem found in the inputs of a catchment.
+
+    Attributes:
+    ----------
+    code : str
+        The kind of problem, e.g. 'duplicate-id' or 'cycle'.
+    severity : Severity
+        Errors produce wrong files or fail the build, warnings may be intended.
+    message : str
+        A description of the problem.
+    entities : tuple[str, ...]
+        The names of the nodes and reaches involved.
+    """
+    code: str
+    severity: Severity
+    message: str
+    entities: tuple = field(default=())
+
+    def asdict(self) -> dict:
+        return asdict(self) | {"severity": self.severity.value}
+
+
+class ValidationError(ValueError):
+    """Raised when the inputs of a catchment have errors.
+
+    Parameters
+    ----------
+    diagnostics : list[Diagnostic]
+        Every diagnostic found, errors and warnings.
+    """
+
+    def __init__(self, diagnostics: list) -> None:
+        self.diagnostics = list(diagnostics)
+        errors = [d.message for d in self.diagnostics if d.severity == Severity.ERROR]
+        super().__init__(f"{len(errors)} errors in the catchment: " + "; ".join(errors))
+
+
+def validate(catchment: Catchment,
+             centroids: VectorLayer | None = None,
+             basins: VectorLayer | None = None,
+             tolerance: float = 1.0,
+             components: bool = False) -> list:
+    """Check the built entities of a catchment before it is connected and traversed.
+
+    The checks take time linear in the number of entities, the reach ends are snapped to
+    the nodes through a grid index and the topology is checked with a union find. The
+    centroids are checked against the basin polygons if both layers are given.
+
+    Parameters
+    ----------
+    catchment : Catchment
+        The catchment built from the layers, connected or not.
+    centroids : VectorLayer | None
+        The centroid layer the basins were built from.
+    basins : VectorLayer | None
+        The basin layer the basins were built from.
+    tolerance : float
+        Reach ends further than this from the nearest node are reported as unsnapped.
+    components : bool
+        Allow the layers to hold many catchments each with its own outlet, as split by
+        Catchment.components.
+
+    Returns:
+    -------
+    list[Diagnostic]
+        The problems found, errors first.
+    """
+    diagnostics = []
+    nodes = catchment._vertices
+    reaches = catchment._edges
+
+    counts = Counter([n.name for n in nodes] + [r.name for r in reaches])
+    for name, count in counts.items():
+        if count > 1:
+            diagnostics.append(Diagnostic("duplicate-id", Severity.ERROR,
+                                          f"{count} entities have the id {name}", (name,)))
+
+    # Snap each reach end to its nearest node as connect does.
+    index = GridIndex([n.coordinates() for n in nodes])
+    ends = []
+    for r in reaches:
+        snapped = []
+        for label, p in (("start", r.getStart()), ("end", r.getEnd())):
+            i, d = index.nearest(p.coordinates(), SNAPPING_DISTANCE) if len(index) else (-1, 0.0)
+            if i == -1:
+                diagnostics.append(Diagnostic("dangling-end", Severity.ERROR,
+                                              f"The {label} of reach {r.name} is not near any node", (r.name,)))
+            elif d > tolerance:
+                diagnostics.append(Diagnostic("unsnapped-end", Severity.ERROR,
+                                              f"The {label} of reach {r.name} is {d:.2f} from the nearest node "
+                                              f"{nodes[i].name}", (r.name, nodes[i].name)))
+            snapped.append(i)
+        ends.append(snapped)
+
+    parent = list(range(len(nodes)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    degree = [0] * len(nodes)
+    for r, (s, e) in zip(reaches, ends):
+        if (s == -1) or (e == -1):
+            continue
+        if s == e:
+            diagnostics.append(Diagnostic("self-loop", Severity.ERROR,
+                                          f"Reach {r.name} starts and ends at node {nodes[s].name}",
+                                          (r.name, nodes[s].name)))
+            continue
+        degree[s] += 1
+        degree[e] += 1
+        a, b = find(s), find(e)
+        if a == b:
+            diagnostics.append(Diagnostic("cycle", Severity.ERROR,
+                                          f"Reach {r.name} closes a loop between {nodes[s].name} and {nodes[e].name}",
+                                          (r.name, nodes[s].name, nodes[e].name)))
+        else:
+            parent[max(a, b)] = min(a, b)
+
+    groups = {}
+    for i in range(len(nodes)):
+        groups.setdefault(find(i), []).append(i)
+    outlets = {root: [i for i in members if isinstance(nodes[i], Confluence) and nodes[i].isOut]
+               for root, members in groups.items()}
+    for root, members in groups.items():
+        if (len(members) == 1) and (len(nodes) > 1) and (degree[members[0]] == 0):
+            diagnostics.append(Diagnostic("disconnected-node", Severity.ERROR,
+                                          f"Node {nodes[members[0]].name} is not joined to any reach",
+                                          (nodes[members[0]].name,)))
+        elif not outlets[root]:
+            names = tuple(nodes[i].name for i in members)
+            diagnostics.append(Diagnostic("missing-outlet", Severity.ERROR,
+                                          f"Nodes {', '.join(names)} do not drain to an outlet", names))
+        elif len(outlets[root]) > 1:
+            names = tuple(nodes[i].name for i in outlets[root])
+            diagnostics.append(Diagnostic("multiple-outlets", Severity.ERROR,
+                                          f"Outlets {', '.join(names)} are joined to each other", names))
+    separate = [nodes[o[0]].name for o in outlets.values() if len(o) == 1]
+    if (len(separate) > 1) and not components:
+        diagnostics.append(Diagnostic("multiple-outlets", Severity.ERROR,
+                                      f"The layers hold {len(separate)} catchments with outlets "
+                                      f"{', '.join(separate)}, split them with Catchment.components",
+                                      tuple(separate)))
+
+    if (centroids is not None) and (basins is not None):
+        diagnostics.extend(_matchCentroids(centroids, basins))
+
+    return sorted(diagnostics, key=lambda d: d.severity != Severity.ERROR)
+
+
+def check(catchment: Catchment,
+          centroids: VectorLayer | None = None,
+          basins: VectorLayer | None = None,
+          tolerance: float = 1.0,
+          components: bool = False) -> list:
+    """Validate a catchment and raise if there are any errors.
+
+    Parameters
+    ----------
+    See validate.
+
+    Returns:
+    -------
+    list[Diagnostic]
+        The warnings found.
+
+    Raises:
+    ------
+    ValidationError
+        If any errors are found.
+    """
+    diagnostics = validate(catchment, centroids, basins, tolerance, components)
+    if any(d.severity == Severity.ERROR for d in diagnostics):
+        raise ValidationError(diagnostics)
+    return diagnostics
+
+
+def _matchCentroids(centroids: VectorLayer, basins: VectorLayer) -> list:
+    """Match the centroids to the basin polygons as Builder.basin does."""
+    diagnostics = []
+    if not len(basins):
+        return [Diagnostic("unmatched-centroid", Severity.ERROR, "There are no basin polygons")] if len(centroids) else []
+    index = GridIndex([geometry.polygon_centroid(pointVector(basins.geometry(j))).coordinates()
+                       for j in range(len(basins))])
+    matched = {}
+    for i in range(len(centroids)):
+        name = centroids.record(i)['id']
+        j, _ = index.nearest(centroids.geometry(i)[0], SNAPPING_DISTANCE)
+        if j == -1:
+            diagnostics.append(Diagnostic("unmatched-centroid", Severity.ERROR,
+                                          f"Centroid {name} is not near any basin polygon", (name,)))
+        else:
+            matched.setdefault(j, []).append(name)
+    for j, names in matched.items():
+        if len(names) > 1:
+            diagnostics.append(Diagnostic("shared-basin", Severity.ERROR,
+                                          f"Centroids {', '.join(names)} are matched to the same basin polygon",
+                                          tuple(names)))
+    for j in range(len(basins)):
+        if j not in matched:
+            diagnostics.append(Diagnostic("unmatched-basin", Severity.WARNING,
+                                          f"Basin polygon {j} has no centroid, its area is not in the catchment"))
+    return diagnostics
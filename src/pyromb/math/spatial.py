@@ -0,0 +1,97 @@
+import math
+
+import numpy as np
+
+
+class GridIndex:
+    """A uniform grid over a set of points for radius and nearest neighbour queries.
+
+    Building the index is linear in the number of points. A query only visits the cells
+    within the search radius, so it takes constant time when the points are spread
+    at about the cell size.
+
+    Parameters
+    ----------
+    points : array_like
+        The (n, 2) x,y co-ordinates of the points.
+    cell : float | None
+        The width of a grid cell. Defaults to the mean spacing of the points.
+    """
+
+    def __init__(self, points, cell: float | None = None) -> None:
+        self.points = np.asarray(points, dtype=float).reshape(-1, 2)
+        if cell is None:
+            n = max(len(self.points), 1)
+            width, height = np.ptp(self.points, axis=0) if len(self.points) else (0.0, 0.0)
+            # Points along a line have no area, space them along its length instead.
+            cell = math.sqrt(width * height / n) if width * height > 0 else max(width, height) / n
+            cell = cell or 1.0
+        if cell <= 0:
+            raise ValueError("The cell size must be positive")
+        self.cell = float(cell)
+        self._cells: dict[tuple, list] = {}
+        for i, key in enumerate(map(tuple, np.floor(self.points / self.cell).astype(np.int64))):
+            self._cells.setdefault(key, []).append(i)
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def within(self, point, radius: float) -> np.ndarray:
+        """The indexes of the points within a radius of a point.
+
+        Parameters
+        ----------
+        point : tuple
+            The x,y co-ordinates to search from.
+        radius : float
+            The search radius.
+
+        Returns:
+        -------
+        np.ndarray
+            The indexes of the points, sorted by distance.
+        """
+        candidates = self._candidates(point, radius)
+        if not len(candidates):
+            return candidates
+        d = np.hypot(*(self.points[candidates] - point).T)
+        order = np.argsort(d, kind='stable')
+        return candidates[order][d[order] <= radius]
+
+    def nearest(self, point, radius: float) -> tuple:
+        """The nearest point within a radius of a point.
+
+        The search starts within one cell and widens until a point is found, so the
+        radius can be large without visiting every cell. Ties are broken by the lowest
+        index.
+
+        Parameters
+        ----------
+        point : tuple
+            The x,y co-ordinates to search from.
+        radius : float
+            The search radius.
+
+        Returns:
+        -------
+        tuple
+            (index, distance) of the nearest point, or (-1, inf) if there is none.
+        """
+        r = min(self.cell, radius)
+        while True:
+            found = self.within(point, r)
+            if len(found):
+                return (int(found[0]), float(np.hypot(*(self.points[found[0]] - point))))
+            if r >= radius:
+                return (-1, math.inf)
+            r = min(2 * r, radius)
+
+    def _candidates(self, point, radius: float) -> np.ndarray:
+        x0, y0 = (int(math.floor((c - radius) / self.cell)) for c in point)
+        x1, y1 = (int(math.floor((c + radius) / self.cell)) for c in point)
+        if (x1 - x0 + 1) * (y1 - y0 + 1) > len(self._cells):
+            keys = [k for k in self._cells if (x0 <= k[0] <= x1) and (y0 <= k[1] <= y1)]
+        else:
+            keys = [(x, y) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1) if (x, y) in self._cells]
+        indexes = [i for k in keys for i in self._cells[k]]
+        return np.array(sorted(indexes), dtype=np.int64)
@@ -0,0 +1,146 @@
+import threading
+import weakref
+
+from ..core.catchment import Catchment
+
+
+class Emission:
+    """The output of a model kept as rows grouped into named blocks.
+
+    The Emission remembers the topology version and the attributes of the catchment it was
+    built from. After an attribute only change to the catchment the model can patch the rows
+    of the changed nodes and reaches rather than traversing the catchment again.
+
+    Parameters
+    ----------
+    catchment : Catchment
+        The catchment the output was built from.
+    blocks : dict[str, list[str]]
+        The rows of the output, in order, grouped by block name.
+    """
+
+    def __init__(self, catchment: Catchment, blocks: dict) -> None:
+        self._version = catchment._topologyVersion
+        self._layout = _layout(catchment)
+        self._nodes = [_nodeAttributes(v) for v in catchment._vertices]
+        self._reaches = [_reachAttributes(r) for r in catchment._edges]
+        self.blocks: dict[str, list[str]] = blocks
+
+    def changes(self, catchment: Catchment) -> tuple | None:
+        """The nodes and reaches whose attributes have changed since the output was built.
+
+        Parameters
+        ----------
+        catchment : Catchment
+            The catchment the output was built from.
+
+        Returns:
+        -------
+        tuple | None
+            (nodes, reaches) lists of the changed objects, or None if the topology or
+            layout has changed and the output must be built again.
+        """
+        if catchment._topologyVersion != self._version:
+            return None
+        if _layout(catchment) != self._layout:
+            return None
+        nodes = [v for v, a in zip(catchment._vertices, self._nodes) if _nodeAttributes(v) != a]
+        reaches = [r for r, a in zip(catchment._edges, self._reaches) if _reachAttributes(r) != a]
+        return (nodes, reaches)
+
+    def refresh(self, catchment: Catchment) -> None:
+        """Record the current attributes of the catchment once the rows have been patched.
+
+        Parameters
+        ----------
+        catchment : Catchment
+            The catchment the output was built from.
+        """
+        self._nodes = [_nodeAttributes(v) for v in catchment._vertices]
+        self._reaches = [_reachAttributes(r) for r in catchment._edges]
+
+    def render(self) -> str:
+        """Join the rows of every block into the output string.
+
+        Returns:
+        -------
+        str
+            The model output.
+        """
+        return "".join(row for rows in self.blocks.values() for row in rows)
+
+
+class EmissionCache:
+    """The previous output of a model for each catchment it has built.
+
+    The cache is shared by every build of the model. Lookups and patches hold a lock so a 
+    model can serve concurrent builds from many threads, entries are dropped with their 
+    catchment.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries = weakref.WeakKeyDictionary()
+
+    def patch(self, catchment: Catchment, patcher) -> str | None:
+        """Patch the previous output of a catchment and render it.
+
+        Parameters
+        ----------
+        catchment : Catchment
+            The catchment being built.
+        patcher : Callable[[tuple, tuple], None]
+            Called with the stored entry and the (nodes, reaches) that have changed to 
+            patch the rows of the entry's Emission.
+
+        Returns:
+        -------
+        str | None
+            The patched output or None if the catchment must be built again.
+        """
+        with self._lock:
+            entry = self._entries.get(catchment)
+            if entry is None:
+                return None
+            changes = entry[0].changes(catchment)
+            if changes is None:
+                return None
+            patcher(entry, changes)
+            entry[0].refresh(catchment)
+            return entry[0].render()
+
+    def store(self, catchment: Catchment, entry: tuple) -> None:
+        """Keep the output of a build.
+
+        Parameters
+        ----------
+        catchment : Catchment
+            The catchment that was built.
+        entry : tuple
+            The Emission of the build followed by whatever the model needs to patch it.
+        """
+        with self._lock:
+            self._entries[catchment] = entry
+
+    def __getstate__(self) -> dict:
+        with self._lock:
+            return {'entries': list(self._entries.items())}
+
+    def __setstate__(self, state: dict) -> None:
+        self._lock = threading.Lock()
+        self._entries = weakref.WeakKeyDictionary(state['entries'])
+
+
+def _layout(catchment: Catchment) -> list:
+    """The properties that determine traversal order and display, changing any requires a rebuild."""
+    nodes = [(v, v.name, v.coordinates(), getattr(v, 'isOut', None)) for v in catchment._vertices]
+    reaches = [(r, r.name, r.type, r.length()) for r in catchment._edges]
+    return nodes + reaches
+
+
+def _nodeAttributes(node) -> tuple:
+    return (getattr(node, 'area', None), getattr(node, 'fi', None))
+
+
+def _reachAttributes(reach) -> tuple:
+    return (reach.slope,)
@@ -1,12 +1,24 @@
 import json
 import os
+from functools import cache
 
 from .. import resources
+from ..analysis.distance import flow_distance
 from ..core.attributes.basin import Basin
 from ..core.attributes.confluence import Confluence
 from ..core.attributes.reach import ReachType
 from ..core.traveller import Traveller
+from ..core.instrumentation import instrumented
 from ..core.model import Model
+from .emission import Emission, EmissionCache
+
+
+@cache
+def _formattingOptions() -> dict:
+    """The column formats of the control file, read once and shared by every build."""
+    resources_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'resources')
+    with open(os.path.join(resources_dir, 'formatting.json'), 'r') as f:
+        return json.load(f)
 
 
 class VectorBlock():
@@ -18,10 +30,11 @@ class VectorBlock():
         self._runningHydro: bool = False
         self._stateVector = []
         self._controlVector = []
+        self._controlRows: dict = {}
+        self._subAreas: list = []
+        self._subAreaIndex: dict = {}
 
-        resources_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'resources')
-        with open(os.path.join(resources_dir, 'formatting.json'), 'r') as f:
-            self._formattingOptions = json.load(f)
+        self._formattingOptions = _formattingOptions()
 
     def step(self, traveller: Traveller) -> None:
         """ 
@@ -52,11 +65,65 @@ class VectorBlock():
         str
             The vector block string to be used in the .catg file 
         """
-        vectorStr = "0\n"                   # Start with code 0, reach types are specified in the control block.
-        for s in self._controlVector:
-            vectorStr += f"{s}\n"
-        vectorStr += f"{self._subAreaStr(self._stateVector, traveller)}\n{self._fracImpStr(self._stateVector, traveller)}\n"
-        return vectorStr
+        return "".join(row for rows in self.blocks(traveller).values() for row in rows)
+
+    def blocks(self, traveller: Traveller) -> dict:
+        """
+        The vector block as rows grouped into the control vector, area and fraction impervious tables.
+
+        Parameters
+        ----------
+        traveller: Traveller
+            The traveller that traversed the catchment.
+
+        Returns:
+        -------
+        dict
+            The rows of the 'control', 'area' and 'fi' blocks.
+        """
+        control = ["0\n"]                   # Start with code 0, reach types are specified in the control block.
+        control += [f"{s}\n" for s in self._controlVector]
+        area = [f"{row}\n" for row in self._subAreaStr(self._stateVector, traveller).split("\n")]
+        fi = [f"{row}\n" for row in self._fracImpStr(self._stateVector, traveller).split("\n")]
+        self._subAreas = [traveller._catchment._vertices[c[1]] for c in self._stateVector if c[0] in (1, 2)]
+        self._subAreaIndex = {node: k for k, node in enumerate(self._subAreas)}
+        return {'control': control, 'area': area, 'fi': fi}
+
+    def patchNode(self, node: Basin, emission: Emission) -> None:
+        """Rewrite the area and fraction impervious table rows of a sub-area.
+
+        The tables hold five values per row, only the row holding the sub-area is rewritten.
+
+        Parameters
+        ----------
+        node : Basin
+            The sub-area that has changed.
+        emission : Emission
+            The output holding the 'area' and 'fi' blocks built by this VectorBlock.
+        """
+        if node not in self._subAreaIndex:
+            return
+        row = self._subAreaIndex[node] // 5
+        chunk = self._subAreas[row * 5: row * 5 + 5]
+        for table, attr in (('area_table', 'area'), ('fi_table', 'fi')):
+            values = [f"{getattr(b, attr):{self._formattingOptions[table]['percision']}}" for b in chunk]
+            line = "".join(f"{v:{self._formattingOptions[table]['column_width']}}," for v in values)
+            emission.blocks[attr][row + 2] = f"{line}\n"     # Both tables have two header rows.
+
+    def patchReach(self, reach, emission: Emission, traveller: Traveller) -> None:
+        """Rewrite the control vector row of a reach.
+
+        Parameters
+        ----------
+        reach : Reach
+            The reach that has changed.
+        emission : Emission
+            The output holding the 'control' block built by this VectorBlock.
+        traveller : Traveller
+            A traveller over the catchment.
+        """
+        for k in self._controlRows.get(reach, []):
+            emission.blocks['control'][k + 1] = f"{self._controlStr(self._stateVector[k], traveller)}\n"
 
     def _state(self, traveller: Traveller) -> None:
         """Store the current state of the traveller within the catchment at each time step.
@@ -115,14 +182,41 @@ class VectorBlock():
         traveller : Traveller
             The traveller traversing this catchment.
         """
+        if code[0] in (1, 2, 5):
+            try:
+                self._controlRows.setdefault(traveller.getReach(code[1]), []).append(len(self._controlVector))
+            except KeyError:
+                pass
+        self._controlVector.append(self._controlStr(code, traveller))
+
+    def _controlStr(self, code: tuple, traveller: Traveller) -> str:
+        """The control vector string of a coded tuple.
+
+        Parameters
+        ----------
+        code : tuple
+            A coded tuple with:
+
+            [0] - The command code.
+            [1] - The position of the traveller when the command code was created.
+
+        traveller : Traveller
+            The traveller traversing this catchment.
+
+        Returns:
+        -------
+        str
+            The control vector string.
+        """
         if code[0] in (1, 2, 5):
             try:
                 r = traveller.getReach(code[1])
                 if (r.type == ReachType.NATURAL) or (r.type == ReachType.DROWNED):
                     ret = f"{code[0]},{r.type.value},{r.length() / 1000:.3f},-99"
                 else:
-                    ret = f"{code[0]},{r.type.value},{r.length() / 1000:.3f},{r.getSlope()},-99"
-            except:
+                    ret = f"{code[0]},{r.type.value},{r.length() / 1000:.3f},{r.slope},-99"
+            except KeyError:
+                # The outlet has no downstream reach, the vector ends there.
                 ret = f"{7}\n\n{0}"
 
         if (code[0] == 3) or (code[0] == 4):
@@ -131,7 +225,7 @@ class VectorBlock():
         if (code[0] == 0):
             ret = f"{7}\n\n'{0}"
 
-        self._controlVector.append(ret)
+        return ret
 
     def _subAreaStr(self, code: tuple, traveller: Traveller) -> str:
         """Format the subarea string according to the RORB manual.
@@ -240,12 +334,10 @@ class GraphicsBlock():
         self._idMap = {}
         self._nodeVector = []
         self._reachVector = []
-        self._nodeID = self._idGenerator()
-        self._reachID = self._idGenerator()
+        self._nodeRows: dict = {}
+        self._reachRows: dict = {}
 
-        resources_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'resources')
-        with open(os.path.join(resources_dir, 'formatting.json'), 'r') as f:
-            self._formattingOptions = json.load(f)
+        self._formattingOptions = _formattingOptions()
 
     def step(self, code: tuple, traveller: Traveller) -> None:
         """Determine graphical information at each catchment position while travelling.
@@ -272,19 +364,60 @@ class GraphicsBlock():
         str
             The graphical block string for the .catg file.
         """
+        return "".join(row for rows in self.blocks().values() for row in rows)
+
+    def blocks(self) -> dict:
+        """The graphical block as rows grouped into the header, node, reach and tail blocks.
+
+        Returns:
+        -------
+        dict
+            The rows of the 'graphics_header', 'nodes', 'reach_header', 'reaches' and 'graphics_tail' blocks.
+        """
         self._replaceIDTags(self._nodeVector)
         self._replaceIDTags(self._reachVector)
         self._normalizeCoordinates()
 
-        graphicalStr = (
-            f"{resources.rorb.GRAPHICAL_HEADER}"
-            f"{self._generateNodeString()}"
-            f"{resources.rorb.LEADING_TOKEN}\n"
-            f"{self._generateReachString()}"
-            f"{resources.rorb.GRAPHICAL_TAIL}"
-        )
+        return {
+            'graphics_header': [resources.rorb.GRAPHICAL_HEADER, self._generateNodeHeader()],
+            'nodes': [self._generateNodeRow(row) for row in self._nodeVector],
+            'reach_header': [f"{resources.rorb.LEADING_TOKEN}\n", self._generateReachHeader()],
+            'reaches': [self._generateReachRow(row) for row in self._reachVector],
+            'graphics_tail': [resources.rorb.GRAPHICAL_TAIL],
+        }
 
-        return graphicalStr
+    def patchNode(self, node: Basin, emission: Emission) -> None:
+        """Rewrite the display row of a node with its current area and fraction impervious.
+
+        Parameters
+        ----------
+        node : Basin
+            The node that has changed.
+        emission : Emission
+            The output holding the 'nodes' block built by this GraphicsBlock.
+        """
+        if (node not in self._nodeRows) or (not isinstance(node, Basin)):
+            return
+        k = self._nodeRows[node]
+        self._nodeVector[k]['area'] = node.area
+        self._nodeVector[k]['fi'] = node.fi
+        emission.blocks['nodes'][k] = self._generateNodeRow(self._nodeVector[k])
+
+    def patchReach(self, reach, emission: Emission) -> None:
+        """Rewrite the display row of a reach with its current slope.
+
+        Parameters
+        ----------
+        reach : Reach
+            The reach that has changed.
+        emission : Emission
+            The output holding the 'reaches' block built by this GraphicsBlock.
+        """
+        if reach not in self._reachRows:
+            return
+        k = self._reachRows[reach]
+        self._reachVector[k]['slope'] = reach.slope
+        emission.blocks['reaches'][k] = self._generateReachRow(self._reachVector[k])
 
     def _replaceIDTags(self, vector: list) -> None:
         """Replace the ID tags in the vector with the ID generated by the ID generator.
@@ -311,51 +444,44 @@ class GraphicsBlock():
         """
         xs = [row['x'] for row in self._nodeVector]
         ys = [row['y'] for row in self._nodeVector]
-        scale_x = max(xs) - min(xs)
-        scale_y = max(ys) - min(ys)
+        min_x = min(xs)
+        min_y = min(ys)
+        # A catchment in a straight line has no extent along one axis.
+        scale_x = (max(xs) - min_x) or 1.0
+        scale_y = (max(ys) - min_y) or 1.0
 
         for i, row in enumerate(self._nodeVector):
-            self._nodeVector[i]['x'] = (row['x'] - min(xs)) / scale_x * scale + shift
-            self._nodeVector[i]['y'] = (row['y'] - min(ys)) / scale_y * scale + shift
+            self._nodeVector[i]['x'] = (row['x'] - min_x) / scale_x * scale + shift
+            self._nodeVector[i]['y'] = (row['y'] - min_y) / scale_y * scale + shift
 
         for i, row in enumerate(self._reachVector):
-            self._reachVector[i]['x'] = (row['x'] - min(xs)) / scale_x * scale + shift
-            self._reachVector[i]['y'] = (row['y'] - min(ys)) / scale_y * scale + shift
-
-    def _generateNodeString(self) -> str:
-        """Generates the display information string for the nodes.
-
-        Returns:
-            A formated display string of the node data, compatible with RORB GE.
-        """
-        nodeStr = resources.rorb.NODE_HEADER
-        nodeStr += f"{resources.rorb.LEADING_TOKEN}{len(self._nodeVector):>7}\n"
-
-        for row in self._nodeVector:
-            nodeStr += resources.rorb.LEADING_TOKEN
-            for item in row:
-                nodeStr += f"{row[item]:{self._formattingOptions['node'][item]}}"
-            nodeStr += f"\n{resources.rorb.LEADING_TOKEN}\n"
-
+            self._reachVector[i]['x'] = (row['x'] - min_x) / scale_x * scale + shift
+            self._reachVector[i]['y'] = (row['y'] - min_y) / scale_y * scale + shift
+
+    def _generateNodeHeader(self) -> str:
+        """Generates the header of the node display information."""
+        return f"{resources.rorb.NODE_HEADER}{resources.rorb.LEADING_TOKEN}{len(self._nodeVector):>7}\n"
+
+    def _generateNodeRow(self, row: dict) -> str:
+        """Generates the display information string for a single node."""
+        nodeStr = resources.rorb.LEADING_TOKEN
+        for item in row:
+            nodeStr += f"{row[item]:{self._formattingOptions['node'][item]}}"
+        nodeStr += f"\n{resources.rorb.LEADING_TOKEN}\n"
         return nodeStr
 
-    def _generateReachString(self) -> str:
-        """Generates the display information string for the reaches.
-
-        Returns:
-            A formated display string of the reach data, compatible with RORB GE.
-        """
-        reachStr = resources.rorb.REACH_HEADER
-        reachStr += f"{resources.rorb.LEADING_TOKEN}{len(self._reachVector):>7}\n"
-
-        for row in self._reachVector:
-            reachStr += resources.rorb.LEADING_TOKEN
-            for item in row:
-                if (item == 'x') or (item == 'y'):
-                    reachStr += f"\n{resources.rorb.LEADING_TOKEN}"
-                reachStr += f"{row[item]:{self._formattingOptions['reach'][item]}}"
-            reachStr += "\n"
-
+    def _generateReachHeader(self) -> str:
+        """Generates the header of the reach display information."""
+        return f"{resources.rorb.REACH_HEADER}{resources.rorb.LEADING_TOKEN}{len(self._reachVector):>7}\n"
+
+    def _generateReachRow(self, row: dict) -> str:
+        """Generates the display information string for a single reach."""
+        reachStr = resources.rorb.LEADING_TOKEN
+        for item in row:
+            if (item == 'x') or (item == 'y'):
+                reachStr += f"\n{resources.rorb.LEADING_TOKEN}"
+            reachStr += f"{row[item]:{self._formattingOptions['reach'][item]}}"
+        reachStr += "\n"
         return reachStr
 
     def _nodeDisplay(self, code: tuple, traveller: Traveller) -> None:
@@ -378,7 +504,9 @@ class GraphicsBlock():
         if code[0] in (1, 2, 5):
             node = traveller.getNode(pos)
             x, y = node.coordinates()
-            prnt = 70 if isinstance(node, Confluence) and node.isOut else 0
+            # The outlet of an extracted sub-catchment is not flagged as out in the layers.
+            outlet = isinstance(node, Confluence) and (pos == traveller.getStart())
+            prnt = 70 if outlet else 0
 
             ds_node = traveller.getNode(traveller.down(pos))
             ds_name = f"<{ds_node.name}>"
@@ -390,7 +518,7 @@ class GraphicsBlock():
                 'y': y,
                 'icon': 1,
                 'basin': int(isinstance(node, Basin)),
-                'end': int(node.isOut) if isinstance(node, Confluence) else 0,
+                'end': int(outlet),
                 'ds': ds_name,
                 'name': f" {node.name}",
                 'area': node.area if isinstance(node, Basin) else 0,
@@ -400,7 +528,8 @@ class GraphicsBlock():
                 'comment': 0
             }
 
-            self._idMap[data['id']] = next(self._nodeID)
+            self._idMap[data['id']] = len(self._nodeVector) + 1
+            self._nodeRows[node] = len(self._nodeVector)
             self._nodeVector.append(data)
 
     def _reachDisplay(self, code: tuple, traveller: Traveller) -> None:
@@ -445,29 +574,39 @@ class GraphicsBlock():
                     'y': y,
                 }
 
-                self._idMap[data['id']] = next(self._reachID)
+                self._idMap[data['id']] = len(self._reachVector) + 1
+                self._reachRows[reach] = len(self._reachVector)
                 self._reachVector.append(data)
 
             except KeyError:
                 pass
 
-    @staticmethod
-    def _idGenerator():
-        """Generate a unique ID for each node and reach in the catchment.
-        """
-        i = 0
-        while True:
-            i += 1
-            yield i
-
 class RORB(Model):
     """Create a RORB GE control vector for input to the RORB runoff routing model.
+
+    The previous output of each catchment is kept by block and row. If only basin area 
+    and fraction impervious or reach slope have changed since, getVector patches the 
+    affected rows instead of traversing the catchment again. Each build uses its own 
+    VectorBlock and GraphicsBlock so one RORB can serve concurrent builds.
+
+    Parameters
+    ----------
+    kcRatio : float | None
+        If given, a kc estimate of this ratio times the average flow distance (see 
+        analysis.flow_distance) is written as a comment after the control vector, e.g.
+        analysis.distance.KC_RATIO.
     """
 
-    def __init__(self):
-        pass
+    def __init__(self, kcRatio: float | None = None):
+        self._previous = EmissionCache()
+        self._kcRatio = kcRatio
 
+    @instrumented("rorb.getVector")
     def getVector(self, traveller: Traveller) -> str:
+        patched = self._previous.patch(traveller._catchment, lambda entry, changes: self._patch(entry, changes, traveller))
+        if patched is not None:
+            return patched
+
         traveller.next()
         vectorBlock = VectorBlock()
         graphicBlock = GraphicsBlock()
@@ -476,4 +615,63 @@ class RORB(Model):
             vectorBlock.step(traveller)
             graphicBlock.step(vectorBlock.state[-1], traveller)
 
-        return graphicBlock.build() + vectorBlock.build(traveller)
+        vector = vectorBlock.blocks(traveller)
+        if self._kcRatio is not None:
+            vector = {'control': vector['control'], 'parameters': self._parameterRows(traveller)} | vector
+        emission = Emission(traveller._catchment, graphicBlock.blocks() | vector)
+        self._previous.store(traveller._catchment, (emission, vectorBlock, graphicBlock))
+        return emission.render()
+
+    @instrumented("rorb.getFiles")
+    def getFiles(self, vector: str, name: str) -> dict:
+        return {f"{name}.catg": vector}
+
+    def _patch(self, previous: tuple, changes: tuple, traveller: Traveller) -> None:
+        emission, vectorBlock, graphicBlock = previous
+        nodes, reaches = changes
+        for node in nodes:
+            vectorBlock.patchNode(node, emission)
+            graphicBlock.patchNode(node, emission)
+        if nodes and ('parameters' in emission.blocks):
+            emission.blocks['parameters'] = self._parameterRows(traveller)
+        for reach in reaches:
+            vectorBlock.patchReach(reach, emission, traveller)
+            graphicBlock.patchReach(reach, emission)
+
+    def getStormFile(self, storm, losses: tuple = (0.0, 0.0)) -> str:
+        """Create a RORB storm file of a design storm.
+
+        The storm is a single burst of the rainfall of one pluviograph, which RORB
+        applies to every sub-area.
+
+        Parameters
+        ----------
+        storm : arr.ensemble.Storm
+            The storm, with a name, timestep in minutes and the rainfall of each time step
+            in mm.
+        losses : tuple
+            The (initial loss in mm, continuing loss in mm/h) of the storm.
+
+        Returns:
+        -------
+        str
+            The content of the storm file.
+        """
+        rainfall = [f"{float(r):.3f}" for r in storm.rainfall] + ["-99"]
+        rows = [",".join(rainfall[i:i + 5]) for i in range(0, len(rainfall), 5)]
+        return f"{storm.name}\n" + \
+            f"{resources.rorb.STORM_HEADER}" + \
+            f"{storm.timestep / 60:.4f},{len(storm.rainfall)},1,0\n" + \
+            "C Start and end increments of the burst\n" + \
+            f"1,{len(storm.rainfall)}\n" + \
+            "C Rainfall, mm, of each increment\n" + \
+            "\n".join(rows) + "\n" + \
+            "C Initial loss, mm, and continuing loss, mm/h\n" + \
+            f"{losses[0]:g},{losses[1]:g}\n"
+
+    def _parameterRows(self, traveller: Traveller) -> list:
+        """The comment rows holding the kc estimate of the catchment."""
+        distances = flow_distance(traveller._catchment)
+        dav = distances.dav[traveller.getStart()]
+        return [f"{resources.rorb.PARAMETER_HEADER}",
+                f"C dav = {dav:.3f} km, kc = {self._kcRatio} x dav = {self._kcRatio * dav:.3f}\n"]
@@ -5,7 +5,9 @@ from io import StringIO
 from ..core.attributes.basin import Basin
 from ..core.attributes.confluence import Confluence
 from ..core.traveller import Traveller
+from ..core.instrumentation import instrumented
 from ..core.model import Model
+from .emission import Emission, EmissionCache
 
 
 class UrbsVectorWriter:
@@ -13,13 +15,15 @@ class UrbsVectorWriter:
     Implements the traversal logic from URBS_logic.md and RORBvURBS_logic.md
     """
 
-    def __init__(self, model_name: str = "URBS_Model") -> None:
+    def __init__(self, model_name: str = "URBS_Model", parameters: dict = None) -> None:
         self._storedHydro: list[int] = []
         self._runningHydro: bool = False
         self._stateVector = []
         self._commandVector = []
         self._model_name = model_name
+        self._parameters = dict(parameters if parameters is not None else URBS.DEFAULT_PARAMETERS)
         self._subcatchment_index_map = {}  # Map positions to subcatchment indices
+        self._command_rows: dict = {}  # Map reaches to the command rows that use them
 
     def step(self, traveller: Traveller) -> None:
         """ 
@@ -33,6 +37,9 @@ class UrbsVectorWriter:
         self._state(traveller)
         if self._stateVector:
             self._control(self._stateVector[-1], traveller)
+            if self._stateVector[-1][0] in (1, 2, 5):
+                reach = traveller.getReach(self._stateVector[-1][1])
+                self._command_rows.setdefault(reach, []).append(len(self._commandVector) - 1)
 
     def build_vec_file(self, traveller: Traveller) -> str:
         """ 
@@ -43,22 +50,70 @@ class UrbsVectorWriter:
         str
             The complete .vec file content with header and commands
         """
+        return "".join(row for rows in self.build_vec_blocks(traveller).values() for row in rows)
+
+    def build_vec_blocks(self, traveller: Traveller) -> dict:
+        """ 
+        Builds the URBS .vec file content as rows grouped into the header, commands and tail.
+            
+        Returns:
+        -------
+        dict
+            The rows of the 'vec_header', 'commands' and 'vec_tail' blocks.
+        """
         # Traverse catchment to generate commands
         while traveller._pos != traveller._endSentinel:
             self.step(traveller)
 
         # Generate control vector. 
-        vec_content = f"{self._model_name}\n"
-        vec_content += "MODEL: SPLIT\n"
-        vec_content += "USES: L CS U\n"
-        vec_content += "DEFAULT PARAMETERS: alpha = 0.5 m = 0.8 beta = 3 n = 1.0 x = 0.25\n"
-        vec_content += f"CATCHMENT DATA FILE = {self._model_name}.cat\n"
+        commands = [f"{command}\n" for command in self._commandVector]
+        return {'vec_header': self.build_vec_header(), 'commands': commands, 'vec_tail': ["END OF CATCHMENT DATA.\n"]}
+
+    def build_vec_header(self, model_name: str = None, parameters: dict = None) -> list:
+        """
+        Builds the rows of the .vec file header.
+
+        Parameters
+        ----------
+        model_name : str
+            Replaces the model name of the writer if given.
+        parameters : dict
+            Replaces the default parameters of the writer if given.
 
-        for command in self._commandVector:
-            vec_content += f"{command}\n"
+        Returns:
+        -------
+        list
+            The header rows.
+        """
+        if model_name is not None:
+            self._model_name = model_name
+        if parameters is not None:
+            self._parameters = dict(parameters)
+        defaults = " ".join(f"{k} = {v}" for k, v in self._parameters.items())
+        return [
+            f"{self._model_name}\n",
+            "MODEL: SPLIT\n",
+            "USES: L CS U\n",
+            f"DEFAULT PARAMETERS: {defaults}\n",
+            f"CATCHMENT DATA FILE = {self._model_name}.cat\n",
+        ]
+
+    def patch_reach(self, reach, emission: Emission, traveller: Traveller) -> None:
+        """Rewrite the commands that route through a reach.
 
-        vec_content += "END OF CATCHMENT DATA.\n"
-        return vec_content
+        Parameters
+        ----------
+        reach : Reach
+            The reach that has changed.
+        emission : Emission
+            The output holding the 'commands' block built by this writer.
+        traveller : Traveller
+            A traveller over the catchment.
+        """
+        generators = {1: self._generate_rain_command, 2: self._generate_add_rain_command, 5: self._generate_route_command}
+        for k in self._command_rows.get(reach, []):
+            command_code, pos = self._stateVector[k]
+            emission.blocks['commands'][k] = f"{generators[command_code](pos, traveller)}\n"
 
     def _state(self, traveller: Traveller) -> None:
         """Store the current state of the traveller and determine URBS command.
@@ -126,30 +181,25 @@ class UrbsVectorWriter:
         """
         command_code, pos = code
 
-        try:
-            if command_code == 1:  # RAIN - Start branch at headwater
-                self._generate_rain_command(pos, traveller)
+        if command_code == 1:  # RAIN - Start branch at headwater
+            self._commandVector.append(self._generate_rain_command(pos, traveller))
 
-            elif command_code == 2:  # ADD RAIN - Add subcatchment inflow
-                self._generate_add_rain_command(pos, traveller)
+        elif command_code == 2:  # ADD RAIN - Add subcatchment inflow
+            self._commandVector.append(self._generate_add_rain_command(pos, traveller))
 
-            elif command_code == 3:  # STORE - Store hydrograph at junction
-                self._commandVector.append("STORE.")
+        elif command_code == 3:  # STORE - Store hydrograph at junction
+            self._commandVector.append("STORE.")
 
-            elif command_code == 4:  # GET - Retrieve stored hydrograph
-                self._commandVector.append("GET.")
+        elif command_code == 4:  # GET - Retrieve stored hydrograph
+            self._commandVector.append("GET.")
 
-            elif command_code == 5:  # ROUTE - Route without local inflow
-                self._generate_route_command(pos, traveller)
+        elif command_code == 5:  # ROUTE - Route without local inflow
+            self._commandVector.append(self._generate_route_command(pos, traveller))
 
-            elif command_code in (0, 7):  # PRINT - Output at node, always print at end. 
-                self._generate_print_command(pos, traveller)
+        elif command_code in (0, 7):  # PRINT - Output at node, always print at end. 
+            self._generate_print_command(pos, traveller)
 
-        except Exception as e:
-            # Fallback for errors
-            self._commandVector.append(f"! Error generating command for code {command_code} at position {pos}: {str(e)}")
-
-    def _generate_rain_command(self, pos: int, traveller: Traveller) -> None:
+    def _generate_rain_command(self, pos: int, traveller: Traveller) -> str:
         """Generate RAIN command for headwater subcatchment."""
         basin = traveller._catchment._vertices[pos]
         reach = traveller.getReach(pos)
@@ -165,9 +215,9 @@ class UrbsVectorWriter:
             slope_mm = reach.slope  # Assume internal format is m/m
             command += f" Sc={slope_mm:.6f}"
 
-        self._commandVector.append(command)
+        return command
 
-    def _generate_add_rain_command(self, pos: int, traveller: Traveller) -> None:
+    def _generate_add_rain_command(self, pos: int, traveller: Traveller) -> str:
         """Generate ADD RAIN command for subcatchment."""
         basin = traveller._catchment._vertices[pos]
         reach = traveller.getReach(pos)
@@ -183,9 +233,9 @@ class UrbsVectorWriter:
             slope_mm = reach.slope  # Assume internal format is m/m
             command += f" Sc={slope_mm:.6f}"
 
-        self._commandVector.append(command)
+        return command
 
-    def _generate_route_command(self, pos: int, traveller: Traveller) -> None:
+    def _generate_route_command(self, pos: int, traveller: Traveller) -> str:
         """Generate ROUTE command for routing without local inflow."""
         reach = traveller.getReach(pos)
 
@@ -200,7 +250,7 @@ class UrbsVectorWriter:
             slope_mm = reach.slope  # Assume internal format is m/m
             command += f" Sc={slope_mm:.6f}"
 
-        self._commandVector.append(command)
+        return command
 
     def _generate_print_command(self, pos: int, traveller: Traveller) -> None:
         """Generate PRINT command for output nodes."""
@@ -226,7 +276,8 @@ class UrbsCatWriter:
     """
 
     def __init__(self) -> None:
-        pass
+        self._rows: dict = {}  # Map basins to their row in the .cat file
+        self._indices: dict = {}
 
     def build_cat_file(self, traveller: Traveller, subcatchment_index_map: dict = None) -> str:
         """Generate URBS .cat file content with subcatchment data.
@@ -243,11 +294,25 @@ class UrbsCatWriter:
         str
             The complete .cat file content in CSV format
         """
-        csv_output = StringIO()
-        writer = csv.writer(csv_output)
+        return "".join(self.build_cat_rows(traveller, subcatchment_index_map))
 
+    def build_cat_rows(self, traveller: Traveller, subcatchment_index_map: dict = None) -> list:
+        """Generate URBS .cat file content as one CSV row per subcatchment after the header.
+
+        Parameters
+        ----------
+        traveller : Traveller
+            The traveller that traversed the catchment.
+        subcatchment_index_map : dict
+            Mapping of positions to subcatchment indices
+            
+        Returns:
+        -------
+        list
+            The rows of the .cat file in CSV format
+        """
         # Write header - URBS .cat file format
-        writer.writerow(['Index', 'Name', 'Area', 'Imperviousness', 'IL', 'CL'])
+        rows = [self._csv_row(['Index', 'Name', 'Area', 'Imperviousness', 'IL', 'CL'])]
 
         # Extract and write subcatchment data
         subcatchments = self._extract_subcatchments(traveller)
@@ -264,14 +329,39 @@ class UrbsCatWriter:
             else:
                 index = pos
 
-            name = basin.name if hasattr(basin, 'name') else f"Sub_{index}"
-            area = basin.area if hasattr(basin, 'area') else 0.0
-            imperviousness = basin.fi if hasattr(basin, 'fi') else 0.0
-            il = basin.il if hasattr(basin, 'il') else 0.0  # Initial Loss
-            cl = basin.cl if hasattr(basin, 'cl') else 2.5  # Continuing Loss (default)
+            self._rows[basin] = len(rows)
+            self._indices[basin] = index
+            rows.append(self._cat_row(index, basin))
+
+        return rows
 
-            writer.writerow([index, name, area, imperviousness, il, cl])
+    def patch_basin(self, basin: Basin, emission: Emission) -> None:
+        """Rewrite the .cat row of a subcatchment.
 
+        Parameters
+        ----------
+        basin : Basin
+            The basin that has changed.
+        emission : Emission
+            The output holding the 'cat' block built by this writer.
+        """
+        if basin in self._rows:
+            emission.blocks['cat'][self._rows[basin]] = self._cat_row(self._indices[basin], basin)
+
+    def _cat_row(self, index: int, basin: Basin) -> str:
+        """Format the .cat row of a subcatchment."""
+        name = basin.name if hasattr(basin, 'name') else f"Sub_{index}"
+        area = basin.area if hasattr(basin, 'area') else 0.0
+        imperviousness = basin.fi if hasattr(basin, 'fi') else 0.0
+        il = basin.il if hasattr(basin, 'il') else 0.0  # Initial Loss
+        cl = basin.cl if hasattr(basin, 'cl') else 2.5  # Continuing Loss (default)
+        return self._csv_row([index, name, area, imperviousness, il, cl])
+
+    @staticmethod
+    def _csv_row(values: list) -> str:
+        """Format a single CSV row."""
+        csv_output = StringIO()
+        csv.writer(csv_output).writerow(values)
         return csv_output.getvalue()
 
     def _extract_subcatchments(self, traveller: Traveller) -> list:
@@ -296,15 +386,25 @@ class URBS(Model):
     - Uses text-based commands instead of numeric codes
     - Handles proper unit conversions (m/m for slope)
     - Implements depth-first traversal logic for URBS command generation
+
+    The previous output is kept by block and row. If only basin area and fraction
+    impervious, reach slope, the model name or the default parameters have changed since, 
+    getVector patches the affected .vec rows and .cat rows instead of traversing the 
+    catchment again. Each build uses its own writers so one URBS can serve concurrent builds.
     """
 
+    DEFAULT_PARAMETERS = {"alpha": 0.5, "m": 0.8, "beta": 3, "n": 1.0, "x": 0.25}
+
     class Header(Enum):
         CONTROL = "[[CONTROL]]",
         CATCHMENT = "[[CATCHMENT]]"
 
     def __init__(self, model_name: str = "URBS_Model"):
         self.model_name = model_name
+        self.parameters = dict(URBS.DEFAULT_PARAMETERS)
+        self._previous = EmissionCache()
 
+    @instrumented("urbs.getVector")
     def getVector(self, traveller: Traveller) -> str:
         """Generate the URBS control and catchment content.
         
@@ -318,21 +418,44 @@ class URBS(Model):
         str
             The .vec file and .cat strings concatonated together with headers '[[CONTROL]]' and '[[CATCHMENT]]'.
         """
+        patched = self._previous.patch(traveller._catchment, lambda entry, changes: self._patch(entry, changes, traveller))
+        if patched is not None:
+            return patched
 
         # Create writers
-        vector_writer = UrbsVectorWriter(self.model_name)
+        vector_writer = UrbsVectorWriter(self.model_name, self.parameters)
         cat_writer = UrbsCatWriter()
 
-        # Generate control string
+        # Generate control rows
         traveller.next()
-        vec_content = vector_writer.build_vec_file(traveller)
+        blocks = {'control_header': [f"{URBS.Header.CONTROL.value}\n"]}
+        blocks |= vector_writer.build_vec_blocks(traveller)
 
-        # Generate catchment string
-        cat_content = cat_writer.build_cat_file(traveller)
+        # Generate catchment rows
+        blocks['catchment_header'] = ["\n", f"{URBS.Header.CATCHMENT.value}\n"]
+        blocks['cat'] = cat_writer.build_cat_rows(traveller, vector_writer._subcatchment_index_map)
 
         # return both as a concatenated string to keep interface consistent, will split later.
-        return f"{URBS.Header.CONTROL.value}\n{vec_content}\n{URBS.Header.CATCHMENT.value}\n{cat_content}"
+        emission = Emission(traveller._catchment, blocks)
+        self._previous.store(traveller._catchment, (emission, vector_writer, cat_writer))
+        return emission.render()
+
+    @instrumented("urbs.getFiles")
+    def getFiles(self, vector: str, name: str) -> dict:
+        """The .vec and .cat files. The name should match model_name, the .vec file refers to the .cat file by it."""
+        vec_content, cat_content = self.splitVector(vector)
+        return {f"{name}.vec": f"{vec_content}\n", f"{name}.cat": cat_content}
     
+    def _patch(self, previous: tuple, changes: tuple, traveller: Traveller) -> None:
+        emission, vector_writer, cat_writer = previous
+        nodes, reaches = changes
+        if (vector_writer._model_name, vector_writer._parameters) != (self.model_name, self.parameters):
+            emission.blocks['vec_header'] = vector_writer.build_vec_header(self.model_name, self.parameters)
+        for reach in reaches:
+            vector_writer.patch_reach(reach, emission, traveller)
+        for node in nodes:
+            cat_writer.patch_basin(node, emission)
+
     def splitVector(self, vector: str) -> tuple[str, str]:
         """
         Split the generated vector into a control string and catchment definition string. 
@@ -1,21 +1,45 @@
 import numpy as np
 
 from ..core.attributes.basin import Basin
-from ..core.attributes.confluence import Confluence
 from ..core.geometry.point import Point
 from ..core.traveller import Traveller
+from ..core.instrumentation import instrumented
 from ..core.model import Model
+from .emission import Emission, EmissionCache
 
 
 class WBNM(Model):
     """The WBNM class creates a templated runfile based on a catchment
     diagram produced in GIS.
 
-    Only basic functionality is supported at this stage. Storm and 
-    Structure blocks will need to be manually entered. 
+    Only basic functionality is supported at this stage. Structure blocks will need to 
+    be manually entered. The STORM_BLOCK holds the given design storms as recorded 
+    rainfall, without storms it is a template of the ARR design rain to be configured 
+    in WBNM. Given gauge weights, e.g. from analysis.thiessen_weights, each storm falls on 
+    every gauge and the weights are written to the CALC_RAINGAUGE_WEIGHTS of each storm.
+
+    The previous runfile of each catchment is kept by block and row. If only basin area 
+    and fraction impervious or the values have changed since, getVector patches the 
+    affected rows of the TOPOLOGY and SURFACES blocks instead of traversing the catchment 
+    again. Each build uses its own RunfileWriter so one WBNM can serve concurrent builds.
+
+    Parameters
+    ----------
+    storms : list | None
+        The storms of the STORM_BLOCK, e.g. from arr.ensemble.design_storms.
+    losses : tuple
+        The (initial loss in mm, continuing loss in mm/h) of the storms.
+    gauges : GaugeWeights | None
+        The raingauge weights of every subarea.
     """
 
-    def __init__(self):
+    BLOCKS = ("preamble", "status", "display", "topology", "surface", "flowpaths",
+              "local_structures", "outlet_structures", "storm")
+
+    def __init__(self, storms: list | None = None, losses: tuple = (0.0, 0.0), gauges=None):
+        self.storms = list(storms or [])
+        self.losses = losses
+        self.gauges = gauges
         self.values = {"VERSION_NUMBER": "2021_000",
                        "CATCHMENT_NAME": "Catchment",
                        "NONLIN_EXP": 0.77,
@@ -24,22 +48,159 @@ class WBNM(Model):
                        "DISCHARGE_SWITCH": -99,
                        "STREAM_ROUTING_TYPE": "#####ROUTING",
                        "STREAM_LAG_FACTOR": 1}
-        self._subAreas: list[SubArea] = []
+        self._previous = EmissionCache()
 
+    @instrumented("wbnm.getVector")
     def getVector(self, traveller: Traveller):
-        self._subAreaFactory(traveller)
-        return \
-            self._createCodeBlock("preamble")   + \
-            self._createCodeBlock("status")     + \
-            self._createCodeBlock("display")    + \
-            self._createCodeBlock("topology")   + \
-            self._createCodeBlock("surface")    + \
-            self._createCodeBlock("flowpaths")  + \
-            self._createCodeBlock("local_structures")  + \
-            self._createCodeBlock("outlet_structures")  + \
-            self._createCodeBlock("storm")
-
-    def _subAreaFactory(self, traveller: Traveller):
+        catchment = traveller._catchment
+        patched = self._previous.patch(catchment, self._patch)
+        if patched is not None:
+            return patched
+
+        writer = RunfileWriter(self.values, self.storms, self.losses, self.gauges)
+        writer.subAreaFactory(traveller)
+        emission = Emission(catchment, writer.blocks())
+        self._previous.store(catchment, (emission, writer))
+        return emission.render()
+
+    @instrumented("wbnm.getFiles")
+    def getFiles(self, vector: str, name: str) -> dict:
+        return {f"{name}.wbn": vector}
+
+    def _subAreaFactory(self, traveller: Traveller) -> list:
+        """Produces the WBNM subareas of the catchment.
+
+        Parameters
+        ----------
+        traveller : Traveller
+            The traveller traversing this catchment.
+
+        Returns:
+        -------
+        list[SubArea]
+            The subareas in order of travel.
+        """
+        writer = RunfileWriter(self.values)
+        writer.subAreaFactory(traveller)
+        return writer.subAreas
+
+    def _patch(self, previous: tuple, changes: tuple) -> None:
+        emission, writer = previous
+        writer.patch(emission, changes[0], self.values)
+        writer.patchStorms(emission, self.storms, self.losses, self.gauges)
+
+
+class RunfileWriter:
+    """Writes the blocks of a WBNM runfile for a single build.
+
+    The writer holds the subareas of one traversal and a copy of the values, so 
+    builds do not share state and can run concurrently.
+
+    Parameters
+    ----------
+    values : dict
+        The WBNM values to write, a copy is kept.
+    storms : list | None
+        The storms of the STORM_BLOCK, each with a name, timestep in minutes and the
+        rainfall of each time step in mm.
+    losses : tuple
+        The (initial loss in mm, continuing loss in mm/h) of the storms.
+    gauges : GaugeWeights | None
+        The raingauge weights of every subarea.
+    """
+
+    def __init__(self, values: dict, storms: list | None = None, losses: tuple = (0.0, 0.0), gauges=None) -> None:
+        self.values: dict = dict(values)
+        self._storms: list = list(storms or [])
+        self._losses: tuple = tuple(losses)
+        self._gauges = gauges
+        self._subAreas: list[SubArea] = []
+        self._subAreaIndex: dict = {}
+        self._endSentinel: int = -1
+
+    @property
+    def subAreas(self) -> list:
+        return self._subAreas
+
+    def blocks(self) -> dict:
+        """The runfile as rows grouped by code block.
+
+        Returns:
+        -------
+        dict
+            The rows of each code block, in order.
+        """
+        return {name: self._createCodeBlock(name).splitlines(keepends=True) for name in WBNM.BLOCKS}
+
+    def patch(self, emission: Emission, nodes: list, values: dict) -> None:
+        """Patch the runfile built by this writer after an attribute only change.
+
+        Parameters
+        ----------
+        emission : Emission
+            The runfile built by this writer.
+        nodes : list
+            The nodes whose attributes have changed.
+        values : dict
+            The current values, if they differ from the writer's the blocks using them are 
+            rebuilt from the existing subareas.
+        """
+        changed = [self._subAreas[self._subAreaIndex[n]] for n in nodes if n in self._subAreaIndex]
+        for s in changed:
+            basin = s.basin
+            s.area = basin.area
+            s.fractionImp = basin.fi
+
+        # The out location of a subarea depends on its area and the area of the subarea below.
+        upstream: dict = {}
+        for s in self._subAreas:
+            upstream.setdefault(id(s.dsSubArea), []).append(s)
+        moved = {id(s): s for c in changed for s in [c] + upstream.get(id(c), [])}
+        for s in moved.values():
+            if s.dsNodeIndex != self._endSentinel:
+                s.out = self._getOutCoordinate(s)
+
+        if values != self.values:
+            self.values = dict(values)
+            for name in ("status", "topology", "surface", "flowpaths"):
+                emission.blocks[name] = self._createCodeBlock(name).splitlines(keepends=True)
+        else:
+            for s in moved.values():
+                emission.blocks["topology"][self._subAreas.index(s) + 2] = self._topologyRow(s)
+            for s in changed:
+                emission.blocks["surface"][self._subAreas.index(s) + 3] = self._surfaceRow(s)
+
+    def patchStorms(self, emission: Emission, storms: list, losses: tuple, gauges=None) -> None:
+        """Rebuild the STORM_BLOCK of the runfile if the storms, losses or gauges have changed.
+
+        Parameters
+        ----------
+        emission : Emission
+            The runfile built by this writer.
+        storms : list
+            The current storms.
+        losses : tuple
+            The current losses.
+        gauges : GaugeWeights | None
+            The current raingauge weights.
+        """
+        if (not _sameStorms(storms, self._storms)) or (tuple(losses) != self._losses) or (gauges is not self._gauges):
+            self._storms = list(storms)
+            self._losses = tuple(losses)
+            self._gauges = gauges
+            emission.blocks["storm"] = self._createCodeBlock("storm").splitlines(keepends=True)
+
+    def stormBlock(self) -> str:
+        """The STORM_BLOCK of the writer's storms, to paste into a runfile.
+
+        Returns:
+        -------
+        str
+            The block, without a trailing newline.
+        """
+        return self._createCodeBlock("storm")
+
+    def subAreaFactory(self, traveller: Traveller):
         """Produces a WBNM subarea.
 
         A subarea in WBNM is the main structure of the model, this method 
@@ -50,6 +211,7 @@ class WBNM(Model):
         traveller : Traveller
             The traveller traversing this catchment.
         """
+        self._endSentinel = traveller._endSentinel
         # go to the very top of the catchment.
         traveller.next()
         # Traverse the catchment and build each subarea.
@@ -58,6 +220,7 @@ class WBNM(Model):
                 subArea = SubArea(traveller.getNode(traveller.position()))
                 subArea.streamChannel = len(traveller.up(traveller.position())) != 0
                 subArea.dsNodeIndex = self._getDsIndex(traveller, traveller.position())
+                self._subAreaIndex[subArea.basin] = len(self._subAreas)
                 self._subAreas.append(subArea)
             traveller.nextAbsolute()
         for s in self._subAreas:
@@ -74,11 +237,14 @@ class WBNM(Model):
         Confluence are not considered subareas in WBNM and will be passed over. 
         """
         ds = traveller.down(i)
+        if ds == traveller._endSentinel:
+            return ds
         if isinstance(traveller.getNode(ds), Basin):
             return ds
-        if isinstance(traveller.getNode(ds), Confluence):
-            if traveller.getNode(ds).isOut() == True:
-                return traveller._endSentinel
+        if ds == traveller.getStart():
+            # The outlet confluence, which need not be flagged as the out of the layers
+            # for an extracted sub-catchment.
+            return traveller._endSentinel
         return self._getDsIndex(traveller, ds)
 
     def _getDSSubArea(self, traveller: Traveller, index):
@@ -199,22 +365,22 @@ class WBNM(Model):
     def _blockTopology(self):
         """Get the TOPOLOGY_BLOCK, only implementing necessary values at this stage.
         """
-        insertSubArea = ""
-        for s in self._subAreas:
-            insertSubArea += self._createValueBlock(s.name) + \
-            self._createValueBlock(round(s.coordinates()[0], 3)) + self._createValueBlock(round(s.coordinates()[1], 3)) + \
-            self._createValueBlock(round(s.out.coordinates()[0], 3)) + self._createValueBlock(round(s.out.coordinates()[1], 3)) + \
-            " " + self._createValueBlock(s.dsSubArea.name) + "\n"
+        insertSubArea = "".join(self._topologyRow(s) for s in self._subAreas)
         return \
         "#####START_TOPOLOGY_BLOCK###########|###########|###########|###########|\n" + \
         f"{self._createValueBlock(len(self._subAreas))} {self._createValueBlock(self.values['CATCHMENT_NAME'])}\n" + \
         f"{insertSubArea}" +\
         "#####END_TOPOLOGY_BLOCK#############|###########|###########|###########|"
 
+    def _topologyRow(self, s) -> str:
+        """The TOPOLOGY_BLOCK row of a subarea."""
+        return self._createValueBlock(s.name) + \
+            self._createValueBlock(round(s.coordinates()[0], 3)) + self._createValueBlock(round(s.coordinates()[1], 3)) + \
+            self._createValueBlock(round(s.out.coordinates()[0], 3)) + self._createValueBlock(round(s.out.coordinates()[1], 3)) + \
+            " " + self._createValueBlock(s.dsSubArea.name) + "\n"
+
     def _blockSurface(self):
-        insertSurface = ""
-        for s in self._subAreas:
-            insertSurface += f"{self._createValueBlock(s.name)}{self._createValueBlock(round(s.area * 100, 2))}{self._createValueBlock(round(s.fi, 2))}\n"
+        insertSurface = "".join(self._surfaceRow(s) for s in self._subAreas)
         return \
         "#####START_SURFACES_BLOCK##########|###########|###########|###########|\n" + \
         f"{self._createValueBlock(self.values['NONLIN_EXP'])}{self._createValueBlock(self.values['LAG_PARAM'])}{self._createValueBlock(self.values['IMP_LAG_FACT'])}\n" + \
@@ -222,6 +388,10 @@ class WBNM(Model):
         insertSurface + \
         "#####END_SURFACES_BLOCK############|###########|###########|###########|"
 
+    def _surfaceRow(self, s) -> str:
+        """The SURFACES_BLOCK row of a subarea."""
+        return f"{self._createValueBlock(s.name)}{self._createValueBlock(round(s.area * 100, 2))}{self._createValueBlock(round(s.fi, 2))}\n"
+
     def _blockFlowPaths(self):
         insertFlow = ""
         for s in self._subAreas:
@@ -248,10 +418,18 @@ class WBNM(Model):
        "#####END_OUTLET_STRUCTURES_BLOCK###|###########|###########|###########|"
 
     def _blockStorm(self):
-        """Stormblock is a template at this stage. Catchment specific information will
-        eventually be injected into this block. This block will require manual configuration in
-        the WBNM runfile. 
+        """Get the STORM_BLOCK.
+
+        Each storm is written as the recorded rainfall of a single gauge, which WBNM 
+        applies to every subarea. Without storms the block is a template of the ARR 
+        design rain and will require manual configuration in the WBNM runfile.
         """
+        if self._storms:
+            return \
+            "#####START_STORM_BLOCK#############|###########|###########|###########|\n" + \
+            f"{self._createValueBlock(len(self._storms))}\n" + \
+            "".join(self._stormRows(k + 1, s) for k, s in enumerate(self._storms)) + \
+            "#####END_STORM_BLOCK###############|###########|###########|###########|"
         return \
         "#####START_STORM_BLOCK#############|###########|###########|###########|\n" + \
         f"{self._createValueBlock(1)}\n" + \
@@ -271,6 +449,7 @@ class WBNM(Model):
         "sorell_catchment_data.txt\n" + \
         "#####END_DESIGN_RAIN_ARR\n" + \
         "#####START_CALC_RAINGAUGE_WEIGHTS\n" + \
+        self._weightRows() + \
         "#####END_CALC_RAINGAUGE_WEIGHTS\n" + \
         "#####START_LOSS_RATES\n" + \
         f"{self._createValueBlock('GLOBAL')}{self._createValueBlock(27.0)}{self._createValueBlock(4.0)}{self._createValueBlock(0.0)}\n" + \
@@ -284,6 +463,60 @@ class WBNM(Model):
         "#####END_STORM#1\n" + \
         "#####END_STORM_BLOCK###############|###########|###########|###########|"
 
+    def _weightRows(self) -> str:
+        """The CALC_RAINGAUGE_WEIGHTS rows, the weight of each gauge for each subarea."""
+        if self._gauges is None:
+            return ""
+        return "".join(self._createValueBlock(s.name) +
+                       "".join(self._createValueBlock(round(float(w), 4)) for w in self._gauges.row(s.name)) + "\n"
+                       for s in self._subAreas)
+
+    def _stormRows(self, number: int, storm) -> str:
+        """The rows of a storm of the STORM_BLOCK."""
+        il, cl = self._losses
+        if self._gauges is None:
+            gauges = f"{self._createValueBlock('DESIGN')}{self._createValueBlock(0.0)}{self._createValueBlock(0.0)}\n"
+            count = 1
+        else:
+            gauges = "".join(f"{self._createValueBlock(name)}{self._createValueBlock(round(float(x), 3))}"
+                             f"{self._createValueBlock(round(float(y), 3))}\n"
+                             for name, (x, y) in zip(self._gauges.gauges, self._gauges.points))
+            count = len(self._gauges.gauges)
+        rainfall = "".join(self._createValueBlock(round(float(r), 3)) * count + "\n" for r in storm.rainfall)
+        return \
+        f"#####START_STORM#{number}\n" + \
+        f"{storm.name} - losses {il:g}/{cl:g} GLOBAL - ARF = {getattr(storm, 'arf', 1.0):.3f}\n" + \
+        f"{self._createValueBlock(1.0)}\n" + \
+        f"{self._createValueBlock(float(storm.timestep))}\n" + \
+        "#####START_RECORDED_RAIN\n" + \
+        f"{self._createValueBlock(0.0)}{self._createValueBlock(float(storm.timestep))}{self._createValueBlock(len(storm.rainfall))}\n" + \
+        f"{self._createValueBlock(count)}\n" + \
+        gauges + \
+        rainfall + \
+        "#####END_RECORDED_RAIN\n" + \
+        "#####START_CALC_RAINGAUGE_WEIGHTS\n" + \
+        self._weightRows() + \
+        "#####END_CALC_RAINGAUGE_WEIGHTS\n" + \
+        "#####START_LOSS_RATES\n" + \
+        f"{self._createValueBlock('GLOBAL')}{self._createValueBlock(float(il))}{self._createValueBlock(float(cl))}{self._createValueBlock(0.0)}\n" + \
+        "#####END_LOSS_RATES\n" + \
+        "#####START_RECORDED_HYDROGRAPHS\n" + \
+        f"{self._createValueBlock(0)}\n" + \
+        "#####END_RECORDED_HYDROGRAPHS\n" + \
+        "#####START_IMPORTED_HYDROGRAPHS\n" + \
+        f"{self._createValueBlock(0)}\n" + \
+        "#####END_IMPORTED_HYDROGRAPHS\n" + \
+        f"#####END_STORM#{number}\n"
+
+
+def _sameStorms(a: list, b: list) -> bool:
+    """True if two lists of storms have the same names, time steps and rainfall."""
+    return (len(a) == len(b)) and all(
+        (x.name == y.name) and (x.timestep == y.timestep) and np.array_equal(x.rainfall, y.rainfall)
+        and (getattr(x, 'arf', 1.0) == getattr(y, 'arf', 1.0))
+        for x, y in zip(a, b))
+
+
 class SubArea(Basin):
     """SubArea as defined by the WBNM specification.
     
@@ -296,9 +529,9 @@ class SubArea(Basin):
     """
 
     def __init__(self, basin: Basin):
+        self._basin: Basin = basin
         self._x: float = basin._x
         self._y:float = basin._y
-        self._type: int = basin._type
         self._name: str = basin._name
         self._out: Point
         self._streamChannel: bool
@@ -307,6 +540,10 @@ class SubArea(Basin):
         self._dsNodeIndex: int
         self._dsSubArea: SubArea
 
+    @property
+    def basin(self) -> Basin:
+        return self._basin
+
     @property
     def x(self) -> tuple:
         return self._x
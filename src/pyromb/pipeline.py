@@ -0,0 +1,97 @@
+import asyncio
+import contextvars
+from functools import partial
+
+from .core.catchment import Catchment
+from .core.gis.builder import Builder
+from .core.gis.vector_layer import VectorLayer
+from .core.model import Model
+from .core.monitor import CancellationToken, Monitor
+from .core.traveller import Traveller
+from .core.validation import check
+
+STAGES = ("reaches", "confluences", "basins", "validate", "connect", "traverse")
+
+
+async def build_model(reaches: VectorLayer,
+                      basins: VectorLayer,
+                      centroids: VectorLayer,
+                      confluences: VectorLayer,
+                      model: Model,
+                      progress=None,
+                      token: CancellationToken | None = None,
+                      executor=None) -> str:
+    """Build the control vector of a hydrology model without blocking the event loop.
+
+    Each stage of the build (see STAGES) runs in an executor and the coroutine yields to
+    the event loop between stages. The snapping, matching and traversal loops check the
+    cancellation token as they go, so a cancelled build stops part way through a stage.
+    Cancelling the task awaiting the build also cancels the token. The built entities are
+    validated before they are connected so bad inputs fail before the slow stages.
+
+    Parameters
+    ----------
+    reaches : VectorLayer
+        The vector layer the reaches are in.
+    basins : VectorLayer
+        The vector layer the basins are in.
+    centroids : VectorLayer
+        The vector layer the centroids are in.
+    confluences : VectorLayer
+        The vector layer the confluences are in.
+    model : Model
+        The hydrology model to build, e.g. RORB().
+    progress : Callable[[str, int, int], None] | None
+        Called on the event loop thread with (stage, done, total) as each stage proceeds.
+    token : CancellationToken | None
+        The token to stop the build with.
+    executor : concurrent.futures.Executor | None
+        The executor to run the stages in, defaults to the loop's default executor.
+
+    Returns:
+    -------
+    str
+        The control vector of the model.
+
+    Raises:
+    ------
+    BuildCancelled
+        If the token is cancelled during the build.
+    ValidationError
+        If the layers have errors, e.g. duplicate ids or unsnapped reaches.
+    """
+    loop = asyncio.get_running_loop()
+    token = token if token is not None else CancellationToken()
+    if progress is not None:
+        report = partial(loop.call_soon_threadsafe, progress)
+    else:
+        report = None
+    monitor = Monitor(progress=report, token=token)
+    builder = Builder()
+
+    async def run(stage, fn, *args):
+        try:
+            # Copy the context so the stage is recorded by the Instrumentation of the build.
+            context = contextvars.copy_context()
+            return await loop.run_in_executor(executor, partial(context.run, fn, *args, monitor=monitor.stage(stage)))
+        except asyncio.CancelledError:
+            token.cancel()
+            raise
+
+    tr = await run("reaches", builder.reach, reaches)
+    tc = await run("confluences", builder.confluence, confluences)
+    tb = await run("basins", builder.basin, centroids, basins)
+    catchment = Catchment(tc, tb, tr)
+    await run("validate", _validate, catchment, centroids, basins)
+    await run("connect", catchment.connect)
+    return await run("traverse", _traverse, catchment, model)
+
+
+def _validate(catchment: Catchment, centroids: VectorLayer, basins: VectorLayer, monitor: Monitor) -> None:
+    monitor.update(0, 1)
+    check(catchment, centroids, basins)
+    monitor.update(1, 1)
+
+
+def _traverse(catchment: Catchment, model: Model, monitor: Monitor) -> str:
+    return Traveller(catchment, monitor).getVector(model)
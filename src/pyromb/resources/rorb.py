@@ -6,4 +6,6 @@ REACH_HEADER = "C #REACHES\n"
 GRAPHICAL_TAIL = "C\nC #STORAGES\nC      0\nC\nC #INFLOW/OUTFLOW\nC      0\nC\nC END RORB_GE\nC\n"
 
 AREA_TABLE_HEADER = "C Sub Area Data\nC Areas, km**2, of subareas A,B...\n"
+PARAMETER_HEADER = "C Parameter Estimates\n"
+STORM_HEADER = "C Time increment, h, number of increments, bursts and hydrographs\n"
 FI_TABLE_HEADER = "C Impervious Fraction Data\n"
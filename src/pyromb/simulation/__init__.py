@@ -0,0 +1,21 @@
+"""In process runoff routing of the control vectors for screening design storms."""
+
+from .losses import Excess, rainfall_excess
+from .rorb import RORBEngine
+from .routing import storage_route, subarea_inflow
+from .unit_hydrograph import UnitHydrographs, convolve, unit_hydrographs
+from .urbs import URBSEngine
+from .wbnm import WBNMEngine
+
+__all__ = [
+    "Excess",
+    "RORBEngine",
+    "URBSEngine",
+    "UnitHydrographs",
+    "WBNMEngine",
+    "convolve",
+    "rainfall_excess",
+    "storage_route",
+    "subarea_inflow",
+    "unit_hydrographs",
+]
@@ -0,0 +1,109 @@
+import numpy as np
+
+from ..analysis.distance import flow_distance
+from ..core.catchment import Catchment
+from ..core.traveller import Traveller
+from ..models.rorb import VectorBlock
+from .routing import storage_route, subarea_inflow
+
+
+class RORBEngine:
+    """Run the RORB control vector of a catchment in process.
+
+    The control codes of VectorBlock form a stack machine over hydrographs. Code 1 starts
+    the running hydrograph with the inflow of a sub-area and code 2 adds a sub-area to
+    it, both then route it down the reach below the sub-area. Code 3 stores the running
+    hydrograph and starts a new branch, code 4 adds the last stored hydrograph back and
+    code 5 routes the running hydrograph down the reach below a confluence. The program
+    ends at the outlet.
+
+    Each reach is a nonlinear storage S = kc kr Q^m where kr is the relative delay of the
+    reach (see analysis.flow_distance). The hydrographs of a whole storm ensemble, e.g.
+    every AEP, duration and temporal pattern, are columns of one array and run through
+    the program together. The engine is meant for screening storms, design runs should
+    still use the RORB executable.
+
+    Parameters
+    ----------
+    catchment : Catchment
+        A connected catchment.
+    kc : float
+        The RORB routing coefficient in hours.
+    m : float
+        The RORB nonlinearity exponent.
+    factors : dict | None
+        The delay factors of each reach type, see analysis.flow_distance.
+
+    Attributes:
+    ----------
+    subareas : list[str]
+        The sub-area names in the order of the RORB area table.
+    program : list[tuple]
+        The (code, sub-area, kr) instructions, the sub-area and kr are -1 and 0 where
+        the code does not use them.
+    """
+
+    def __init__(self, catchment: Catchment, kc: float, m: float = 0.8, factors: dict | None = None) -> None:
+        self.kc = kc
+        self.m = m
+        self.area = []
+        self.subareas = []
+        self.program = []
+
+        delay = flow_distance(catchment, factors).delay
+        reach, _ = catchment._links()
+        traveller = Traveller(catchment)
+        traveller.next()
+        block = VectorBlock()
+        while traveller._pos != traveller._endSentinel:
+            block.step(traveller)
+            code, i = block.state[-1]
+            if code == 0:
+                break
+            subarea = -1
+            if code in (1, 2):
+                subarea = len(self.subareas)
+                self.subareas.append(catchment._vertices[i].name)
+                self.area.append(catchment._vertices[i].area)
+            kr = float(delay[reach[i]]) if (code in (1, 2, 5)) and (reach[i] >= 0) else 0.0
+            self.program.append((code, subarea, kr))
+            if (code in (1, 2, 5)) and (reach[i] < 0):
+                break
+        self.area = np.array(self.area, dtype=float)
+
+    def route(self, excess: np.ndarray, dt: float, steps: int | None = None) -> np.ndarray:
+        """Route rainfall excess to the outlet.
+
+        Parameters
+        ----------
+        excess : np.ndarray
+            The rainfall excess in mm per time step, either (steps, storms) applied to
+            every sub-area or (sub-areas, steps, storms) in the order of subareas. Storms
+            of different durations are padded with zeros.
+        dt : float
+            The time step in hours.
+        steps : int | None
+            The number of time steps to route, defaults to twice the storm length so the
+            recession is included.
+
+        Returns:
+        -------
+        np.ndarray
+            The (steps, storms) outlet hydrographs in m3/s.
+        """
+        inflow = subarea_inflow(excess, self.area, dt, steps)
+        running = np.zeros(inflow.shape[1:])
+        stored = []
+        for code, subarea, kr in self.program:
+            if code == 1:
+                running = inflow[subarea].copy()
+            elif code == 2:
+                running = running + inflow[subarea]
+            elif code == 3:
+                stored.append(running)
+                running = np.zeros(inflow.shape[1:])
+            elif code == 4:
+                running = running + stored.pop()
+            if code in (1, 2, 5):
+                running = storage_route(running, self.kc * kr, self.m, dt)
+        return running
@@ -0,0 +1,144 @@
+import math
+from dataclasses import dataclass
+
+import numpy as np
+
+from ..analysis.distance import flow_distance
+from ..core.attributes.basin import Basin
+from ..core.catchment import Catchment
+
+
+@dataclass
+class UnitHydrographs:
+    """The unit hydrograph at the outlet of the catchment for each basin.
+
+    Attributes:
+    ----------
+    names : list[str]
+        The name of each basin.
+    dt : float
+        The time step in hours.
+    ordinates : np.ndarray
+        The (basins, length) flow at the outlet in m3/s from 1 mm of excess on the basin
+        in the first time step.
+    """
+    names: list
+    dt: float
+    ordinates: np.ndarray
+
+    def convolve(self, excess: np.ndarray, outlet: bool = True) -> np.ndarray:
+        """Convolve rainfall excess with the unit hydrographs.
+
+        The convolution is a product in the frequency domain, so its cost grows with
+        n log n in the storm length rather than with the product of the storm and unit
+        hydrograph lengths. Summing the basins at the outlet is done before the inverse
+        transform, one per storm.
+
+        Parameters
+        ----------
+        excess : np.ndarray
+            The (..., basins, steps) excess in mm per time step, e.g. storms by basins by
+            time steps, in the order of names.
+        outlet : bool
+            Sum the basins into the outlet hydrograph, otherwise return each basin's.
+
+        Returns:
+        -------
+        np.ndarray
+            The (..., steps + length - 1) outlet hydrographs or the
+            (..., basins, steps + length - 1) basin hydrographs in m3/s.
+        """
+        return convolve(excess, self.ordinates, outlet)
+
+
+def unit_hydrographs(catchment: Catchment,
+                     dt: float,
+                     velocity: float = 1.0,
+                     storage: float = 1.0,
+                     method: str = "clark") -> UnitHydrographs:
+    """Derive Clark or time-area unit hydrographs for every basin of a catchment.
+
+    The time of concentration of a basin is found from its area, tc = 0.76 A^0.38 hours
+    (Pilgrim and McDermott), and its runoff follows the HEC-1 time-area curve of a basin
+    with that time of concentration. The runoff is translated to the outlet at the given
+    velocity along the flow distance of the basin (see analysis.flow_distance). The Clark
+    unit hydrograph then routes it through a linear reservoir R = storage * tc, the
+    time-area unit hydrograph does not.
+
+    Parameters
+    ----------
+    catchment : Catchment
+        A connected catchment.
+    dt : float
+        The time step in hours.
+    velocity : float
+        The flow velocity along the reaches in m/s.
+    storage : float
+        The Clark storage coefficient as a multiple of the time of concentration.
+    method : str
+        'clark' or 'time-area'.
+
+    Returns:
+    -------
+    UnitHydrographs
+        The unit hydrographs of the basins in the order of the catchment.
+
+    Raises:
+    ------
+    ValueError
+        If the method is not known.
+    """
+    if method not in ("clark", "time-area"):
+        raise ValueError(f"Unknown unit hydrograph method {method}, expected 'clark' or 'time-area'")
+    distances = flow_distance(catchment)
+    basins = [(k, v) for k, v in enumerate(catchment._vertices) if isinstance(v, Basin)]
+    area = np.array([v.area for _, v in basins], dtype=float)
+    tc = 0.76 * area ** 0.38
+    travel = np.array([distances.distance[k] for k, _ in basins], dtype=float) / (3.6 * velocity)
+    reservoir = storage * tc if method == "clark" else np.zeros_like(tc)
+
+    length = int(math.ceil((np.max(tc + travel, initial=0.0) + 10 * np.max(reservoir, initial=0.0)) / dt)) + 2
+    t = np.arange(length + 1) * dt
+    # The HEC-1 time-area curve of each basin sampled at the ends of the time steps.
+    x = np.clip((t[None, :] - travel[:, None]) / tc[:, None], 0.0, 1.0)
+    curve = np.where(x < 0.5, 1.414 * x ** 1.5, 1 - 1.414 * (1 - x) ** 1.5)
+    inflow = np.diff(curve, axis=1) * (area / (3.6 * dt))[:, None]
+
+    ordinates = inflow
+    if method == "clark":
+        c = (dt / (reservoir + 0.5 * dt))[:, None]
+        ordinates = np.zeros_like(inflow)
+        previous = np.zeros((len(basins), 1))
+        for step in range(length):
+            previous = c * inflow[:, step:step + 1] + (1 - c) * previous
+            ordinates[:, step:step + 1] = previous
+    return UnitHydrographs([v.name for _, v in basins], dt, ordinates)
+
+
+def convolve(excess: np.ndarray, ordinates: np.ndarray, outlet: bool = True) -> np.ndarray:
+    """Convolve stacked rainfall excess with unit hydrographs through the FFT.
+
+    Parameters
+    ----------
+    excess : np.ndarray
+        The (..., basins, steps) excess in mm per time step.
+    ordinates : np.ndarray
+        The (basins, length) unit hydrographs.
+    outlet : bool
+        Sum the basins, otherwise return the hydrograph of each basin.
+
+    Returns:
+    -------
+    np.ndarray
+        The (..., steps + length - 1) or (..., basins, steps + length - 1) hydrographs.
+    """
+    excess = np.asarray(excess)
+    ordinates = np.asarray(ordinates)
+    if excess.shape[-2] != ordinates.shape[0]:
+        raise ValueError(f"Expected excess for {ordinates.shape[0]} basins, not {excess.shape[-2]}")
+    size = excess.shape[-1] + ordinates.shape[-1] - 1
+    n = 1 << max(size - 1, 0).bit_length()
+    spectrum = np.fft.rfft(excess, n, axis=-1) * np.fft.rfft(ordinates, n, axis=-1)
+    if outlet:
+        spectrum = spectrum.sum(axis=-2)
+    return np.fft.irfft(spectrum, n, axis=-1)[..., :size]
@@ -0,0 +1,165 @@
+import csv
+import re
+from io import StringIO
+
+import numpy as np
+
+from ..models.urbs import URBS
+from .losses import rainfall_excess
+from .routing import storage_route, subarea_inflow
+
+_COMMAND = re.compile(r"^(ADD RAIN|RAIN|ROUTE THRU|STORE|GET|PRINT)\.?\s*(?:#(\d+))?(.*)$")
+_PARAMETER = re.compile(r"(\w+)\s*=\s*([^\s]+)")
+
+
+class URBSEngine:
+    """Evaluate a URBS SPLIT model from its .vec and .cat files in process.
+
+    The commands are run as a stack machine over hydrographs. RAIN starts the running
+    hydrograph with the runoff of a sub-catchment and ADD RAIN adds it, both then route
+    the running hydrograph along the channel of length L. STORE pushes the running
+    hydrograph and starts a new branch, GET adds the last stored hydrograph back, ROUTE
+    THRU routes along a channel without local inflow and PRINT records the running
+    hydrograph.
+
+    The rainfall on each sub-catchment loses its initial and continuing loss (IL, CL in
+    the .cat file) and the excess is routed through a catchment storage
+    S = beta sqrt(A) (1 + U)^-2 Q^m. Channels are nonlinear Muskingum storages
+    S = alpha n L Sc^-0.5 (1 + U)^-2 (x I + (1 - x) Q)^m, the slope term is left out
+    where no Sc is given. The urban fraction U is the imperviousness of the .cat file,
+    the channel of a ROUTE THRU has no sub-catchment and so no urban fraction.
+    The hydrographs of many rainfall scenarios are columns of one array and run through
+    the commands together.
+
+    Parameters
+    ----------
+    vec : str
+        The content of the .vec file.
+    cat : str
+        The content of the .cat file.
+    parameters : dict | None
+        Replaces the default parameters of the .vec file, e.g. {'alpha': 0.3}.
+
+    Attributes:
+    ----------
+    commands : list[tuple]
+        The (command, index, values) of each command, the index is -1 if there is none.
+    subcatchments : list[int]
+        The sub-catchment indexes in the order of the .cat file.
+    """
+
+    def __init__(self, vec: str, cat: str, parameters: dict | None = None) -> None:
+        self.parameters = dict(URBS.DEFAULT_PARAMETERS)
+        self.commands = []
+        for line in vec.splitlines():
+            line = line.strip()
+            if line.startswith("DEFAULT PARAMETERS:"):
+                self.parameters |= {k: float(v) for k, v in _PARAMETER.findall(line.split(":", 1)[1])}
+                continue
+            match = _COMMAND.match(line)
+            if match is None:
+                continue
+            command, index, rest = match.groups()
+            if command == "PRINT":
+                values = {"name": rest.strip()}
+            else:
+                values = {k: float(v) for k, v in _PARAMETER.findall(rest)}
+            self.commands.append((command, int(index) if index else -1, values))
+        self.parameters |= parameters or {}
+
+        rows = list(csv.DictReader(StringIO(cat.strip())))
+        self.subcatchments = [int(r["Index"]) for r in rows]
+        self.area = np.array([float(r["Area"]) for r in rows], dtype=float)
+        self.urban = np.array([float(r["Imperviousness"]) for r in rows], dtype=float)
+        self.il = np.array([float(r["IL"]) for r in rows], dtype=float)
+        self.cl = np.array([float(r["CL"]) for r in rows], dtype=float)
+        self._row = {index: k for k, index in enumerate(self.subcatchments)}
+
+    @classmethod
+    def fromFiles(cls, vec: str, cat: str, parameters: dict | None = None) -> 'URBSEngine':
+        """Read the engine from .vec and .cat file paths.
+
+        Parameters
+        ----------
+        vec : str
+            The path of the .vec file.
+        cat : str
+            The path of the .cat file.
+        parameters : dict | None
+            Replaces the default parameters of the .vec file.
+
+        Returns:
+        -------
+        URBSEngine
+            The engine of the model.
+        """
+        with open(vec, 'r') as v, open(cat, 'r') as c:
+            return cls(v.read(), c.read(), parameters)
+
+    def route(self, rainfall: np.ndarray, dt: float, steps: int | None = None) -> dict:
+        """Run the rainfall through the model.
+
+        Parameters
+        ----------
+        rainfall : np.ndarray
+            The rainfall in mm per time step, either (steps, scenarios) on every
+            sub-catchment or (sub-catchments, steps, scenarios) in the order of the .cat
+            file. Scenarios of different durations are padded with zeros.
+        dt : float
+            The time step in hours.
+        steps : int | None
+            The number of time steps to route, defaults to twice the storm length so the
+            recession is included.
+
+        Returns:
+        -------
+        dict[str, np.ndarray]
+            The (steps, scenarios) hydrograph in m3/s at each PRINT, by name.
+
+        Raises:
+        ------
+        KeyError
+            If a command refers to a sub-catchment missing from the .cat file.
+        """
+        p = self.parameters
+        inflow = subarea_inflow(self._excess(rainfall, dt), self.area, dt, steps)
+        urban = (1 + self.urban) ** -2
+
+        def channel(hydrograph: np.ndarray, u: float, values: dict) -> np.ndarray:
+            slope = values.get("Sc", 0.0)
+            k = p["alpha"] * p["n"] * values.get("L", 0.0) * u / (np.sqrt(slope) if slope > 0 else 1.0)
+            return storage_route(hydrograph, k, p["m"], dt, p["x"])
+
+        def runoff(index: int) -> np.ndarray:
+            s = self._row[index]
+            k = p["beta"] * np.sqrt(self.area[s]) * urban[s]
+            return storage_route(inflow[s], k, p["m"], dt)
+
+        running = np.zeros(inflow.shape[1:])
+        stored = []
+        prints = {}
+        for command, index, values in self.commands:
+            if command == "RAIN":
+                running = channel(runoff(index), urban[self._row[index]], values)
+            elif command == "ADD RAIN":
+                running = channel(running + runoff(index), urban[self._row[index]], values)
+            elif command == "ROUTE THRU":
+                # The index of a ROUTE THRU is a node rather than a sub-catchment, its channel is not urban.
+                running = channel(running, 1.0, values)
+            elif command == "STORE":
+                stored.append(running)
+                running = np.zeros(inflow.shape[1:])
+            elif command == "GET":
+                running = running + stored.pop()
+            elif command == "PRINT":
+                prints[values["name"]] = running.copy()
+        return prints
+
+    def _excess(self, rainfall: np.ndarray, dt: float) -> np.ndarray:
+        """The rainfall left after the initial and continuing loss of each sub-catchment."""
+        rainfall = np.asarray(rainfall, dtype=float)
+        if rainfall.ndim < 3:
+            rainfall = np.broadcast_to(rainfall, (len(self.area),) + rainfall.shape)
+        # The loss engine takes the sub-areas and time steps last, the routing takes them first.
+        excess = rainfall_excess(np.moveaxis(rainfall, (0, 1), (-2, -1)), dt, self.il, self.cl)
+        return np.moveaxis(excess.pervious, (-2, -1), (0, 1))
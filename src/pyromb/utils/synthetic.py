@@ -0,0 +1,136 @@
+from collections import namedtuple
+
+from ..core.gis.memory_layer import MemoryLayer
+
+Layers = namedtuple('Layers', ['basins', 'centroids', 'confluences', 'reaches'])
+
+
+def synthetic_catchment(subareas: int = 100,
+                        branching: int = 2,
+                        depth: int | None = None,
+                        vertices: int = 2,
+                        spacing: float = 100.0,
+                        fi: float = 0.0,
+                        slope: float = 0.01) -> Layers:
+    """Generate the vector layers of a synthetic catchment.
+
+    The confluences form a complete tree with `branching` tributaries joining at each
+    confluence and `depth` levels below the outlet. Below the deepest confluences are
+    `branching` headwater streams each. The subareas are spread evenly in series along
+    the streams between confluences, every headwater stream has at least one subarea.
+    The layers can be passed to the Builder in place of shapefiles.
+
+    Parameters
+    ----------
+    subareas : int
+        The number of subareas (basins).
+    branching : int
+        The number of tributaries joining at each confluence.
+    depth : int | None
+        The number of confluence levels below the outlet. Defaults to the deepest tree
+        that leaves at least two subareas per headwater stream.
+    vertices : int
+        The number of vertices of each reach, at least 2.
+    spacing : float
+        The distance between neighbouring nodes in metres. Must be less than the snapping
+        distance of the Catchment.
+    fi : float
+        The fraction impervious of every subarea.
+    slope : float
+        The slope of every reach.
+
+    Returns:
+    -------
+    Layers
+        (basins, centroids, confluences, reaches) in memory vector layers.
+
+    Raises:
+    ------
+    ValueError
+        If the tree has more headwater streams than there are subareas.
+    """
+    if branching < 1:
+        raise ValueError("branching must be at least 1")
+    if vertices < 2:
+        raise ValueError("A reach must have at least 2 vertices")
+    if depth is None:
+        depth = 0
+        while branching > 1 and branching ** (depth + 2) * 2 <= subareas:
+            depth += 1
+    headwaters = branching ** (depth + 1)
+    if (depth < 0) or (subareas < headwaters):
+        raise ValueError(f"{subareas} subareas cannot fill {headwaters} headwater streams")
+
+    # Confluences are numbered breadth first, k's downstream confluence is (k - 1) // branching.
+    confluences = sum(branching ** level for level in range(depth + 1))
+    deepest = confluences - branching ** depth
+    streams = [(None, k) for k in range(deepest, confluences) for _ in range(branching)]
+    streams += [(k, (k - 1) // branching) for k in range(1, confluences)]
+    counts = [1] * headwaters + [0] * (len(streams) - headwaters)
+    for i in range(subareas - headwaters):
+        counts[i % len(streams)] += 1
+
+    # Nodes 0..confluences-1 are the confluences, the basins follow. down[i] is the
+    # node downstream of node i along its reach.
+    down = [-1] * confluences
+    for (upper, lower), count in zip(streams, counts):
+        previous = upper
+        for _ in range(count):
+            down.append(-1)
+            if previous is not None:
+                down[previous] = len(down) - 1
+            previous = len(down) - 1
+        if previous is not None:
+            down[previous] = lower
+
+    points = _layout(down, spacing)
+    names = [f"c{k}" if k < confluences else f"b{k - confluences}" for k in range(len(down))]
+
+    h = 0.4 * spacing
+    basin, centroid, confluence, reach = ([], []), ([], []), ([], []), ([], [])
+    for k, (x, y) in enumerate(points):
+        if k < confluences:
+            confluence[0].append([(x, y)])
+            confluence[1].append({'id': names[k], 'out': int(k == 0)})
+        else:
+            basin[0].append([(x - h, y - h), (x - h, y + h), (x + h, y + h), (x + h, y - h), (x - h, y - h)])
+            basin[1].append({'id': names[k]})
+            centroid[0].append([(x, y)])
+            centroid[1].append({'id': names[k], 'fi': fi})
+        if down[k] != -1:
+            (x1, y1) = points[down[k]]
+            reach[0].append([(x + (x1 - x) * t / (vertices - 1), y + (y1 - y) * t / (vertices - 1))
+                             for t in range(vertices)])
+            reach[1].append({'id': f"r{len(reach[1])}", 't': 1, 's': slope})
+
+    return Layers(MemoryLayer(*basin), MemoryLayer(*centroid), MemoryLayer(*confluence), MemoryLayer(*reach))
+
+
+def _layout(down: list, spacing: float) -> list:
+    """Place the nodes of the tree so that no two nodes share a position.
+
+    Headwater nodes are spaced along x in depth first order, every other node sits at the
+    mean x of its upstream nodes. y is the number of reaches to the outlet.
+    """
+    up = [[] for _ in down]
+    for k, d in enumerate(down):
+        if d != -1:
+            up[d].append(k)
+
+    x = [0.0] * len(down)
+    y = [0.0] * len(down)
+    leaves = 0
+    stack = [(0, False)]
+    while stack:
+        k, visited = stack.pop()
+        if visited:
+            x[k] = sum(x[u] for u in up[k]) / len(up[k])
+        elif not up[k]:
+            x[k] = leaves
+            leaves += 1
+        else:
+            stack.append((k, True))
+            for u in reversed(up[k]):
+                y[u] = y[k] + 1
+                stack.append((u, False))
+    return [(x[k] * spacing, y[k] * spacing) for k in range(len(down))]
@@ -4,7 +4,7 @@ from collections import namedtuple
 import pytest
 from shapefile import Reader
 
-from pyromb import VectorLayer
+from pyromb import Builder, Catchment, VectorLayer
 
 class Vector(Reader, VectorLayer):
     """Wrap the shapefile.Reader() with the necessary interface
@@ -37,4 +37,18 @@ def vectors() -> tuple[Vector,...]:
 
     nt = namedtuple('vectors', ['basins', 'centroids', 'confluences', 'reaches'])
     
-    return nt(basin_vector, centroid_vector, confluence_vector, reach_vector)
\ No newline at end of file
+    return nt(basin_vector, centroid_vector, confluence_vector, reach_vector)
+
+@pytest.fixture
+def catchment(vectors):
+    """
+    Returns:
+        Catchment: The connected catchment built from the test vectors.
+    """
+    builder = Builder()
+    tr = builder.reach(vectors.reaches)
+    tc = builder.confluence(vectors.confluences)
+    tb = builder.basin(vectors.centroids, vectors.basins)
+    catchment = Catchment(tc, tb, tr)
+    catchment.connect()
+    return catchment
@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+from pyromb import RORB, Traveller
+from pyromb.analysis import accumulate, flow_distance, idw_weights, thiessen_weights
+from pyromb.analysis.tree import first_below, levels, subtree_sums
+from pyromb.core.attributes.basin import Basin
+
+
+def test_levels() -> None:
+    result = levels(np.array([-1, 0, 0, 1, 3, -1, 5]))
+    assert [sorted(level.tolist()) for level in result] == [[0, 5], [1, 2, 6], [3], [4]]
+
+
+def test_pointer_jumping() -> None:
+    down = np.array([-1, 0, 0, 1, 3, -1, 5])
+    assert subtree_sums(down, np.arange(1, 8)).tolist() == [15, 11, 3, 9, 5, 13, 7]
+    assert first_below(down, np.array([0, 0, 0, 1, 0, 0, 0], dtype=bool)).tolist() == [-1, -1, -1, 3, 3, -1, -1]
+    with pytest.raises(ValueError):
+        subtree_sums(np.array([1, 0, -1]), np.ones(3))
+
+
+def test_accumulate(catchment) -> None:
+    for v in catchment._vertices:
+        if isinstance(v, Basin):
+            v.fi = 0.5 if v.name == 'b1' else 0.0
+    frame = accumulate(catchment).frame()
+
+    assert frame.loc['c1', 'basins'] == 6
+    assert np.isclose(frame.loc['c1', 'area'], sum(v.area for v in catchment._vertices if isinstance(v, Basin)))
+    assert np.isclose(frame.loc['b4', 'fi'], 0.5 / 3)
+    assert np.isclose(frame.loc['c2', 'fi'], frame.loc['b4', 'fi'] * frame.loc['b4', 'area'] / frame.loc['c2', 'area'])
+    assert frame['strahler'].to_dict() == {'c1': 2, 'c2': 2, 'b1': 1, 'b2': 1, 'b3': 1, 'b4': 2, 'b5': 1, 'b6': 2}
+    assert frame['shreve'].to_dict() == {'c1': 3, 'c2': 3, 'b1': 1, 'b2': 1, 'b3': 1, 'b4': 2, 'b5': 1, 'b6': 3}
+
+
+def test_flow_distance(catchment) -> None:
+    result = flow_distance(catchment)
+    frame = result.frame()
+    length = dict(zip(result.reaches, result.length))
+
+    assert frame.loc['c1', 'distance'] == 0.0
+    assert np.isclose(frame.loc['b1', 'distance'], length['r1'] + length['r4'] + length['r6'] + length['r7'])
+    areas = {v.name: v.area for v in catchment._vertices if isinstance(v, Basin)}
+    dav = sum(a * frame.loc[n, 'distance'] for n, a in areas.items()) / sum(areas.values())
+    assert np.isclose(frame.loc['c1', 'dav'], dav)
+    assert np.isclose(frame.loc['b4', 'dav'], (length['r1'] + length['r2']) / 3)
+    assert np.isclose(result.kc(), 1.25 * dav)
+    assert np.allclose(result.delay, result.length / dav)
+
+
+def test_rorb_kc(catchment) -> None:
+    plain = Traveller(catchment).getVector(RORB())
+    vector = Traveller(catchment).getVector(RORB(kcRatio=1.25))
+    assert vector.replace("C Parameter Estimates\n", "").count("\n") == plain.count("\n") + 1
+    assert f"kc = 1.25 x dav = {flow_distance(catchment).kc():.3f}" in vector
+
+
+def test_thiessen_weights() -> None:
+    gauges = {'west': (0.0, 5.0), 'east': (10.0, 5.0), 'far': (100.0, 100.0)}
+    square = [(0, 0), (10, 0), (10, 10), (0, 10)]
+    triangle = [(0, 0), (4, 0), (0, 4)]
+    weights = thiessen_weights(gauges, {'square': square, 'triangle': triangle})
+
+    assert np.allclose(weights.row('square'), [0.5, 0.5, 0.0])
+    assert np.allclose(weights.row('triangle'), [1.0, 0.0, 0.0])
+    assert weights.frame().loc['square', 'east'] == 0.5
+
+
+def test_thiessen_weights_exact() -> None:
+    gauges = {'a': (0.2, 0.5), 'b': (0.5, 0.5)}
+    # An L shaped subarea, the bisector x = 0.35 cuts both of its arms.
+    ell = [(0, 0), (1, 0), (1, 0.5), (0.5, 0.5), (0.5, 1), (0, 1)]
+    weights = thiessen_weights(gauges, {'square': [(0, 0), (1, 0), (1, 1), (0, 1)], 'ell': ell})
+
+    assert np.allclose(weights.row('square'), [0.35, 0.65])
+    assert np.allclose(weights.row('ell'), [0.35 / 0.75, 0.4 / 0.75])
+
+
+def test_idw_weights(catchment) -> None:
+    basins = [v for v in catchment._vertices if isinstance(v, Basin)]
+    x, y = basins[0].coordinates()
+    weights = idw_weights({'on': (x, y), 'off': (x + 1000.0, y)}, catchment)
+
+    assert weights.subareas == [b.name for b in basins]
+    assert np.allclose(weights.weights.sum(axis=1), 1.0)
+    assert np.allclose(weights.row(basins[0].name), [1.0, 0.0])
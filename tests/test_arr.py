@@ -0,0 +1,144 @@
+import os
+
+import numpy as np
+import pytest
+
+from pyromb.arr import IFD, DataPack, TemporalPatterns, aep_bin, arf, catchment_arf, design_storms
+from pyromb.batch import write_storms
+
+IFD_CSV = '''"IFD Design Rainfall Depth (mm)"
+"Location Label:","Sorell"
+"Duration","Duration in min","50%#","20%*","10%","1%"
+"10 min",10,8.0,11.0,13.0,20.0
+"1 hour",60,20.0,27.0,32.0,50.0
+"6 hour",360,40.0,55.0,65.0,100.0
+
+"Note",
+'''
+
+PATTERNS_CSV = '''EventID,Duration,TimeStep,Region,AEP,Increments
+1,60,20,Southern Slopes (Tasmania),frequent,50,30,20
+2,60,20,Southern Slopes (Tasmania),frequent,20,30,50
+3,60,20,Southern Slopes (Tasmania),rare,10,80,10
+4,10,5,Southern Slopes (Tasmania),rare,40,60
+'''
+
+CATCHMENT_TXT = '''[STARTTXT]
+Some text
+[ENDTXT]
+
+[LOSSES]
+ID,1
+Storm Initial Losses (mm),28.0
+Storm Continuing Losses (mm/h),3.2
+[LOSSES_META]
+Time Accessed,today
+[END_LOSSES]
+
+[TP]
+code,SSTasmania
+Label,Southern Slopes (Tasmania)
+[END_TP]
+
+[LONGARF]
+Zone,Tasmania
+a,0.0605
+b,0.347
+c,0.2
+d,0.377
+e,0.0
+f,0.0
+g,0.0
+h,0.0
+i,0.0
+[END_LONGARF]
+'''
+
+
+@pytest.fixture
+def pack_files(tmp_path):
+    paths = []
+    for name, content in (("ifd.csv", IFD_CSV), ("increments.csv", PATTERNS_CSV), ("data.txt", CATCHMENT_TXT)):
+        (tmp_path / name).write_text(content)
+        paths.append(str(tmp_path / name))
+    return paths
+
+
+def test_ifd(pack_files) -> None:
+    ifd = IFD.read(pack_files[0])
+
+    assert ifd.aeps.tolist() == [1.0, 10.0, 20.0, 50.0]
+    assert np.allclose(ifd.depth([1, 50], [60, 10]), [50.0, 8.0])
+    # Depths are log-log interpolated between the table values.
+    assert np.isclose(ifd.depth(1, np.sqrt(60 * 360)), np.sqrt(50.0 * 100.0))
+    assert ifd.depth(np.array([[5.0], [2.0]]), np.array([30.0, 120.0])).shape == (2, 2)
+    with pytest.raises(ValueError):
+        ifd.depth(0.5, 60)
+
+
+def test_patterns(pack_files) -> None:
+    patterns = TemporalPatterns.read(pack_files[1])
+    timestep, fractions = patterns.lookup(60, 20.0)
+
+    assert timestep == 20.0
+    assert np.allclose(fractions, [[0.5, 0.3, 0.2], [0.2, 0.3, 0.5]])
+    assert patterns.lookup(60, 25.0)[1] is fractions
+    assert np.allclose(patterns.lookup(10, 1.0)[1], [[0.4, 0.6]])
+    assert [aep_bin(a) for a in (50, 10, 1)] == ["frequent", "intermediate", "rare"]
+    with pytest.raises(KeyError):
+        patterns.lookup(60, 5.0)
+
+
+@pytest.mark.parametrize("name", ["pack.npz", "pack.cache"])
+def test_data_pack_cache(pack_files, tmp_path, monkeypatch, name) -> None:
+    cache = str(tmp_path / name)
+    pack = DataPack.load(*pack_files, cache=cache)
+    with monkeypatch.context() as m:
+        m.setattr(IFD, "read", None)
+        cached = DataPack.load(*pack_files, cache=cache)
+    assert not os.path.exists(cache + ".npz")
+
+    assert pack.catchment.losses == (28.0, 3.2)
+    assert pack.catchment.region == "Southern Slopes (Tasmania)"
+    assert cached.catchment.longarf == {"Zone": "Tasmania", "a": 0.0605, "b": 0.347, "c": 0.2, "d": 0.377,
+                                        "e": 0.0, "f": 0.0, "g": 0.0, "h": 0.0, "i": 0.0}
+    assert "Time Accessed" not in cached.catchment.values("LOSSES")
+    assert np.array_equal(cached.ifd.depths, pack.ifd.depths)
+    assert np.allclose(cached.patterns.lookup(60, 20.0)[1], pack.patterns.lookup(60, 20.0)[1])
+
+
+def test_design_storms(pack_files, tmp_path) -> None:
+    pack = DataPack.load(*pack_files)
+    storms = list(design_storms(pack, [1, 20], [60]))
+
+    assert [s.name for s in storms] == ["1%_60min_tp1", "20%_60min_tp1", "20%_60min_tp2"]
+    assert np.allclose(storms[0].rainfall, [5.0, 40.0, 5.0])
+    assert np.isclose(storms[1].rainfall.sum(), pack.ifd.depth(20, 60))
+
+    paths = write_storms(iter(storms), str(tmp_path / "storms"), losses=pack.catchment.losses, workers=2)
+    assert [os.path.basename(p) for p in paths["WBNM"]] == ["1pct_60min.storm.wbn", "20pct_60min.storm.wbn"]
+    assert len(paths["RORB"]) == 3
+    with open(paths["WBNM"][1]) as f:
+        block = f.read()
+    assert block.count("#####START_RECORDED_RAIN") == 2
+    with open(paths["RORB"][0]) as f:
+        assert f.read().splitlines()[6] == "5.000,40.000,5.000,-99"
+
+
+def test_arf(pack_files, catchment) -> None:
+    longarf = DataPack.load(*pack_files).catchment.longarf
+    factors = arf(100.0, np.array([60, 720, 1080, 1440]), np.array([[1.0], [50.0]]), longarf)
+
+    assert factors.shape == (2, 4)
+    assert np.all((factors > 0.7) & (factors < 1.0))
+    # Durations between 12 and 24 hours are blended between the two equations.
+    assert np.isclose(factors[0, 2], factors[0, 1:4:2].mean())
+    assert arf(0.5, 60, 1, longarf) == 1.0
+    assert arf(5.0, 60, 1, longarf) > arf(10.0, 60, 1, longarf)
+    assert np.all(catchment_arf(catchment, [60, 1440], 1, longarf) == 1.0)
+    with pytest.raises(ValueError):
+        arf(50000.0, 60, 1, longarf)
+
+    storms = list(design_storms(DataPack.load(*pack_files), [1], [60], area=100.0))
+    assert np.isclose(storms[0].arf, factors[0, 0])
+    assert np.isclose(storms[0].rainfall.sum(), 50.0 * factors[0, 0])
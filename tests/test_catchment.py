@@ -0,0 +1,181 @@
+import numpy as np
+import pytest
+
+import pyromb
+from pyromb.batch import export
+from pyromb.core.attributes.basin import Basin
+from pyromb.core.attributes.confluence import Confluence
+from pyromb.core.attributes.reach import Reach
+
+
+def links(catchment) -> set:
+    """(upstream, reach, downstream) names of every connection in the catchment."""
+    ds = catchment._incidenceMatrixDS
+    return {
+        (catchment._vertices[i].name, catchment._edges[j].name, catchment._vertices[ds[i][j]].name)
+        for i in range(ds.shape[0]) for j in range(ds.shape[1]) if ds[i][j] != catchment._endSentinel
+    }
+
+
+def reconnected(catchment):
+    confluences = [v for v in catchment._vertices if isinstance(v, Confluence)]
+    basins = [v for v in catchment._vertices if not isinstance(v, Confluence)]
+    fresh = pyromb.Catchment(confluences, basins, catchment._edges)
+    fresh.connect()
+    return fresh
+
+
+def test_split_reach(catchment) -> None:
+    reach = next(r for r in catchment._edges if r.name == 'r6')
+    upper, lower = catchment.splitReach(reach, Confluence('c3', 225.0, 150.0))
+
+    assert upper.length() + lower.length() == reach.length()
+    assert ('c2', 'r6', 'c3') in links(catchment)
+    assert ('c3', 'r6_ds', 'b6') in links(catchment)
+    assert links(catchment) == links(reconnected(catchment))
+
+
+def test_split_reach_capacity(catchment) -> None:
+    reach = next(r for r in catchment._edges if r.name == 'r6')
+    upper, _ = catchment.splitReach(reach, Confluence('c3', 225.0, 150.0))
+    buffers = catchment._buffers
+    catchment.splitReach(upper, Confluence('c4', 212.5, 150.0))
+
+    # The second split fits in the room left by the first.
+    assert all(a is b for a, b in zip(catchment._buffers, buffers))
+    assert catchment._incidenceMatrixDS.shape == (len(catchment._vertices), len(catchment._edges))
+    assert links(catchment) == links(reconnected(catchment))
+    catchment.removeReach(catchment._edges[0])
+    assert (buffers[0][:, len(catchment._edges)] == catchment._endSentinel).all()
+
+
+def test_remove_and_add_reach(catchment) -> None:
+    before = links(catchment)
+    reach = next(r for r in catchment._edges if r.name == 'r4')
+    catchment.removeReach(reach)
+    assert ('b4', 'r4', 'c2') not in links(catchment)
+
+    catchment.addReach(Reach('r4', [(200.0, 150.0), (150.0, 100.0)]))
+    assert links(catchment) == before
+
+
+def test_remove_reach_stranded(catchment, tmp_path) -> None:
+    reach = next(r for r in catchment._edges if r.name == 'r4')
+    catchment.removeReach(reach)
+
+    # b4 and the basins above it no longer drain to the outlet.
+    with pytest.raises(ValueError, match="b1, b2, b4"):
+        pyromb.Traveller(catchment).getVector(pyromb.RORB())
+    with pytest.raises(ValueError, match="do not drain"):
+        export(catchment, [pyromb.RORB()], str(tmp_path))
+    catchment.addReach(reach)
+    vector = pyromb.Traveller(catchment).getVector(pyromb.RORB())
+    assert vector == pyromb.Traveller(reconnected(catchment)).getVector(pyromb.RORB())
+    assert vector.count("\n") == 95
+
+
+def test_tour_patched(catchment) -> None:
+    def rebuilt(catchment) -> tuple:
+        catchment._intervals = None
+        return catchment._tour()
+
+    def check(catchment) -> None:
+        patched = catchment._cachedTour()
+        assert patched is not None
+        index, entry, exit, order, reach, down = rebuilt(catchment)
+        assert patched[0] == index
+        assert (patched[1] == entry).all() and (patched[2] == exit).all()
+        assert patched[3:] == (order, reach, down)
+
+    catchment._tour()
+    r4, r6 = (next(r for r in catchment._edges if r.name == n) for n in ('r4', 'r6'))
+    catchment.removeReach(r4)
+    check(catchment)
+    upper, _ = catchment.splitReach(r6, Confluence('c3', 225.0, 150.0))
+    check(catchment)
+    catchment.addReach(r4)
+    check(catchment)
+    catchment.splitReach(upper, Confluence('c4', 212.5, 150.0))
+    check(catchment)
+    catchment.removeReach(catchment._edges[0])
+    check(catchment)
+
+
+def test_add_reach_unsnapped(catchment) -> None:
+    # The start is by b4 but the end is far from every node.
+    with pytest.raises(ValueError, match="further than 999"):
+        catchment.addReach(Reach('typo', [(200.0, 150.0), (150.0, 10000.0)]))
+    assert len(catchment._edges) == 7
+
+
+def test_merge_basins(catchment) -> None:
+    b1, b4 = (next(v for v in catchment._vertices if v.name == n) for n in ('b1', 'b4'))
+    total = b1.area + b4.area
+    catchment.mergeBasins(b1, b4)
+
+    assert b1 not in catchment._vertices
+    assert b4.area == total
+    assert ('b2', 'r2', 'b4') in links(catchment)
+    assert len(catchment._edges) == 6
+    assert pyromb.Traveller(catchment).getVector(pyromb.RORB()).startswith("REACH")
+
+
+def test_coarsen(catchment) -> None:
+    basins = [v for v in catchment._vertices if isinstance(v, Basin)]
+    total = sum(b.area for b in basins)
+    impervious = sum(b.area * b.fi for b in basins)
+    length = sum(r.length() for r in catchment._edges if r.name in ('r4', 'r6'))
+    mapping = catchment.coarsen(0.025)
+
+    remaining = [v for v in catchment._vertices if isinstance(v, Basin)]
+    assert [b.name for b in remaining] == ['b4', 'b6']
+    assert np.isclose(sum(b.area for b in remaining), total)
+    assert np.isclose(sum(b.area * b.fi for b in remaining), impervious)
+    assert mapping['b3'] == 'b4' and mapping['r3'] == 'b4'
+    assert mapping['c2'] == 'r4' and mapping['r6'] == 'r4'
+    assert links(catchment) == {('b4', 'r4', 'b6'), ('b6', 'r7', 'c1')}
+    assert np.isclose(catchment._edges[0].length(), length)
+    assert pyromb.Traveller(catchment).getVector(pyromb.RORB()).startswith("REACH")
+
+
+def test_update_node(catchment) -> None:
+    basin = next(v for v in catchment._vertices if v.name == 'b2')
+    version = catchment._topologyVersion
+    catchment.updateNode(basin, fi=0.9)
+
+    assert basin.fi == 0.9
+    assert catchment._topologyVersion == version
+
+
+def node(catchment, name):
+    return next(v for v in catchment._vertices if v.name == name)
+
+
+def test_upstream(catchment) -> None:
+    c2 = node(catchment, 'c2')
+    assert sorted(v.name for v in catchment.upstream(c2)) == ['b1', 'b2', 'b3', 'b4', 'b5', 'c2']
+    assert catchment.upstream(node(catchment, 'b1')) == [node(catchment, 'b1')]
+    assert catchment.isUpstream(node(catchment, 'b1'), c2)
+    assert not catchment.isUpstream(node(catchment, 'b6'), c2)
+    assert not catchment.isUpstream(node(catchment, 'b1'), node(catchment, 'b5'))
+
+    catchment.removeReach(next(r for r in catchment._edges if r.name == 'r4'))
+    assert sorted(v.name for v in catchment.upstream(c2)) == ['b3', 'b5', 'c2']
+
+
+def test_extract(vectors, catchment) -> None:
+    sub = catchment.extract(node(catchment, 'c2'))
+    assert links(sub) == {l for l in links(catchment) if l[1] in ('r1', 'r2', 'r3', 'r4', 'r5')}
+
+    # The same sub-catchment built from the layers with c2 as the outlet.
+    builder = pyromb.Builder()
+    confluences = builder.confluence(vectors.confluences)
+    basins = [b for b in builder.basin(vectors.centroids, vectors.basins) if b.name != 'b6']
+    reaches = [r for r in builder.reach(vectors.reaches) if r.name not in ('r6', 'r7')]
+    c2 = next(c for c in confluences if c.name == 'c2')
+    c2.isOut = True
+    expected = pyromb.Catchment([c2], basins, reaches)
+    expected.connect()
+
+    for Model in (pyromb.RORB, pyromb.WBNM, pyromb.URBS):
+        assert pyromb.Traveller(sub).getVector(Model()) == pyromb.Traveller(expected).getVector(Model())
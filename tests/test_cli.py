@@ -0,0 +1,75 @@
+import json
+import os
+
+from pyromb import cli
+
+DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+
+def _manifest(tmp_path, catchments) -> str:
+    path = tmp_path / "manifest.json"
+    path.write_text(json.dumps({
+        "models": ["RORB", {"model": "URBS", "parameters": {"alpha": 0.6}}],
+        "output": "build",
+        "catchments": catchments,
+    }))
+    return str(path)
+
+
+def test_cli(tmp_path) -> None:
+    manifest = _manifest(tmp_path, [
+        {"name": "one", "directory": DATA},
+        {"name": "two", "directory": DATA, "models": ["WBNM"]},
+    ])
+    assert cli.main([manifest, "--workers", "2"]) == 0
+
+    build = tmp_path / "build"
+    assert sorted(os.listdir(build / "one")) == ["one.cat", "one.catg", "one.vec"]
+    assert "alpha = 0.6" in (build / "one" / "one.vec").read_text()
+    assert os.listdir(build / "two") == ["two.wbn"]
+    summary = json.loads((build / "summary.json").read_text())
+    assert (summary["succeeded"], summary["failed"]) == (2, 0)
+
+
+def test_cli_failure(tmp_path) -> None:
+    manifest = _manifest(tmp_path, [
+        {"name": "one", "directory": DATA},
+        {"name": "missing", "directory": "missing"},
+    ])
+    assert cli.main([manifest, "-o", str(tmp_path / "out"), "-m", "RORB"]) == 1
+
+    summary = json.loads((tmp_path / "out" / "summary.json").read_text())
+    assert [c["status"] for c in summary["catchments"]] == ["ok", "failed"]
+    assert os.listdir(tmp_path / "out" / "one") == ["one.catg"]
+
+
+def test_cli_unknown_setting(tmp_path) -> None:
+    manifest = tmp_path / "manifest.json"
+    manifest.write_text(json.dumps({"catchments": [
+        {"name": "one", "directory": DATA, "models": [{"model": "URBS", "parameters": {"alhpa": 0.6}}]},
+        {"name": "two", "directory": DATA, "models": [{"model": "RORB", "values": {"LAG_PARAM": 1.6}}]},
+        {"name": "three", "directory": DATA, "models": [{"model": "WBNM", "values": {"LAG_PARAM": 1.6}}]},
+    ]}))
+    assert cli.main([str(manifest)]) == 1
+
+    summary = json.loads((tmp_path / "build" / "summary.json").read_text())
+    assert [c["status"] for c in summary["catchments"]] == ["failed", "failed", "ok"]
+    assert "Unknown parameters alhpa for URBS" in summary["catchments"][0]["error"]
+    assert "Unknown setting values for RORB" in summary["catchments"][1]["error"]
+
+
+def test_cli_outlets(tmp_path) -> None:
+    manifest = _manifest(tmp_path, [{"name": "region", "directory": DATA, "outlets": True}])
+    assert cli.main([manifest, "-m", "RORB"]) == 0
+    assert os.listdir(tmp_path / "build" / "region" / "c1") == ["c1.catg"]
+
+
+def test_cli_closes_layers(tmp_path, monkeypatch) -> None:
+    closed = []
+    monkeypatch.setattr(cli.ShapefileLayer, "close", lambda self: closed.append(self))
+    job = {k: os.path.join(DATA, f"{k}.shp") for k in cli.LAYERS}
+    job |= {"name": "one", "models": ["RORB"], "outlets": False, "centroids": str(tmp_path / "missing.shp")}
+    result = cli._build(job, str(tmp_path))
+
+    assert result["status"] == "failed"
+    assert len(closed) == 2
@@ -0,0 +1,42 @@
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+import pyromb
+from pyromb.core.attributes.basin import Basin
+
+
+def build(vectors, fi: float):
+    builder = pyromb.Builder()
+    tr = builder.reach(vectors.reaches)
+    tc = builder.confluence(vectors.confluences)
+    tb = builder.basin(vectors.centroids, vectors.basins)
+    catchment = pyromb.Catchment(tc, tb, tr)
+    catchment.connect()
+    for b in tb:
+        b.fi = fi
+    return catchment
+
+
+def test_shared_writers_under_load(vectors) -> None:
+    catchments = [build(vectors, fi / 10) for fi in range(6)]
+    shared = [pyromb.RORB(), pyromb.WBNM(), pyromb.URBS()]
+    rng = random.Random(0)
+
+    for _ in range(2):
+        expected = {(i, j): pyromb.Traveller(c).getVector(type(m)())
+                    for i, c in enumerate(catchments) for j, m in enumerate(shared)}
+        jobs = [(rng.randrange(len(catchments)), rng.randrange(len(shared))) for _ in range(300)]
+
+        def run(job):
+            i, j = job
+            return job, pyromb.Traveller(catchments[i]).getVector(shared[j])
+
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            for job, vector in executor.map(run, jobs):
+                assert vector == expected[job]
+
+        # An attribute only change between rounds exercises the patched path.
+        for c in catchments:
+            for v in c._vertices:
+                if isinstance(v, Basin):
+                    v.area *= 2
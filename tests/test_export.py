@@ -0,0 +1,39 @@
+import os
+
+import pytest
+
+import pyromb
+from pyromb.batch import export
+
+
+@pytest.mark.parametrize("processes", [False, True])
+def test_export_all(catchment, tmp_path, processes) -> None:
+    paths = export(catchment, [pyromb.RORB(), pyromb.WBNM(), pyromb.URBS()], str(tmp_path), processes=processes)
+
+    assert sorted(os.listdir(tmp_path)) == ["URBS_Model.cat", "URBS_Model.vec", "catchment.catg", "catchment.wbn"]
+    assert len(paths["URBS"]) == 2
+    expected = pyromb.Traveller(catchment).getVector(pyromb.RORB())
+    assert open(os.path.join(tmp_path, "catchment.catg")).read() == expected
+    assert catchment._incidenceMatrixDS.flags.writeable
+
+
+def test_export_duplicate(catchment, tmp_path) -> None:
+    with pytest.raises(ValueError):
+        export(catchment, [pyromb.WBNM(), pyromb.WBNM()], str(tmp_path))
+
+
+def test_export_unconnected(vectors, tmp_path) -> None:
+    builder = pyromb.Builder()
+    catchment = pyromb.Catchment(builder.confluence(vectors.confluences),
+                                 builder.basin(vectors.centroids, vectors.basins),
+                                 builder.reach(vectors.reaches))
+    with pytest.raises(ValueError, match="connected"):
+        export(catchment, [pyromb.RORB()], str(tmp_path))
+    assert not os.listdir(tmp_path)
+
+
+@pytest.mark.parametrize("name", ["../escape", "a/b", "", ".."])
+def test_export_unsafe_name(catchment, tmp_path, name) -> None:
+    with pytest.raises(ValueError, match="path separator"):
+        export(catchment, [pyromb.RORB()], str(tmp_path / "out"), name)
+    assert not os.listdir(tmp_path)
@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+import pyromb
+from pyromb.analysis import accumulate
+from pyromb.core.attributes.basin import Basin
+from pyromb.core.gis import flow_grid
+
+# Every cell of the top two rows drains to the middle, which drains south off the grid.
+D8 = np.array([[2, 4, 8],
+               [1, 4, 16],
+               [1, 4, 16]], dtype=np.uint8)
+
+
+def _connect(objects) -> pyromb.Catchment:
+    catchment = pyromb.Catchment(*objects)
+    catchment.connect()
+    return catchment
+
+
+def test_flow_grid_d8() -> None:
+    grid = pyromb.FlowGrid(D8, cellsize=100.0)
+    assert grid.accumulation().tolist() == [[1, 1, 1], [1, 6, 1], [1, 9, 1]]
+
+    confluences, basins, reaches = grid.build(1)
+    assert (len(confluences), len(basins), len(reaches)) == (3, 9, 11)
+    assert confluences[0].isOut and confluences[0].coordinates() == (150.0, -300.0)
+    catchment = _connect((confluences, basins, reaches))
+    upstream = accumulate(catchment)
+    assert upstream.basins[catchment._out] == 9
+    assert np.isclose(upstream.area[catchment._out], 9 * 0.01)
+
+    # Above the junction only the middle column is a stream.
+    confluences, basins, reaches = grid.build(1, outlet=(1, 1))
+    assert np.isclose(sum(b.area for b in basins), 6 * 0.01)
+
+
+def test_flow_grid_dem(tmp_path) -> None:
+    r, c = np.mgrid[0:60, 0:61]
+    dem = (np.abs(c - 30) + (60 - r) * 0.5 + 0.3 * np.abs((r % 20) - 10)).astype('<f4')
+    path = tmp_path / "dem.flt"
+    dem.tofile(path)
+    grid = pyromb.FlowGrid.fromRaw(str(path), dem.shape, '<f4', dem=True, cellsize=10.0)
+    assert np.array_equal(grid.directions, pyromb.FlowGrid.fromDEM(dem).directions)
+
+    catchment = _connect(grid.build(20))
+    basins = [v for v in catchment._vertices if isinstance(v, Basin)]
+    assert np.isclose(accumulate(catchment).area[catchment._out], dem.size * 100 / 1E6)
+    # Only a link of the outlet cell alone has no fall.
+    assert sum(r.slope == 0 for r in catchment._edges) <= 2
+    assert all(r.slope >= 0 for r in catchment._edges)
+    assert len(basins) > 10
+    assert pyromb.Traveller(catchment).getVector(pyromb.RORB()).count("\n") > len(basins)
+
+
+def test_flow_grid_errors() -> None:
+    with pytest.raises(ValueError):
+        pyromb.FlowGrid(D8).build(10)
+    with pytest.raises(ValueError):
+        pyromb.FlowGrid(np.array([[1, 16]], dtype=np.uint8)).accumulation()
+
+
+def test_flow_grid_serpentine() -> None:
+    # A single flow path east along the even rows and west along the odd rows.
+    d8 = np.where(np.arange(40)[:, None] % 2 == 0, 1, 16).repeat(41, axis=1).astype(np.uint8)
+    d8[0::2, -1], d8[1::2, 0], d8[-1, 0] = 4, 4, 0
+    grid = pyromb.FlowGrid(d8)
+    order = np.arange(d8.size).reshape(d8.shape)
+    order[1::2] = order[1::2, ::-1]
+    assert np.array_equal(grid.accumulation(), order + 1)
+
+    confluences, basins, reaches = grid.build(100)
+    assert (len(confluences), len(basins), len(reaches)) == (1, 1, 1)
+    assert np.isclose(basins[0].area, d8.size / 1E6)
+
+
+@pytest.mark.parametrize("frontier", [1, 10 ** 9])
+def test_flow_grid_tail(monkeypatch, frontier) -> None:
+    # Sweeping every frontier and summing the whole grid as the tail agree.
+    r, c = np.mgrid[0:60, 0:61]
+    dem = np.abs(c - 30) + (60 - r) * 0.5 + 0.3 * np.abs((r % 20) - 10)
+    expected = pyromb.FlowGrid.fromDEM(dem, cellsize=10.0)
+    monkeypatch.setattr(flow_grid, "_FRONTIER", frontier)
+    grid = pyromb.FlowGrid.fromDEM(dem, cellsize=10.0)
+
+    assert np.array_equal(grid.accumulation(), expected.accumulation())
+    (confluences, basins, reaches), base = grid.build(20), expected.build(20)
+    assert [c.coordinates() for c in confluences] == [c.coordinates() for c in base[0]]
+    assert [(b.coordinates(), b.area) for b in basins] == [(b.coordinates(), b.area) for b in base[1]]
+    assert [(r.getStart().coordinates(), r.getEnd().coordinates()) for r in reaches] == \
+        [(r.getStart().coordinates(), r.getEnd().coordinates()) for r in base[2]]
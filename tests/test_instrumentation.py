@@ -0,0 +1,75 @@
+import asyncio
+import json
+import threading
+import tracemalloc
+
+import pyromb
+
+
+def test_instrumentation(vectors, tmp_path) -> None:
+    with pyromb.Instrumentation() as probe:
+        builder = pyromb.Builder()
+        catchment = pyromb.Catchment(builder.confluence(vectors.confluences),
+                                     builder.basin(vectors.centroids, vectors.basins),
+                                     builder.reach(vectors.reaches))
+        catchment.connect()
+        model = pyromb.RORB()
+        model.getFiles(pyromb.Traveller(catchment).getVector(model), "catchment")
+
+    report = json.loads(probe.json(str(tmp_path / "build.json")))
+    stages = report["stages"]
+    assert set(stages) == {"builder.reach", "builder.basin", "builder.confluence", "catchment.connect",
+                           "traverse", "rorb.getVector", "rorb.getFiles"}
+    assert stages["builder.basin"]["entities"] == 6
+    assert stages["catchment.connect"]["entities"] == 7
+    assert stages["traverse"]["entities"] == 8
+    assert stages["traverse"]["peak"] >= stages["rorb.getVector"]["peak"] > 0
+    assert all(s["calls"] == 1 for s in stages.values())
+    assert json.loads((tmp_path / "build.json").read_text()) == report
+
+
+def test_instrumentation_patched(catchment) -> None:
+    model = pyromb.RORB()
+    with pyromb.Instrumentation(memory=False) as probe:
+        for _ in range(2):
+            pyromb.Traveller(catchment).getVector(model)
+
+    # The second vector is patched from the first without a walk.
+    stages = probe.report()["stages"]
+    assert stages["traverse"]["calls"] == 2
+    assert stages["traverse"]["entities"] == 16
+
+
+def test_instrumentation_inactive(catchment) -> None:
+    with pyromb.Instrumentation(memory=False) as probe:
+        pass
+    pyromb.Traveller(catchment).getVector(pyromb.WBNM())
+    assert probe.report()["stages"] == {}
+
+
+def test_instrumentation_concurrent(vectors, catchment) -> None:
+    entered, built = threading.Barrier(2), threading.Event()
+    reports = {}
+
+    def idle() -> None:
+        with pyromb.Instrumentation() as probe:
+            entered.wait()
+            built.wait()
+        reports["idle"] = probe.report()["stages"]
+
+    thread = threading.Thread(target=idle)
+    thread.start()
+    with pyromb.Instrumentation() as probe:
+        entered.wait()
+        asyncio.run(pyromb.build_model(vectors.reaches, vectors.basins, vectors.centroids,
+                                       vectors.confluences, pyromb.RORB()))
+        built.set()
+        thread.join()
+        # The idle context exited first and left memory traced for this one.
+        assert tracemalloc.is_tracing()
+    assert not tracemalloc.is_tracing()
+
+    assert reports["idle"] == {}
+    stages = probe.report()["stages"]
+    assert {"builder.reach", "catchment.connect", "traverse"} <= set(stages)
+    assert stages["traverse"]["peak"] > 0
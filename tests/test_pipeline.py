@@ -0,0 +1,27 @@
+import asyncio
+
+import pytest
+
+import pyromb
+
+
+def test_build_model(vectors, catchment) -> None:
+    events = []
+    vector = asyncio.run(pyromb.build_model(vectors.reaches, vectors.basins, vectors.centroids,
+                                            vectors.confluences, pyromb.RORB(),
+                                            progress=lambda *e: events.append(e)))
+
+    assert vector == pyromb.Traveller(catchment).getVector(pyromb.RORB())
+    assert [e[0] for e in events if e[1] == e[2]] == list(pyromb.pipeline.STAGES)
+
+
+def test_build_model_cancelled(vectors) -> None:
+    token = pyromb.CancellationToken()
+
+    def progress(stage, done, total):
+        if stage == "basins":
+            token.cancel()
+
+    with pytest.raises(pyromb.BuildCancelled):
+        asyncio.run(pyromb.build_model(vectors.reaches, vectors.basins, vectors.centroids,
+                                       vectors.confluences, pyromb.RORB(), progress, token))
@@ -0,0 +1,64 @@
+import os
+
+import pytest
+
+import pyromb
+from pyromb.batch import export_region
+from pyromb.utils.synthetic import synthetic_catchment
+
+
+def _region(*outlets) -> pyromb.Catchment:
+    """Build one catchment from synthetic catchments laid side by side with prefixed names."""
+    layers = {k: ([], []) for k in ("basins", "centroids", "confluences", "reaches")}
+    for n, (prefix, subareas) in enumerate(outlets):
+        synthetic = synthetic_catchment(subareas, 2)
+        for k, (geometries, records) in layers.items():
+            layer = getattr(synthetic, k)
+            for i in range(len(layer)):
+                geometries.append([(x + n * 1E5, y) for x, y in layer.geometry(i)])
+                records.append(layer.record(i) | {"id": prefix + layer.record(i)["id"]})
+    layers = {k: pyromb.MemoryLayer(*v) for k, v in layers.items()}
+    builder = pyromb.Builder()
+    return pyromb.Catchment(builder.confluence(layers["confluences"]),
+                            builder.basin(layers["centroids"], layers["basins"]),
+                            builder.reach(layers["reaches"]))
+
+
+def test_components() -> None:
+    components = _region(("a", 6), ("b", 12), ("c", 4)).components()
+
+    assert [len(c._vertices) for c in components] == [7, 15, 5]
+    assert [c._vertices[0].name for c in components] == ["ac0", "bc0", "cc0"]
+    for c in components:
+        # The ends snapped by components are reused by connect.
+        assert c._ends == c._snap()
+        c.connect()
+        assert c._ends is None
+        assert c._vertices[pyromb.Traveller(c).getStart()].isOut
+
+
+def test_components_no_outlet() -> None:
+    catchment = _region(("a", 6), ("b", 4))
+    catchment._vertices[0].isOut = False
+    with pytest.raises(ValueError):
+        catchment.components()
+
+
+@pytest.mark.parametrize("processes", [False, True])
+def test_export_region(tmp_path, processes) -> None:
+    paths = export_region(_region(("a", 6), ("b", 12)), [pyromb.RORB(), pyromb.URBS()], str(tmp_path),
+                          processes=processes)
+
+    assert sorted(paths) == ["ac0", "bc0"]
+    assert sorted(os.listdir(tmp_path / "bc0")) == ["bc0.cat", "bc0.catg", "bc0.vec"]
+    expected = _region(("b", 12)).components()[0]
+    expected.connect()
+    assert (tmp_path / "bc0" / "bc0.catg").read_text() == pyromb.Traveller(expected).getVector(pyromb.RORB())
+
+
+def test_export_region_unsafe_name(tmp_path) -> None:
+    catchment = _region(("a", 6), ("b", 4))
+    catchment._vertices[0].name = "../ac0"
+    with pytest.raises(ValueError, match="Outlet name"):
+        export_region(catchment, [pyromb.RORB()], str(tmp_path / "out"), processes=False)
+    assert not os.listdir(tmp_path)
@@ -17,4 +17,17 @@ def test_rorb(vectors) -> None:
     control_str = traveller.getVector(model)
     
     assert control_str
-    assert control_str.startswith("REACH")
\ No newline at end of file
+    assert control_str.startswith("REACH")
+
+@pytest.mark.rorb
+def test_rorb_patch(catchment) -> None:
+    model = pyromb.RORB()
+    model.getVector(pyromb.Traveller(catchment))
+
+    basin = next(v for v in catchment._vertices if v.name == 'b4')
+    catchment.updateNode(basin, area=0.25, fi=0.75)
+    catchment._edges[0].slope = 0.05
+    patched = model.getVector(pyromb.Traveller(catchment))
+
+    assert patched == pyromb.RORB().getVector(pyromb.Traveller(catchment))
+    assert "0.25000" in patched
@@ -0,0 +1,110 @@
+import numpy as np
+
+import pyromb
+from pyromb.core.attributes.basin import Basin
+from pyromb.simulation import RORBEngine, URBSEngine, WBNMEngine, rainfall_excess, storage_route, unit_hydrographs
+
+
+def test_storage_route() -> None:
+    inflow = np.zeros((10000, 1))
+    inflow[:1000] = 1.0
+    outflow = storage_route(inflow, 1.0, 1.0, 0.001)
+
+    # A linear reservoir filled for one hour peaks at 1 - exp(-1).
+    assert np.isclose(outflow.max(), 1 - np.exp(-1), atol=1e-3)
+    assert np.isclose(outflow.sum(), inflow.sum(), rtol=1e-3)
+    assert np.array_equal(storage_route(inflow, 0.0, 0.8, 0.001), inflow)
+
+
+def test_rorb_engine(catchment) -> None:
+    engine = RORBEngine(catchment, kc=0.5, m=0.8)
+    excess = np.zeros((12, 3))
+    excess[:4, 0] = 10.0
+    excess[:4, 1] = 20.0
+    excess[2:8, 2] = 5.0
+    flow = engine.route(excess, 0.1, steps=200)
+    area = sum(v.area for v in catchment._vertices if isinstance(v, Basin))
+
+    assert engine.subareas == ['b1', 'b2', 'b4', 'b3', 'b5', 'b6']
+    assert [code for code, _, _ in engine.program] == [1, 3, 1, 4, 2, 3, 1, 2, 4, 5, 2, 5]
+    assert np.allclose(flow.sum(axis=0) * 0.1 * 3.6, excess.sum(axis=0) * area, rtol=1e-3)
+    assert flow[:, 1].max() > 2 * flow[:, 0].max()
+    assert np.allclose(engine.route(excess[:, 2:], 0.1, steps=200)[:, 0], flow[:, 2])
+
+
+def test_wbnm_engine(catchment) -> None:
+    engine = WBNMEngine(catchment)
+    excess = np.zeros((12, 2))
+    excess[:4, 0] = 10.0
+    excess[2:8, 1] = 5.0
+    flow = engine.route(excess, 0.1, steps=300)
+    area = sum(v.area for v in catchment._vertices if isinstance(v, Basin))
+
+    assert engine.subareas == ['b1', 'b2', 'b4', 'b3', 'b5', 'b6']
+    assert engine.down.tolist() == [2, 2, 5, 4, 5, -1]
+    assert np.allclose(flow.sum(axis=0) * 0.1 * 3.6, excess.sum(axis=0) * area, rtol=1e-2)
+    assert np.allclose(WBNMEngine(catchment, workers=4).route(excess, 0.1, steps=300), flow)
+
+
+def test_urbs_engine(catchment) -> None:
+    model = pyromb.URBS()
+    files = model.getFiles(pyromb.Traveller(catchment).getVector(model), model.model_name)
+    engine = URBSEngine(files["URBS_Model.vec"], files["URBS_Model.cat"])
+    rainfall = np.zeros((12, 2))
+    rainfall[:4, 0] = 10.0
+    rainfall[2:8, 1] = 5.0
+    flow = engine.route(rainfall, 0.1, steps=400)["c1"]
+    area = sum(v.area for v in catchment._vertices if isinstance(v, Basin))
+    # No initial loss and a continuing loss of 2.5 mm/h.
+    excess = np.maximum(rainfall - 0.25, 0.0).sum(axis=0)
+
+    assert [c for c, _, _ in engine.commands][:3] == ["RAIN", "STORE", "RAIN"]
+    assert engine.parameters["alpha"] == 0.5
+    assert np.allclose(flow.sum(axis=0) * 0.1 * 3.6, excess * area, rtol=2e-2)
+    slower = URBSEngine(files["URBS_Model.vec"], files["URBS_Model.cat"], {"beta": 6.0})
+    assert slower.route(rainfall, 0.1, steps=400)["c1"].max() < flow.max()
+
+
+def test_urbs_route_thru() -> None:
+    vec = "RAIN #1 L=0.1\nROUTE THRU #2 L=2.0\nPRINT. out"
+    cat = "Index,Name,Area,Imperviousness,IL,CL\n1,b1,1.0,0.0,0.0,0.0\n2,b2,1.0,{},0.0,0.0"
+    rainfall = np.zeros((12, 1))
+    rainfall[:4] = 10.0
+    rural = URBSEngine(vec, cat.format(0.0)).route(rainfall, 0.1, steps=400)["out"]
+    urban = URBSEngine(vec, cat.format(0.8)).route(rainfall, 0.1, steps=400)["out"]
+
+    # The ROUTE THRU index is a node position, the sub-catchment it happens to match is not urbanised.
+    assert np.array_equal(urban, rural)
+
+
+def test_rainfall_excess() -> None:
+    rainfall = np.zeros((2, 3, 6))
+    rainfall[0, :, :3] = 10.0
+    rainfall[1, :, 2:] = 2.0
+    excess = rainfall_excess(rainfall, 0.5, il=[15.0, 0.0, 50.0], cl=2.0, fi=[0.0, 0.5, 1.0])
+
+    assert np.allclose(excess.pervious[0, 0], [0, 4, 9, 0, 0, 0])
+    assert np.allclose(excess.pervious[1, 1], [0, 0, 1, 1, 1, 1])
+    assert not excess.pervious[:, 2].any()
+    assert np.allclose(excess.impervious, rainfall)
+    assert np.allclose(excess.total()[:, 2], rainfall[:, 2])
+
+    single = rainfall_excess(rainfall.astype(np.float32), 0.5, 15.0, 2.0, dtype=np.float32)
+    assert single.pervious.dtype == np.float32
+    assert np.allclose(single.pervious[:, 0], excess.pervious[:, 0])
+
+
+def test_unit_hydrographs(catchment) -> None:
+    clark = unit_hydrographs(catchment, 0.01)
+    area = np.array([v.area for v in catchment._vertices if isinstance(v, Basin)])
+
+    # 1 mm on each basin comes out at the outlet.
+    assert np.allclose(clark.ordinates.sum(axis=1) * 0.01 * 3.6, area, rtol=1e-3)
+    assert np.allclose(unit_hydrographs(catchment, 0.01, method="time-area").ordinates.sum(axis=1) * 0.036, area)
+
+    excess = np.random.default_rng(0).random((4, len(area), 50))
+    flow = clark.convolve(excess)
+    direct = sum(np.convolve(excess[2, b], clark.ordinates[b]) for b in range(len(area)))
+    assert flow.shape == (4, 50 + clark.ordinates.shape[1] - 1)
+    assert np.allclose(flow[2], direct)
+    assert np.allclose(clark.convolve(excess, outlet=False).sum(axis=-2), flow)
@@ -0,0 +1,46 @@
+import json
+import os
+
+import pytest
+
+import pyromb
+from pyromb.batch import sweep
+
+
+@pytest.mark.parametrize("processes", [False, True])
+def test_sweep_wbnm(catchment, tmp_path, processes) -> None:
+    scenarios = [
+        {"name": "base"},
+        {"name": "lag", "LAG_PARAM": 1.6},
+        {"name": "fi", "fi": 0.5, "fi:b2": 0.9},
+    ]
+    report = sweep(catchment, pyromb.WBNM(), scenarios, str(tmp_path), workers=2, processes=processes)
+
+    assert report.count == 3
+    assert report.throughput > 0
+    manifest = json.load(open(report.manifest))
+    assert [s["name"] for s in manifest["scenarios"]] == ["base", "lag", "fi"]
+
+    model = pyromb.WBNM()
+    model.values["LAG_PARAM"] = 1.6
+    assert open(os.path.join(tmp_path, "lag.wbn")).read() == pyromb.Traveller(catchment).getVector(model)
+
+
+def test_sweep_urbs(catchment, tmp_path) -> None:
+    report = sweep(catchment, pyromb.URBS(), [{"name": "a", "alpha": 0.7}], str(tmp_path))
+
+    assert report.scenarios[0]["files"] == ["a.vec", "a.cat"]
+    vec = open(os.path.join(tmp_path, "a.vec")).read()
+    assert "alpha = 0.7" in vec
+    assert "CATCHMENT DATA FILE = a.cat" in vec
+
+
+def test_sweep_unknown_column(catchment, tmp_path) -> None:
+    with pytest.raises(KeyError):
+        sweep(catchment, pyromb.RORB(), [{"kc": 1.0}], str(tmp_path))
+
+
+def test_sweep_unsafe_name(catchment, tmp_path) -> None:
+    with pytest.raises(ValueError, match="Scenario name"):
+        sweep(catchment, pyromb.WBNM(), [{"name": "../wet"}], str(tmp_path / "out"))
+    assert not os.listdir(tmp_path)
@@ -0,0 +1,30 @@
+import pytest
+
+import pyromb
+from pyromb.core.attributes.basin import Basin
+from pyromb.utils.synthetic import synthetic_catchment
+
+
+@pytest.mark.parametrize("subareas, branching, depth", [(40, 2, None), (12, 3, 0), (10, 1, 4)])
+def test_synthetic_catchment(subareas, branching, depth) -> None:
+    layers = synthetic_catchment(subareas, branching, depth, vertices=3)
+    builder = pyromb.Builder()
+    catchment = pyromb.Catchment(builder.confluence(layers.confluences),
+                                 builder.basin(layers.centroids, layers.basins),
+                                 builder.reach(layers.reaches))
+    catchment.connect()
+
+    assert len(layers.centroids) == subareas
+    assert len(layers.reaches) == len(layers.centroids) + len(layers.confluences) - 1
+    assert all(len(layers.reaches.geometry(i)) == 3 for i in range(len(layers.reaches)))
+    areas = {round(v.area, 6) for v in catchment._vertices if isinstance(v, Basin)}
+    assert areas == {0.0064}
+    # Every node but the outlet has a reach downstream.
+    assert (catchment._incidenceMatrixDS != -1).any(axis=1).sum() == len(layers.reaches)
+    vector = pyromb.Traveller(catchment).getVector(pyromb.RORB())
+    assert vector.count("\n") > subareas
+
+
+def test_synthetic_catchment_too_deep() -> None:
+    with pytest.raises(ValueError):
+        synthetic_catchment(10, 2, 3)
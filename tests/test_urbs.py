@@ -22,4 +22,26 @@ def test_urbs(vectors) -> None:
     assert vec_content.startswith("URBS_Model")
 
     assert cat_content
-    assert cat_content.startswith("Index,Name,Area,Imperviousness,IL,CL")
\ No newline at end of file
+    assert cat_content.startswith("Index,Name,Area,Imperviousness,IL,CL")
+
+@pytest.mark.urbs
+def test_urbs_patch(catchment) -> None:
+    model = pyromb.URBS()
+    model.getVector(pyromb.Traveller(catchment))
+
+    basin = next(v for v in catchment._vertices if v.name == 'b4')
+    catchment.updateNode(basin, area=0.25, fi=0.75)
+    catchment._edges[0].slope = 0.05
+    patched = model.getVector(pyromb.Traveller(catchment))
+
+    assert patched == pyromb.URBS().getVector(pyromb.Traveller(catchment))
+    assert "Sc=0.050000" in patched
+
+@pytest.mark.urbs
+def test_urbs_cat_indices(catchment) -> None:
+    model = pyromb.URBS()
+    vec_content, cat_content = model.splitVector(pyromb.Traveller(catchment).getVector(model))
+
+    # The .cat rows are indexed by the sub-catchment numbers the .vec commands use.
+    assert "ADD RAIN #3" in vec_content
+    assert "3,b4," in cat_content
@@ -0,0 +1,61 @@
+import pytest
+
+import pyromb
+from pyromb.core.attributes.basin import Basin
+from pyromb.core.attributes.confluence import Confluence
+from pyromb.core.attributes.reach import Reach
+from pyromb.core.validation import Severity, check
+
+
+def _codes(diagnostics) -> list:
+    return sorted(d.code for d in diagnostics if d.severity == Severity.ERROR)
+
+
+def test_validate(vectors, catchment) -> None:
+    assert pyromb.validate(catchment, vectors.centroids, vectors.basins) == []
+    assert check(catchment) == []
+
+
+def test_validate_errors() -> None:
+    catchment = pyromb.Catchment(
+        [Confluence("c1", 0, 0, True), Confluence("c2", 500, 0, True), Confluence("c3", 1000, 0, False)],
+        [Basin("b1", 0, 100, 1, 0), Basin("b2", 0, 200, 1, 0), Basin("b3", 100, 100, 1, 0),
+         Basin("b1", 0, -100, 1, 0), Basin("b5", 5000, 5000, 1, 0)],
+        [Reach("r1", [(0, 100), (0, 0)]),
+         Reach("r2", [(0, 200), (0, 100)]),
+         Reach("r3", [(100, 100), (0, 100)]),
+         Reach("r4", [(100, 100), (0, 200)]),
+         Reach("r5", [(0, -100), (0, 0)]),
+         Reach("r6", [(500, 5), (1000, 0)]),
+         Reach("r7", [(1000, 0), (3000, 0)])])
+
+    diagnostics = pyromb.validate(catchment)
+    assert _codes(diagnostics) == ["cycle", "dangling-end", "disconnected-node", "duplicate-id",
+                                   "multiple-outlets", "unsnapped-end"]
+    cycle = next(d for d in diagnostics if d.code == "cycle")
+    assert cycle.entities[0] == "r4"
+    assert cycle.asdict()["severity"] == "error"
+    assert "c1, c2" in next(d for d in diagnostics if d.code == "multiple-outlets").message
+    with pytest.raises(pyromb.ValidationError) as e:
+        check(catchment)
+    assert e.value.diagnostics == diagnostics
+
+
+def test_validate_outlets() -> None:
+    catchment = pyromb.Catchment(
+        [Confluence("c1", 0, 0, True), Confluence("c2", 500, 0, True), Confluence("c3", 1000, 0, False)],
+        [Basin("b1", 0, 100, 1, 0), Basin("b2", 500, 100, 1, 0), Basin("b3", 1000, 100, 1, 0)],
+        [Reach("r1", [(0, 100), (0, 0)]),
+         Reach("r2", [(500, 100), (500, 0)]),
+         Reach("r3", [(1000, 100), (1000, 0)])])
+
+    assert _codes(pyromb.validate(catchment)) == ["missing-outlet", "multiple-outlets"]
+    assert _codes(pyromb.validate(catchment, components=True)) == ["missing-outlet"]
+
+
+def test_validate_centroids(vectors, catchment) -> None:
+    centroids = pyromb.MemoryLayer([vectors.centroids.geometry(0), vectors.centroids.geometry(0), [(1E5, 1E5)]],
+                                   [{"id": "x"}, {"id": "y"}, {"id": "z"}])
+    codes = [d.code for d in pyromb.validate(catchment, centroids, vectors.basins)]
+    assert codes.count("unmatched-basin") == 5
+    assert {"shared-basin", "unmatched-centroid"} <= set(codes)
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+import pyromb
+from pyromb.analysis import idw_weights
+from pyromb.arr import Storm
+
+
+@pytest.mark.wbnm
+def test_wbnm(catchment) -> None:
+    model = pyromb.WBNM()
+    runfile = pyromb.Traveller(catchment).getVector(model)
+
+    assert runfile.startswith("#####START_PREAMBLE_BLOCK")
+    assert "#####END_STORM_BLOCK" in runfile
+
+
+@pytest.mark.wbnm
+def test_wbnm_patch(catchment) -> None:
+    model = pyromb.WBNM()
+    model.getVector(pyromb.Traveller(catchment))
+
+    basin = next(v for v in catchment._vertices if v.name == 'b4')
+    catchment.updateNode(basin, area=0.25, fi=0.75)
+    model.values['LAG_PARAM'] = 1.6
+    patched = model.getVector(pyromb.Traveller(catchment))
+
+    fresh = pyromb.WBNM()
+    fresh.values['LAG_PARAM'] = 1.6
+    assert patched == fresh.getVector(pyromb.Traveller(catchment))
+
+
+@pytest.mark.wbnm
+def test_wbnm_storms(catchment) -> None:
+    storm = Storm("1%_60min_tp1", 1.0, 60.0, 1, 20.0, np.array([5.0, 40.0, 5.0]))
+    model = pyromb.WBNM()
+    template = pyromb.Traveller(catchment).getVector(model)
+    assert "sorell_upper" in template
+
+    model.storms, model.losses = [storm, storm], (28.0, 3.2)
+    runfile = pyromb.Traveller(catchment).getVector(model)
+    assert runfile == pyromb.Traveller(catchment).getVector(pyromb.WBNM([storm, storm], (28.0, 3.2)))
+    assert "sorell_upper" not in runfile
+    assert runfile.count("#####START_RECORDED_RAIN") == 2
+    assert runfile.split("#####START_STORM_BLOCK")[0] == template.split("#####START_STORM_BLOCK")[0]
+
+    # A regenerated, equal ensemble keeps the storm block, a changed one rebuilds it.
+    model.storms = [Storm(storm.name, 1.0, 60.0, 1, 20.0, storm.rainfall.copy())] * 2
+    assert pyromb.Traveller(catchment).getVector(model) == runfile
+    model.storms = [Storm(storm.name, 1.0, 60.0, 1, 20.0, storm.rainfall * 2)]
+    assert pyromb.Traveller(catchment).getVector(model).count("#####START_RECORDED_RAIN") == 1
+
+    model.gauges = idw_weights({'g1': (0.0, 0.0), 'g2': (1000.0, 1000.0)}, catchment)
+    weights = pyromb.Traveller(catchment).getVector(model).split("#####START_CALC_RAINGAUGE_WEIGHTS\n")[1]
+    rows = weights.split("#####END_CALC_RAINGAUGE_WEIGHTS")[0].splitlines()
+    assert len(rows) == len(model.gauges.subareas)
+    assert all(np.isclose(float(r[12:24]) + float(r[24:36]), 1.0, atol=1e-3) for r in rows)